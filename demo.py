@@ -10,10 +10,8 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
-import numpy as np
-from scipy.optimize import minimize
-
 from putcall.formulas.interest_rate_options import sabr
+from putcall.calibration import sabr_calibration_smile
 
 
 def tprint(*args):
@@ -43,25 +41,9 @@ if 0:
     # plt.show()
 
 # --- sabr cali ---
-def min_sabr(x):
-    forward_value = 0.03
-    beta_value = 0.1
-    strike_list = [forward_value + p for p in (-0.015, -0.01, -0.005, -0.0025, 0, 0.0025, 0.005, 0.01, 0.015)]
-    target_list = [0.2, 0.15, 0.11, 0.9, 0.8, 0.7, 0.8, 0.85, 0.9]
-    ret = 0.00
-    for i in range(len(strike_list)):
-        s = strike_list[i]
-        f = forward_value
-        t = 5
-        a = x[0]
-        b = beta_value
-        n = x[1]
-        r = x[2]
-        ret += (sabr.sabr_black_vol(s, f + shift, a, b, n, r, t) - target_list[i]) ** 2
-    return ret
-
-
-x0 = np.array([0.001, 0.01, 0.15])
-# res = minimize(min_sabr, x0, method='nelder-mead', options={'xtol': 1e-8, 'disp': True})
-res = minimize(min_sabr, x0)
-tprint(res.x)
+forward_value = 0.03
+beta_value = 0.1
+strike_list = [forward_value + p for p in (-0.015, -0.01, -0.005, -0.0025, 0, 0.0025, 0.005, 0.01, 0.015)]
+target_list = [0.2, 0.15, 0.11, 0.9, 0.8, 0.7, 0.8, 0.85, 0.9]
+res = sabr_calibration_smile(forward_value + shift, strike_list, target_list, 5, beta_value)
+tprint(res)
@@ -23,7 +23,8 @@ __author__ = 'sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]'
 __email__ = 'sonntagsgesicht@icloud.com'
 __url__ = 'https://github.com/sonntagsgesicht/' + __name__
 __license__ = 'Apache License 2.0'
-__dependencies__ = ('mathtoolspy',)
+__dependencies__ = ('mathtoolspy', 'numpy')
+__extras__ = {'scipy': ('scipy',)}
 __dependency_links__ = ()
 __data__ = ()
 __scripts__ = ()
@@ -31,3 +32,6 @@ __scripts__ = ()
 from .formulas import *
 from .calibration import *
 from .optionvaluator import *
+from .cache import *
+from .portfolio import *
+from .scenario import *
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from .formulas.normal_distribution import get_normal_cdf_method
+
+_now = getattr(time, 'monotonic', time.time)
+_MISSING = object()
+
+
+class ValuationCache(object):
+    """
+    thread-safe least recently used cache with time to live
+
+    :param int maxsize: maximal number of entries (optional, default 1024)
+    :param float ttl: time to live of entries in seconds (optional, default `None`, i.e. no expiry)
+    :param int digits: significant digits of float arguments used as key
+        (optional, default `None`, i.e. exact arguments)
+
+    Rounding float arguments to `digits` significant digits
+    lets near-identical arguments share one entry.
+    Keys include the method of `normal_cdf` (see :func:`set_normal_cdf_method`),
+    so values are never served across methods.
+
+    Counts `hits`, `misses` and `evictions` (by size or by age).
+
+    >>> from putcall import ValuationCache
+    >>> cache = ValuationCache(maxsize=2, digits=6)
+    >>> cache(pow, 2., 0.5) == cache(pow, 2.0000000001, 0.5)
+    True
+    >>> cache.hits, cache.misses
+    (1, 1)
+
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, digits=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.digits = digits
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return '%s(maxsize=%s, ttl=%s, digits=%s)' % (self.__class__.__name__, self.maxsize, self.ttl, self.digits)
+
+    def __call__(self, func, *args):
+        """
+        cached value of `func(*args)`
+
+        :param function func: function to call (part of the key)
+        :param args: arguments (part of the key)
+        :return: `func(*args)`
+
+        """
+        key = self.key(func, *args)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args)
+            self.set(key, value)
+        return value
+
+    def key(self, *args):
+        """ hashable key of arguments with floats rounded to `digits` significant digits
+        and current `normal_cdf` method """
+        args = args + (get_normal_cdf_method(),)
+        if self.digits is None:
+            return args
+        return tuple(float('%.*g' % (self.digits, a)) if isinstance(a, float) else a for a in args)
+
+    def get(self, key, default=None):
+        """ value of `key` or `default` if missing or expired """
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and self.ttl is not None and item[1] + self.ttl < _now():
+                del self._data[key]
+                self.evictions += 1
+                item = _MISSING
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            self._data.pop(key)
+            self._data[key] = item
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        """ stores `value` under `key` and evicts least recently used entries """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value, _now()
+            while self.maxsize is not None and self.maxsize < len(self._data):
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ removes all entries and resets counters """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class TaylorValuationCache(object):
+    """
+    delta-gamma-vega-vanna approximation of option values between full valuations
+
+    :param OptionValuator valuator: valuator of full valuations
+    :param float tolerance: maximal estimated error of an approximated value (optional, default 1e-6)
+
+    :meth:`fit` values trades in full and keeps value, delta, gamma, vega and vanna as anchor.
+    :meth:`value` answers moves of forwards and vols by the Taylor expansion
+
+    .. math::
+
+        v + \\Delta\\,dF + \\tfrac{1}{2}\\Gamma\\,dF^2 + \\mathcal{V}\\,d\\sigma + \\textrm{vanna}\\,dF\\,d\\sigma
+
+    at the anchor. Its error is estimated by the leading neglected terms
+    :math:`\\tfrac{1}{2}\\,\\textrm{volga}\\,d\\sigma^2 + \\tfrac{1}{6}\\,\\textrm{speed}\\,dF^3`.
+    Trades with estimated error above `tolerance` are repriced in full instead
+    and anchored at their new forward and vol.
+
+    Counts `approximations` and `fallbacks` (full reprices) per trade.
+
+    >>> from putcall import TaylorValuationCache, OptionValuatorN, OptionType
+    >>> cache = TaylorValuationCache(OptionValuatorN(), tolerance=1e-6)
+    >>> values = cache.fit([0.02, 0.03], 0.025, 1., 0.01, OptionType.CALL)
+    >>> values = cache.value([0.0201, 0.04], 0.01)
+    >>> cache.approximations, cache.fallbacks
+    (1, 1)
+
+    """
+
+    def __init__(self, valuator, tolerance=1e-6):
+        self.valuator = valuator
+        self.tolerance = tolerance
+        self.approximations = 0
+        self.fallbacks = 0
+        self._trades = tuple(np.zeros(0) for _ in range(6))  # forward, strike, time, vol, type, discount factor
+        self._greeks = np.zeros((7, 0))  # value, delta, gamma, vega, vanna, volga, speed
+
+    def __len__(self):
+        return self._greeks.shape[1]
+
+    def __repr__(self):
+        return '%s(%r, tolerance=%s)' % (self.__class__.__name__, self.valuator, self.tolerance)
+
+    @property
+    def fallback_ratio(self):
+        """ share of full reprices among all answered values """
+        total = self.approximations + self.fallbacks
+        return self.fallbacks / float(total) if total else 0.0
+
+    @property
+    def greeks(self):
+        """ value, delta, gamma, vega, vanna, volga and speed at the anchors (read-only, 7 x n_trades) """
+        view = self._greeks.view()
+        view.flags.writeable = False
+        return view
+
+    def fit(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """
+        full valuation of trades as anchor of the approximation
+
+        :param array_like forwards: forward prices of underlying at exercise date
+        :param array_like strikes: strike prices
+        :param array_like times: year fractions until exercise date
+        :param array_like vols: volatilities of underlying price
+        :param array_like option_types: OptionType
+        :param array_like discount_factors: discount factors
+        :return: numpy.ndarray of option values
+
+        All arguments are broadcast against each other and trades are flattened to rows.
+
+        """
+        trades = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in
+                                       (forwards, strikes, times, vols, option_types, discount_factors)))
+        self._trades = tuple(a.ravel().copy() for a in trades)
+        self._greeks = np.zeros((7, self._trades[0].size))
+        self._fit(np.arange(len(self)))
+        return self._greeks[0].copy()
+
+    def _fit(self, rows):
+        # full valuation of rows and anchoring their value and sensitivities
+        forward, strike, time, vol, option_type, discount_factor = (a[rows] for a in self._trades)
+        args = forward, strike, time, vol, option_type, discount_factor
+        valuator = self.valuator
+        self._greeks[:4, rows] = valuator.price_and_greeks_portfolio(*args)
+        self._greeks[4, rows] = valuator.vanna_portfolio(*args)
+        self._greeks[5, rows] = valuator.volga_portfolio(*args)
+        # speed by central differences of gamma
+        shift = 1e-4 * np.where(forward == 0.0, 1.0, np.abs(forward))
+        up = valuator.gamma_portfolio(forward + shift, strike, time, vol, option_type, discount_factor)
+        down = valuator.gamma_portfolio(forward - shift, strike, time, vol, option_type, discount_factor)
+        self._greeks[6, rows] = (up - down) / (2. * shift)
+
+    def value(self, forwards=None, vols=None, rows=None):
+        """
+        option values after a move of forwards and vols
+
+        :param array_like forwards: new forward prices (optional, default anchor forwards)
+        :param array_like vols: new volatilities (optional, default anchor vols)
+        :param array_like rows: rows of trades to value (optional, default all)
+        :return: numpy.ndarray of option values
+
+        Values are approximated by the Taylor expansion at the anchor
+        unless the estimated error exceeds `tolerance`.
+        Then the trade is repriced in full and anchored anew.
+
+        """
+        rows = np.arange(len(self)) if rows is None else np.atleast_1d(np.asarray(rows, dtype=int))
+        anchor_forward, anchor_vol = self._trades[0][rows], self._trades[3][rows]
+        forward = anchor_forward if forwards is None else np.broadcast_to(np.asarray(forwards, dtype=float), rows.shape)
+        vol = anchor_vol if vols is None else np.broadcast_to(np.asarray(vols, dtype=float), rows.shape)
+        df, dv = forward - anchor_forward, vol - anchor_vol
+
+        value, delta, gamma, vega, vanna, volga, speed = self._greeks[:, rows]
+        result = value + delta * df + 0.5 * gamma * df * df + vega * dv + vanna * df * dv
+        error = np.abs(0.5 * volga * dv * dv) + np.abs(speed * df * df * df / 6.)
+
+        fallback = ~(error <= self.tolerance)
+        if np.any(fallback):
+            repriced = rows[fallback]
+            self._trades[0][repriced] = forward[fallback]
+            self._trades[3][repriced] = vol[fallback]
+            self._fit(repriced)
+            result[fallback] = self._greeks[0, repriced]
+        self.fallbacks += int(np.sum(fallback))
+        self.approximations += int(fallback.size - np.sum(fallback))
+        return result
@@ -11,5 +11,8 @@
 
 
 from .implied_volatility import *
+from .lets_be_rational import *
+from .implied_normal_volatility import *
 from .black_calibration import *
 from .hw_calibration import *
+from .sabr_calibration import *
@@ -10,3 +10,155 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
+import numpy as np
+
+from putcall.formulas.interest_rate_options.black76 import black_array, black_vega_array
+from putcall.formulas.interest_rate_options.bachelier import bachelier_array, bachelier_vega_array
+from .implied_volatility import implied_vol_array, CONVERGED, BISECTION
+
+# model: (value function, vega function, initial vol, upper vol bound)
+CAPLET_MODELS = {
+    'black': (black_array, black_vega_array, 0.2, 10.0),
+    'shifted_black': (black_array, black_vega_array, 0.2, 10.0),
+    'bachelier': (bachelier_array, bachelier_vega_array, 0.01, 1.0),
+}
+
+
+def _caplet_model(model, displacement):
+    if model not in CAPLET_MODELS:
+        raise ValueError('Unknown caplet model %s, expected one of %s.' % (str(model), ', '.join(CAPLET_MODELS)))
+    if not model == 'shifted_black':
+        displacement = 0.0
+    return CAPLET_MODELS[model], displacement
+
+
+def caplet_value_array(forward_values, strike_values, vol_values, time_values, year_fractions, discount_factors,
+                       model='black', displacement=0.0, is_call_bool=True):
+    """
+    present values of caplets (floorlets)
+
+    :param array_like forward_values: forward rates of caplets
+    :param array_like strike_values: strikes
+    :param array_like vol_values: caplet volatilities
+    :param array_like time_values: year fractions until fixing dates
+    :param array_like year_fractions: year fractions of accrual periods
+    :param array_like discount_factors: discount factors to payment dates
+    :param str model: 'black', 'shifted_black' or 'bachelier'
+    :param float displacement: shift of forwards and strikes of model 'shifted_black'
+    :param bool is_call_bool: caplet -> True, floorlet -> False
+    :return: numpy.ndarray
+
+    All arguments are broadcast against each other.
+
+    """
+    (value_function, _, _, _), displacement = _caplet_model(model, displacement)
+    forward_values = np.asarray(forward_values, dtype=float) + displacement
+    strike_values = np.asarray(strike_values, dtype=float) + displacement
+    annuity = np.asarray(year_fractions, dtype=float) * np.asarray(discount_factors, dtype=float)
+    return annuity * value_function(forward_values, strike_values, vol_values, time_values, is_call_bool)
+
+
+def cap_floor_value_array(forward_values, strike_values, vol_values, time_values, year_fractions, discount_factors,
+                          model='black', displacement=0.0, is_call_bool=True):
+    """
+    present values of caps (floors) as sum of caplets (floorlets)
+
+    :param array_like forward_values: forward rates of caplets (first axis)
+    :param array_like strike_values: strikes
+    :param array_like vol_values: caplet volatilities
+    :param array_like time_values: year fractions until fixing dates (first axis)
+    :param array_like year_fractions: year fractions of accrual periods (first axis)
+    :param array_like discount_factors: discount factors to payment dates (first axis)
+    :param str model: 'black', 'shifted_black' or 'bachelier'
+    :param float displacement: shift of forwards and strikes of model 'shifted_black'
+    :param bool is_call_bool: cap -> True, floor -> False
+    :return: numpy.ndarray
+
+    Sum of `caplet_value_array` over the first axis,
+    e.g. caplets as columns against a row of strikes give one cap value per strike.
+
+    """
+    return np.sum(caplet_value_array(np.asarray(forward_values, dtype=float)[:, np.newaxis], strike_values,
+                                     np.asarray(vol_values, dtype=float).reshape(
+                                         (-1, 1) if np.ndim(vol_values) == 1 else np.shape(vol_values)),
+                                     np.asarray(time_values, dtype=float)[:, np.newaxis],
+                                     np.asarray(year_fractions, dtype=float)[:, np.newaxis],
+                                     np.asarray(discount_factors, dtype=float)[:, np.newaxis],
+                                     model, displacement, is_call_bool), axis=0)
+
+
+def caplet_vol_stripping(cap_prices, strike_values, forward_values, time_values, year_fractions, discount_factors,
+                         cap_lengths, model='black', displacement=0.0, is_call_bool=True, initial_value=None):
+    """
+    bootstraps a term structure of caplet volatilities per strike from cap (floor) prices
+
+    :param array_like cap_prices: cap prices as matrix with one row per cap and one column per strike
+    :param array_like strike_values: strikes (one per column of `cap_prices`)
+    :param array_like forward_values: forward rates of the caplet schedule
+    :param array_like time_values: year fractions until fixing dates of the caplet schedule
+    :param array_like year_fractions: year fractions of accrual periods of the caplet schedule
+    :param array_like discount_factors: discount factors to payment dates of the caplet schedule
+    :param array_like cap_lengths: increasing number of caplets of each cap
+        (the first `cap_lengths[i]` caplets of the schedule)
+    :param str model: 'black', 'shifted_black' or 'bachelier'
+    :param float displacement: shift of forwards and strikes of model 'shifted_black'
+    :param bool is_call_bool: caps -> True, floors -> False
+    :param float initial_value: initial volatility of first solve
+        (optional, default 0.2 for Black and 0.01 for Bachelier)
+    :return: tuple(numpy.ndarray) of caplet volatility matrix (caplet x strike)
+        and status matrix (cap x strike)
+
+    Caplet volatilities are piecewise constant between consecutive cap maturities.
+    Caps are stripped in order of their length:
+    the value of the already stripped caplets (the prefix) is kept
+    and only the volatility of the new caplet segment is solved,
+    all strikes at once by :func:`putcall.calibration.implied_volatility.implied_vol_array`
+    starting from the volatilities of the previous segment.
+
+    Status codes are those of `implied_vol_array`.
+    Volatilities of segments which are not solved (and caplets beyond the longest cap) are `nan`.
+    The prefix of a failed segment is carried on by the model value of the previous segment's volatility.
+
+    """
+    (value_function, vega_function, default_vol, upper_bound), displacement = _caplet_model(model, displacement)
+    cap_prices = np.asarray(cap_prices, dtype=float)
+    strike_values = np.atleast_1d(np.asarray(strike_values, dtype=float))
+    if cap_prices.ndim == 1:
+        cap_prices = cap_prices[:, np.newaxis] if strike_values.size == 1 else cap_prices[np.newaxis, :]
+    cap_lengths = np.asarray(cap_lengths, dtype=int)
+    forward_values, time_values, year_fractions, discount_factors = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (forward_values, time_values, year_fractions, discount_factors)))
+    if not cap_prices.shape == (cap_lengths.size, strike_values.size):
+        raise ValueError('Cap prices must be given as matrix with one row per cap and one column per strike.')
+    if not forward_values.ndim == 1 or np.any(np.diff(cap_lengths) <= 0) or cap_lengths[0] < 1 \
+            or forward_values.size < cap_lengths[-1]:
+        raise ValueError('Cap lengths must be increasing and within the caplet schedule.')
+
+    shifted_forwards = forward_values + displacement
+    shifted_strikes = strike_values + displacement
+    annuities = year_fractions * discount_factors
+
+    vols = np.full((forward_values.size, strike_values.size), np.nan)
+    status = np.zeros(cap_prices.shape, dtype=int)
+    prefix = np.zeros(strike_values.size)
+    seed = np.full(strike_values.size, default_vol if initial_value is None else float(initial_value))
+    start = 0
+    for c, stop in enumerate(cap_lengths):
+        f = shifted_forwards[start:stop, np.newaxis]
+        t = time_values[start:stop, np.newaxis]
+        a = annuities[start:stop, np.newaxis]
+
+        def segment_value(v, j):
+            return np.sum(a * value_function(f, shifted_strikes[j], v, t, is_call_bool), axis=0)
+
+        def segment_vega(v, j):
+            return np.sum(a * vega_function(f, shifted_strikes[j], v, t, is_call_bool), axis=0)
+
+        vol, status[c], _ = implied_vol_array(cap_prices[c] - prefix, segment_value, segment_vega, seed,
+                                              upper_bound=upper_bound)
+        solved = (status[c] == CONVERGED) | (status[c] == BISECTION)
+        vols[start:stop] = np.where(solved, vol, np.nan)
+        seed = np.where(solved, vol, seed)
+        prefix = prefix + segment_value(seed, np.arange(strike_values.size))
+        start = stop
+    return vols, status
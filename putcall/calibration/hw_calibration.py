@@ -10,9 +10,19 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
-from putcall.formulas import hw_cap_floor_let
+from itertools import chain
+from multiprocessing.pool import Pool
+from timeit import default_timer
+
+import numpy as np
+
+from putcall.formulas import hw_cap_floor_let_price_and_gradient_array, \
+    hw_bond_volatility_array, hw_cap_floor_let_by_bond_volatility_array
 
 EPS = 1e-12
+MEMORY_BUDGET = 2 ** 26
+TILES_PER_WORKER = 4
+GOLDEN_RATIO = 0.5 * (5 ** 0.5 - 1)
 
 
 def _frange(start, stop=None, step=None):
@@ -34,16 +44,170 @@ def _frange(start, stop=None, step=None):
     return res
 
 
-def _hw_price_dict(price_dict, mean_reversion, volatility, error_func=None):
+def _hw_error_func(error_func=None):
+    # elementwise error function on arrays, scalar functions like math.fabs are vectorized
     if error_func is None:
-        error_func = (lambda x: x * x)
-    error = 0.00
-    for i in range(len(price_dict['strike'])):
-        error += error_func(hw_cap_floor_let(price_dict['forward_values'][i], price_dict['strike'][i], volatility,
-                                             price_dict['time_value'][i], price_dict['bool'][i],
-                                             price_dict['year_fraction'][i], mean_reversion,
-                                             price_dict['discfact'][i]) - price_dict['price'][i])
-    return error
+        return np.square
+    if isinstance(error_func, (np.ufunc, np.vectorize)):
+        return error_func
+    return np.vectorize(error_func, otypes=[float])
+
+
+class HullWhiteCalibrationProblem(object):
+    """
+    cap and floor prices for Hull White calibration as validated numpy columns
+
+    :param price_dict: columns 'forward_values', 'strike', 'time_value', 'bool',
+        'year_fraction', 'discfact' and 'price'
+        as dictionary of lists or of arrays, numpy structured array
+        or any other container of buffer protocol columns
+    :type price_dict: dictionary
+
+    Columns are read once by `numpy.asarray`,
+    so float64 columns (and fields of structured arrays) are not copied.
+    Then objective values, error grids and jacobians are evaluated
+    on these arrays without any Python level loop over caplets.
+
+    Like a price_dict the columns are accessible by their keys.
+
+    """
+    KEYS = 'forward_values', 'strike', 'time_value', 'bool', 'year_fraction', 'discfact', 'price'
+
+    def __init__(self, price_dict):
+        columns = dict()
+        for key in self.KEYS:
+            columns[key] = np.asarray(price_dict[key], dtype=bool if key == 'bool' else float)
+        sizes = set(c.shape for c in columns.values())
+        if not len(sizes) == 1 or not len(sizes.pop()) == 1:
+            raise ValueError("Columns of price_dict must be one dimensional and of same length.")
+        self._columns = columns
+
+    def __getitem__(self, key):
+        return self._columns[key]
+
+    def __len__(self):
+        return len(self._columns['price'])
+
+    def _args(self):
+        c = self._columns
+        return c['forward_values'], c['strike'], c['time_value'], c['bool'], c['year_fraction'], c['discfact']
+
+    def values(self, mean_reversion, volatility):
+        """ model prices of all caplets """
+        forward, strike, time_value, is_call, year_fraction, discount = self._args()
+        bond_vol = hw_bond_volatility_array(volatility, time_value, year_fraction, mean_reversion)
+        return hw_cap_floor_let_by_bond_volatility_array(forward, strike, bond_vol, time_value, is_call,
+                                                         year_fraction, discount)
+
+    def error(self, mean_reversion, volatility, error_func=None):
+        """ aggregated error (error_func applied to each caplet error, default square) """
+        error_func = _hw_error_func(error_func)
+        return float(np.sum(error_func(self.values(mean_reversion, volatility) - self._columns['price'])))
+
+    def errors(self, mean_reversions, volatilities, error_func=None, memory_budget=MEMORY_BUDGET):
+        """ error matrix of a grid of mean reversions (rows) and volatilities (columns) """
+        error_func = _hw_error_func(error_func)
+        forward, strike, time_value, is_call, year_fraction, discount = self._args()
+        mean_reversions = np.asarray(mean_reversions, dtype=float)
+        volatilities = np.asarray(volatilities, dtype=float)
+
+        # mean reversion and tenor dependent terms once per grid row (mean reversion x caplet)
+        bond_vol_factor = hw_bond_volatility_array(1.0, time_value, year_fraction, mean_reversions[:, np.newaxis])
+
+        # mean reversion x volatility x caplet blocks of about memory_budget bytes (with temporaries)
+        size = volatilities.size * len(self)
+        rows = max(1, int(memory_budget // (16 * 8 * max(size, 1))))
+        errors = np.empty((mean_reversions.size, volatilities.size))
+        for start in range(0, mean_reversions.size, rows):
+            bond_vol = bond_vol_factor[start:start + rows, np.newaxis, :] * volatilities[:, np.newaxis]
+            model = hw_cap_floor_let_by_bond_volatility_array(forward, strike, bond_vol, time_value, is_call,
+                                                              year_fraction, discount)
+            errors[start:start + rows] = np.sum(error_func(model - self._columns['price']), axis=-1)
+        return errors
+
+    def residuals_and_jacobian(self, mean_reversion, volatility):
+        """ price errors and their derivatives by mean reversion (first column) and volatility (second) """
+        forward, strike, time_value, is_call, year_fraction, discount = self._args()
+        value, d_mr, d_vol = hw_cap_floor_let_price_and_gradient_array(
+            forward, strike, volatility, time_value, is_call, year_fraction, mean_reversion, discount)
+        return value - self._columns['price'], np.column_stack((d_mr, d_vol))
+
+
+def hw_calibration_problem(price_dict):
+    """
+    :param price_dict: price_dict or columnar container (see `HullWhiteCalibrationProblem`)
+    :return: HullWhiteCalibrationProblem (`price_dict` itself if it is one already)
+    """
+    if isinstance(price_dict, HullWhiteCalibrationProblem):
+        return price_dict
+    return HullWhiteCalibrationProblem(price_dict)
+
+
+_hw_worker = dict()
+
+
+def _hw_worker_init(problem, error_func):
+    # installs problem and error function once per worker process
+    _hw_worker['problem'] = problem
+    _hw_worker['error_func'] = _hw_error_func(error_func)
+
+
+def _hw_worker_errors(points):
+    problem, error_func = _hw_worker['problem'], _hw_worker['error_func']
+    return [problem.error(mr, vol, error_func) for mr, vol in points]
+
+
+class HullWhiteCalibrationExecutor(Pool):
+    """
+    process pool to evaluate Hull White calibration grids in parallel
+
+    :param price_dict: contains prices as a price_dict
+    :type price_dict: dictionary
+    :param n_workers: number of worker processes (optional, default number of processors)
+    :type n_workers: int
+    :param error_func: function to aggregate errors (must be picklable)
+    :type error_func: function
+
+    `price_dict` (as `HullWhiteCalibrationProblem`) and `error_func`
+    are installed once in each worker process when it starts,
+    so tasks carry only tiles of grid points.
+    The executor serves only calibrations of this `price_dict` but can be reused by them.
+    Used as context manager it is shut down on exit.
+
+    """
+
+    def __init__(self, price_dict, n_workers=None, error_func=None):
+        problem = hw_calibration_problem(price_dict)
+        super(HullWhiteCalibrationExecutor, self).__init__(n_workers, _hw_worker_init, (problem, error_func))
+        self.price_dict = price_dict
+        self.problem = problem
+        self.error_func = error_func
+        self.n_workers = self._processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def shutdown(self):
+        """ waits for pending tasks and stops worker processes """
+        self.close()
+        self.join()
+
+
+def _hw_executor(price_dict, executor=None, n_workers=None, error_func=None):
+    # returns executor and whether it has to be shut down by caller
+    if executor is None:
+        if n_workers:
+            return HullWhiteCalibrationExecutor(price_dict, n_workers, error_func), True
+        return None, False
+    if not isinstance(executor, HullWhiteCalibrationExecutor):
+        raise ValueError("Executor must be a HullWhiteCalibrationExecutor.")
+    if price_dict is not executor.price_dict and price_dict is not executor.problem \
+            or executor.error_func is not error_func:
+        raise ValueError("Executor has been set up for another price_dict or error_func.")
+    return executor, False
 
 
 def binary_vol_hw_calibration_cap_floor(price_dict,
@@ -52,7 +216,9 @@ def binary_vol_hw_calibration_cap_floor(price_dict,
                                         mean_reversion_step=0.0001,
                                         volatility_start=0.0001,
                                         volatility_stop=0.01,
-                                        volatility_step=0.0001):
+                                        volatility_step=0.0001,
+                                        executor=None,
+                                        n_workers=None):
     """
     Binary search based calibration of the Hull White model using caps and floors
 
@@ -70,6 +236,11 @@ def binary_vol_hw_calibration_cap_floor(price_dict,
     :type volatility_stop: real
     :param volatility_step: step for the volatility optimisation loop
     :type volatility_step: real
+    :param executor: process pool to evaluate grids in parallel
+        (optional, see `brute_hw_calibration_cap_floor`)
+    :type executor: HullWhiteCalibrationExecutor
+    :param n_workers: number of worker processes if no executor is given (optional)
+    :type n_workers: int
     :return: optimal mean reversion, optimal volatility, vector of errors
     :rtype: list(list())
 
@@ -84,23 +255,31 @@ def binary_vol_hw_calibration_cap_floor(price_dict,
         threshold_vol mean_reversion_stop on the vola
         mean_reversion_stop is the mean_reversion_stop on the mean revertion
 
+    Raises `ValueError` if the error keeps decreasing up to the end of the search range.
+
     """
     if not 0.0 <= mean_reversion_start <= mean_reversion_stop and not mean_reversion_step > 0.0:
         raise AssertionError("Mean reversion either negative or greater expected or negative step.")
     if not 0.0 <= volatility_start <= volatility_stop and not volatility_step > 0.0:
         raise AssertionError("Volatility either negative or greater expected or negative step.")
 
-    last = [None, None, None]
-    for vol in _frange(volatility_start, volatility_stop + volatility_step, volatility_step):
-        res = brute_hw_calibration_cap_floor(price_dict,
-                                             mean_reversion_start, mean_reversion_stop, mean_reversion_step,
-                                             vol, vol, volatility_step)
-        if last[2] is None or last[2] > res[2]:
-            last = res
-        else:
-            return last
-    print('Mean reversion calibration of Hull White failed.')
-    return last
+    executor, shutdown = _hw_executor(price_dict, executor, n_workers)
+    price_dict = hw_calibration_problem(price_dict) if executor is None else executor.problem
+    try:
+        last = [None, None, None]
+        for vol in _frange(volatility_start, volatility_stop + volatility_step, volatility_step):
+            res = brute_hw_calibration_cap_floor(price_dict,
+                                                 mean_reversion_start, mean_reversion_stop, mean_reversion_step,
+                                                 vol, vol, volatility_step, executor=executor)
+            if last[2] is None or last[2] > res[2]:
+                last = res
+            else:
+                return last
+        raise ValueError('Volatility calibration of Hull White failed.')
+        return last
+    finally:
+        if shutdown:
+            executor.shutdown()
 
 
 def binary_mr_hw_calibration_cap_floor(price_dict,
@@ -109,7 +288,9 @@ def binary_mr_hw_calibration_cap_floor(price_dict,
                                        mean_reversion_step=0.0001,
                                        volatility_start=0.0001,
                                        volatility_stop=0.01,
-                                       volatility_step=0.0001):
+                                       volatility_step=0.0001,
+                                       executor=None,
+                                       n_workers=None):
     """
     Binary search based calibration of the Hull White model using caps and floors
 
@@ -127,6 +308,11 @@ def binary_mr_hw_calibration_cap_floor(price_dict,
     :type volatility_stop: real
     :param volatility_step: step for the volatility optimisation loop
     :type volatility_step: real
+    :param executor: process pool to evaluate grids in parallel
+        (optional, see `brute_hw_calibration_cap_floor`)
+    :type executor: HullWhiteCalibrationExecutor
+    :param n_workers: number of worker processes if no executor is given (optional)
+    :type n_workers: int
     :return: optimal mean reversion, optimal volatility, vector of errors
     :rtype: list(list())
 
@@ -141,23 +327,32 @@ def binary_mr_hw_calibration_cap_floor(price_dict,
         threshold_vol mean_reversion_stop on the vola
         mean_reversion_stop is the mean_reversion_stop on the mean revertion
 
+    Raises `ValueError` if the error keeps decreasing up to the end of the search range.
+
     """
     if not 0.0 <= mean_reversion_start <= mean_reversion_stop and not mean_reversion_step > 0.0:
         raise AssertionError("Mean reversion either negative or greater expected or negative step.")
     if not 0.0 <= volatility_start <= volatility_stop and not volatility_step > 0.0:
         raise AssertionError("Volatility either negative or greater expected or negative step.")
 
-    last = [None, None, None]
-    for mr in _frange(mean_reversion_start, mean_reversion_stop + mean_reversion_step, mean_reversion_step):
-        res = binary_vol_hw_calibration_cap_floor(price_dict,
-                                                  mr, mr, mean_reversion_step,
-                                                  volatility_start, volatility_stop, volatility_step)
-        if last[2] is None or last[2] > res[2]:
-            last = res
-        else:
-            return last
-    print('Mean reversion calibration of Hull White failed.')
-    return last
+    executor, shutdown = _hw_executor(price_dict, executor, n_workers)
+    price_dict = hw_calibration_problem(price_dict) if executor is None else executor.problem
+    try:
+        last = [None, None, None]
+        for mr in _frange(mean_reversion_start, mean_reversion_stop + mean_reversion_step, mean_reversion_step):
+            res = binary_vol_hw_calibration_cap_floor(price_dict,
+                                                      mr, mr, mean_reversion_step,
+                                                      volatility_start, volatility_stop, volatility_step,
+                                                      executor=executor)
+            if last[2] is None or last[2] > res[2]:
+                last = res
+            else:
+                return last
+        raise ValueError('Mean reversion calibration of Hull White failed.')
+        return last
+    finally:
+        if shutdown:
+            executor.shutdown()
 
 
 def brute_hw_calibration_cap_floor(price_dict,
@@ -167,7 +362,9 @@ def brute_hw_calibration_cap_floor(price_dict,
                                    volatility_start=0.0001,
                                    volatility_stop=0.01,
                                    volatility_step=0.0001,
-                                   error_func=None):
+                                   error_func=None,
+                                   executor=None,
+                                   n_workers=None):
     """
     Brute force based calibration of the Hull White model using caps and floors
 
@@ -187,11 +384,21 @@ def brute_hw_calibration_cap_floor(price_dict,
     :type volatility_step: float
     :param error_func: function to aggregate errors
     :type error_func: function
+    :param executor: process pool to evaluate the grid in parallel (optional)
+    :type executor: HullWhiteCalibrationExecutor
+    :param n_workers: number of worker processes if no executor is given (optional)
+    :type n_workers: int
     :return: optimal mean reversion, optimal volatility, corresponding error
 
     calculates the error for different choices of mean rev and volatility
     which will make it possible for the user to pick the values for which the error is minimal
 
+    Given an `executor` or `n_workers` the grid is split into tiles
+    which are evaluated by worker processes.
+    The result is identical to the serial one regardless of the number of workers.
+    An executor created by `HullWhiteCalibrationExecutor(price_dict, n_workers, error_func)`
+    can be reused for many calibrations of the same `price_dict`.
+
     remarks:
         price_dict is a dictionary s.t.:
         price_dict['time_value'] contains the year fractions between start date and maturity
@@ -209,16 +416,439 @@ def brute_hw_calibration_cap_floor(price_dict,
     if not 0.0 <= volatility_start <= volatility_stop and not volatility_step > 0.0:
         raise AssertionError("Volatility either negative or greater expected or negative step.")
 
-    mean_reversion_opt = None
-    volatility_opt = None
-    error_opt = None
+    points = list()
     for mr in _frange(mean_reversion_start, mean_reversion_stop + mean_reversion_step, mean_reversion_step):
         mr = EPS if mr == 0.00 else mr
         for vol in _frange(volatility_start, volatility_stop + volatility_step, volatility_step):
             vol = EPS if vol == 0.00 else vol
-            err = _hw_price_dict(price_dict, mr, vol, error_func)
+            points.append((mr, vol))
+
+    executor, shutdown = _hw_executor(price_dict, executor, n_workers, error_func)
+    try:
+        if executor is None:
+            problem = hw_calibration_problem(price_dict)
+            errors = (problem.error(mr, vol, error_func) for mr, vol in points)
+        else:
+            # row major tiles of the grid in order
+            size = max(1, -(-len(points) // (TILES_PER_WORKER * executor.n_workers)))
+            tiles = [points[i:i + size] for i in range(0, len(points), size)]
+            errors = chain.from_iterable(executor.imap(_hw_worker_errors, tiles))
+
+        mean_reversion_opt = None
+        volatility_opt = None
+        error_opt = None
+        for (mr, vol), err in zip(points, errors):
             if error_opt is None or error_opt > err:
                 mean_reversion_opt = mr
                 volatility_opt = vol
                 error_opt = err
-    return [mean_reversion_opt, volatility_opt, error_opt]
+        return [mean_reversion_opt, volatility_opt, error_opt]
+    finally:
+        if shutdown:
+            executor.shutdown()
+
+
+def lm_hw_calibration_cap_floor(price_dict,
+                                mean_reversion_start=0.01,
+                                volatility_start=0.005,
+                                tolerance=1e-10,
+                                max_iterations=100):
+    """
+    Levenberg-Marquardt calibration of the Hull White model using caps and floors
+
+    :param price_dict: contains prices as a price_dict
+    :type price_dict: dictionary
+    :param mean_reversion_start: initial mean reversion
+    :type mean_reversion_start: float
+    :param volatility_start: initial volatility
+    :type volatility_start: float
+    :param tolerance: relative tolerance of parameters and of error
+    :type tolerance: float
+    :param max_iterations: maximal number of iterations
+    :type max_iterations: int
+    :return: optimal mean reversion, optimal volatility, corresponding error, number of iterations, seconds
+
+    minimizes the sum of squared price errors
+    (same as the default `error_func` of `brute_hw_calibration_cap_floor`)
+    by Levenberg-Marquardt steps with analytic derivatives of `hw_cap_floor_let`
+    with respect to mean reversion and volatility
+    (see `hw_cap_floor_let_price_and_gradient_array`).
+    Parameters are kept positive.
+
+    remarks:
+        price_dict is a dictionary s.t.:
+        price_dict['time_value'] contains the year fractions between start date and maturity
+        price_dict['year_fraction'] contains the year fractions between start and maturity
+        price_dict['forward_values'] contains the rate forward values
+        price_dict['price'] price of the lets
+        price_dict['strike'] list of strikes
+        price_dict['bool'] list of booleans (True if call False if put)
+
+    """
+    if not 0.0 < mean_reversion_start:
+        raise AssertionError("Mean reversion start must be positive.")
+    if not 0.0 < volatility_start:
+        raise AssertionError("Volatility start must be positive.")
+
+    start = default_timer()
+    problem = hw_calibration_problem(price_dict)
+    mr, vol = mean_reversion_start, volatility_start
+    residuals, jacobian = problem.residuals_and_jacobian(mr, vol)
+    error = float(np.dot(residuals, residuals))
+    damping = 1e-3
+    iteration = 0
+    while iteration < max_iterations and error > 0.0:
+        iteration += 1
+        # normal equations (J^T J + damping diag(J^T J)) step = - J^T r
+        (a, b), (_, c) = np.dot(jacobian.T, jacobian)
+        g_mr, g_vol = np.dot(jacobian.T, residuals)
+        accepted = False
+        while not accepted and damping < 1e16:
+            a_d, c_d = a * (1.0 + damping), c * (1.0 + damping)
+            det = a_d * c_d - b * b
+            if not det > 0.0:
+                damping *= 10.0
+                continue
+            step_mr = -(c_d * g_mr - b * g_vol) / det
+            step_vol = -(a_d * g_vol - b * g_mr) / det
+            new_mr, new_vol = max(mr + step_mr, EPS), max(vol + step_vol, EPS)
+            new_residuals, new_jacobian = problem.residuals_and_jacobian(new_mr, new_vol)
+            new_error = float(np.dot(new_residuals, new_residuals))
+            if new_error < error:
+                accepted = True
+                damping = max(damping / 10.0, 1e-12)
+            else:
+                damping *= 10.0
+        if not accepted:
+            break
+        small_step = abs(new_mr - mr) <= tolerance * mr and abs(new_vol - vol) <= tolerance * vol
+        small_gain = error - new_error <= tolerance * error
+        mr, vol, error, residuals, jacobian = new_mr, new_vol, new_error, new_residuals, new_jacobian
+        if small_step or small_gain:
+            break
+    return [float(mr), float(vol), error, iteration, default_timer() - start]
+
+
+def _hw_grid(start, stop, step):
+    grid = np.array(_frange(start, stop + step, step), dtype=float)
+    return np.where(grid == 0.0, EPS, grid)
+
+
+def grid_hw_calibration_cap_floor(price_dict,
+                                  mean_reversion_start=0.00,
+                                  mean_reversion_stop=0.01,
+                                  mean_reversion_step=0.0001,
+                                  volatility_start=0.0001,
+                                  volatility_stop=0.01,
+                                  volatility_step=0.0001,
+                                  error_func=None,
+                                  memory_budget=MEMORY_BUDGET):
+    """
+    Brute force calibration of the Hull White model using caps and floors evaluating the whole grid at once
+
+    :param price_dict: contains prices as a price_dict
+    :type price_dict: dictionary
+    :param mean_reversion_start: mean reversion starting point
+    :type mean_reversion_start: float
+    :param mean_reversion_stop: mean reversion threshold
+    :type mean_reversion_stop: float
+    :param mean_reversion_step: mean reversion step
+    :type mean_reversion_step: float
+    :param volatility_start: volatility starting point
+    :type volatility_start: float
+    :param volatility_stop: volatility reversion threshold
+    :type volatility_stop: float
+    :param volatility_step: volatility reversion step
+    :type volatility_step: float
+    :param error_func: function to aggregate errors (applied to each caplet error)
+    :type error_func: function
+    :param memory_budget: approximate memory in bytes used per block of the grid
+    :type memory_budget: int
+    :return: optimal mean reversion, optimal volatility, corresponding error, error matrix
+
+    same grid and same optimum as `brute_hw_calibration_cap_floor`
+    but all caplets of all grid points are priced as numpy arrays
+    in blocks of mean reversion rows fitting into `memory_budget`.
+    The error matrix has one row per mean reversion and one column per volatility of the grid.
+
+    remarks:
+        price_dict is a dictionary s.t.:
+        price_dict['time_value'] contains the year fractions between start date and maturity
+        price_dict['year_fraction'] contains the year fractions between start and maturity
+        price_dict['forward_values'] contains the rate forward values
+        price_dict['price'] price of the lets
+        price_dict['strike'] list of strikes
+        price_dict['bool'] list of booleans (True if call False if put)
+
+    """
+    if not 0.0 <= mean_reversion_start <= mean_reversion_stop and not mean_reversion_step > 0.0:
+        raise AssertionError("Mean reversion either negative or greater expected or negative step.")
+    if not 0.0 <= volatility_start <= volatility_stop and not volatility_step > 0.0:
+        raise AssertionError("Volatility either negative or greater expected or negative step.")
+
+    mean_reversions = _hw_grid(mean_reversion_start, mean_reversion_stop, mean_reversion_step)
+    volatilities = _hw_grid(volatility_start, volatility_stop, volatility_step)
+    errors = hw_calibration_problem(price_dict).errors(mean_reversions, volatilities, error_func, memory_budget)
+    i, j = np.unravel_index(np.argmin(errors), errors.shape)
+    return [float(mean_reversions[i]), float(volatilities[j]), float(errors[i, j]), errors]
+
+
+def _golden_section(function, lower, upper, tolerance):
+    # golden section search for a minimum of function within [lower, upper]
+    x1 = upper - GOLDEN_RATIO * (upper - lower)
+    x2 = lower + GOLDEN_RATIO * (upper - lower)
+    f1, f2 = function(x1), function(x2)
+    while upper - lower > tolerance:
+        if f1 <= f2:
+            upper, x2, f2 = x2, x1, f1
+            x1 = upper - GOLDEN_RATIO * (upper - lower)
+            f1 = function(x1)
+        else:
+            lower, x1, f1 = x1, x2, f2
+            x2 = lower + GOLDEN_RATIO * (upper - lower)
+            f2 = function(x2)
+    return (x1, f1) if f1 <= f2 else (x2, f2)
+
+
+def golden_hw_calibration_cap_floor(price_dict,
+                                    mean_reversion_start=0.0,
+                                    mean_reversion_stop=0.01,
+                                    volatility_start=0.0001,
+                                    volatility_stop=0.01,
+                                    mean_reversion_tolerance=1e-6,
+                                    volatility_tolerance=1e-8,
+                                    max_iterations=100,
+                                    error_func=None):
+    """
+    Coordinate descent calibration of the Hull White model using caps and floors by golden section search
+
+    :param price_dict: contains prices as a price_dict
+    :type price_dict: dictionary
+    :param mean_reversion_start: lower bound of mean reversion
+    :type mean_reversion_start: float
+    :param mean_reversion_stop: upper bound of mean reversion
+    :type mean_reversion_stop: float
+    :param volatility_start: lower bound of volatility
+    :type volatility_start: float
+    :param volatility_stop: upper bound of volatility
+    :type volatility_stop: float
+    :param mean_reversion_tolerance: absolute tolerance of mean reversion
+    :type mean_reversion_tolerance: float
+    :param volatility_tolerance: absolute tolerance of volatility
+    :type volatility_tolerance: float
+    :param max_iterations: maximal number of coordinate descent cycles
+    :type max_iterations: int
+    :param error_func: function to aggregate errors
+    :type error_func: function
+    :return: optimal mean reversion, optimal volatility, corresponding error
+
+    alternates golden section searches for the volatility (at fixed mean reversion)
+    and for the mean reversion (at fixed volatility) within the bounds
+    until neither moves by more than its tolerance.
+    Each search takes about log(range / tolerance) / log(1.618) error evaluations.
+    Since mean reversion and volatility are strongly correlated,
+    each cycle ends with a search along its total move
+    and the next cycle searches close to the current point first.
+
+    remarks:
+        price_dict is a dictionary s.t.:
+        price_dict['time_value'] contains the year fractions between start date and maturity
+        price_dict['year_fraction'] contains the year fractions between start and maturity
+        price_dict['forward_values'] contains the rate forward values
+        price_dict['price'] price of the lets
+        price_dict['strike'] list of strikes
+        price_dict['bool'] list of booleans (True if call False if put)
+
+    """
+    if not 0.0 <= mean_reversion_start <= mean_reversion_stop:
+        raise AssertionError("Mean reversion either negative or greater expected.")
+    if not 0.0 <= volatility_start <= volatility_stop:
+        raise AssertionError("Volatility either negative or greater expected.")
+
+    problem = hw_calibration_problem(price_dict)
+    mean_reversion_start, volatility_start = max(mean_reversion_start, EPS), max(volatility_start, EPS)
+    mr = 0.5 * (mean_reversion_start + mean_reversion_stop)
+    vol = 0.5 * (volatility_start + volatility_stop)
+    # half widths of the search brackets around the current point (first the whole range)
+    w_mr, w_vol = mean_reversion_stop - mean_reversion_start, volatility_stop - volatility_start
+    err = None
+    for _ in range(max_iterations):
+        last_mr, last_vol = mr, vol
+        vol, err = _golden_bracket((lambda x: problem.error(mr, x, error_func)),
+                                   vol, w_vol, volatility_start, volatility_stop, volatility_tolerance)
+        mr, err = _golden_bracket((lambda x: problem.error(x, vol, error_func)),
+                                  mr, w_mr, mean_reversion_start, mean_reversion_stop, mean_reversion_tolerance)
+        d_mr, d_vol = mr - last_mr, vol - last_vol
+        if abs(d_mr) <= mean_reversion_tolerance and abs(d_vol) <= volatility_tolerance:
+            break
+        # pattern move along the cycle's displacement (as in Powell's method) to follow the valley
+        # of correlated mean reversion and volatility, t in [lower, upper] keeps the bounds
+        lower, upper = _hw_line_bounds(mr, d_mr, mean_reversion_start, mean_reversion_stop)
+        lower, upper = _hw_line_bounds(vol, d_vol, volatility_start, volatility_stop, lower, upper)
+        tolerance = min(mean_reversion_tolerance / abs(d_mr) if d_mr else float('inf'),
+                        volatility_tolerance / abs(d_vol) if d_vol else float('inf'))
+        t, t_err = _golden_bracket((lambda x: problem.error(mr + x * d_mr, vol + x * d_vol, error_func)),
+                                   0.0, 4.0, lower, upper, tolerance)
+        if t_err < err:
+            mr, vol, err = mr + t * d_mr, vol + t * d_vol, t_err
+        w_mr = 4.0 * max(abs(mr - last_mr), mean_reversion_tolerance)
+        w_vol = 4.0 * max(abs(vol - last_vol), volatility_tolerance)
+    return [mr, vol, err]
+
+
+def _golden_bracket(function, x, width, lower, upper, tolerance):
+    # golden section search within [x - width, x + width] and within [lower, upper]
+    # but over the whole [lower, upper] if the minimum is found at an inner edge of the bracket
+    a, b = max(lower, x - width), min(upper, x + width)
+    x, fx = _golden_section(function, a, b, tolerance)
+    if (lower < a and x - a <= tolerance) or (b < upper and b - x <= tolerance):
+        x, fx = _golden_section(function, lower, upper, tolerance)
+    return x, fx
+
+
+def _hw_line_bounds(x, dx, start, stop, lower=-float('inf'), upper=float('inf')):
+    # range of t with start <= x + t * dx <= stop
+    if dx > 0.0:
+        return max(lower, (start - x) / dx), min(upper, (stop - x) / dx)
+    if dx < 0.0:
+        return max(lower, (stop - x) / dx), min(upper, (start - x) / dx)
+    return lower, upper
+
+
+class HullWhiteCalibrationState(object):
+    """
+    persistent state of repeated Hull White calibrations (e.g. daily reruns) per curve or index
+
+    :param mean_reversion_start: lower bound of mean reversion of full search
+    :type mean_reversion_start: float
+    :param mean_reversion_stop: upper bound of mean reversion of full search
+    :type mean_reversion_stop: float
+    :param volatility_start: lower bound of volatility of full search
+    :type volatility_start: float
+    :param volatility_stop: upper bound of volatility of full search
+    :type volatility_stop: float
+    :param mean_reversion_width: half width of the mean reversion bracket around the last optimum
+    :type mean_reversion_width: float
+    :param volatility_width: half width of the volatility bracket around the last optimum
+    :type volatility_width: float
+    :param error_ratio: maximal ratio of new and last error accepted without full search
+    :type error_ratio: float
+    :param error_tolerance: errors below are accepted without full search
+    :type error_tolerance: float
+    :param records: records of a previous state (optional, see `records`)
+    :type records: dict
+
+    `calibrate` starts from the last optimum of the same key
+    by `lm_hw_calibration_cap_floor`, which takes only a few steps
+    (or, given an `error_func`, by `golden_hw_calibration_cap_floor` within a narrow bracket around it).
+    It falls back to the full search by `golden_hw_calibration_cap_floor` within the bounds
+    if there is no last optimum, if the new optimum lies outside or on an inner edge of the bracket
+    or if the error exceeds `error_ratio` times the last error (and `error_tolerance`).
+    The better of both results is kept.
+
+    `records` is a plain dictionary of the last optimum, bracket and diagnostics by key,
+    so it can be stored (e.g. by json or pickle) and passed to a new state the next day.
+
+    """
+
+    def __init__(self,
+                 mean_reversion_start=0.0,
+                 mean_reversion_stop=0.01,
+                 volatility_start=0.0001,
+                 volatility_stop=0.01,
+                 mean_reversion_width=0.001,
+                 volatility_width=0.0005,
+                 error_ratio=4.0,
+                 error_tolerance=1e-16,
+                 records=None):
+        if not 0.0 <= mean_reversion_start <= mean_reversion_stop:
+            raise AssertionError("Mean reversion either negative or greater expected.")
+        if not 0.0 <= volatility_start <= volatility_stop:
+            raise AssertionError("Volatility either negative or greater expected.")
+        self.bounds = mean_reversion_start, mean_reversion_stop, volatility_start, volatility_stop
+        self.widths = mean_reversion_width, volatility_width
+        self.error_ratio = error_ratio
+        self.error_tolerance = error_tolerance
+        self.records = dict() if records is None else dict(records)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __len__(self):
+        return len(self.records)
+
+    def keys(self):
+        return self.records.keys()
+
+    def bracket(self, key=None):
+        """ narrow bracket around the last optimum of `key` (full bounds if none) """
+        mean_reversion_start, mean_reversion_stop, volatility_start, volatility_stop = self.bounds
+        if key not in self.records:
+            return self.bounds
+        mr, vol = self.records[key]['mean_reversion'], self.records[key]['volatility']
+        w_mr, w_vol = self.widths
+        return (max(mean_reversion_start, mr - w_mr), min(mean_reversion_stop, mr + w_mr),
+                max(volatility_start, vol - w_vol), min(volatility_stop, vol + w_vol))
+
+    def calibrate(self, price_dict, key=None, error_func=None, mean_reversion_tolerance=1e-6,
+                  volatility_tolerance=1e-8, max_iterations=100):
+        """
+        calibrates `price_dict` starting from the state of `key` and updates it
+
+        :param price_dict: contains prices as a price_dict
+        :type price_dict: dictionary
+        :param key: curve or index of `price_dict`
+        :type key: hashable
+        :param error_func: function to aggregate errors
+        :type error_func: function
+        :param mean_reversion_tolerance: absolute tolerance of mean reversion
+        :type mean_reversion_tolerance: float
+        :param volatility_tolerance: absolute tolerance of volatility
+        :type volatility_tolerance: float
+        :param max_iterations: maximal number of coordinate descent cycles
+        :type max_iterations: int
+        :return: optimal mean reversion, optimal volatility, corresponding error
+        """
+        start = default_timer()
+        problem = hw_calibration_problem(price_dict)
+        tolerances = mean_reversion_tolerance, volatility_tolerance, max_iterations, error_func
+        last = self.records.get(key)
+        bracket = self.bracket(key)
+        if last is None:
+            res = golden_hw_calibration_cap_floor(problem, *(bracket + tolerances))
+        elif error_func is None:
+            res = lm_hw_calibration_cap_floor(problem, max(last['mean_reversion'], EPS),
+                                              max(last['volatility'], EPS))[:3]
+        else:
+            res = golden_hw_calibration_cap_floor(problem, *(bracket + tolerances))
+
+        fallback = last is None
+        if not fallback:
+            mr, vol, err = res
+            mr_lower, mr_upper, vol_lower, vol_upper = bracket
+            mean_reversion_start, mean_reversion_stop, volatility_start, volatility_stop = self.bounds
+            fallback = (mean_reversion_start < mr_lower and mr - mr_lower <= 2 * mean_reversion_tolerance) or \
+                       (mr_upper < mean_reversion_stop and mr_upper - mr <= 2 * mean_reversion_tolerance) or \
+                       (volatility_start < vol_lower and vol - vol_lower <= 2 * volatility_tolerance) or \
+                       (vol_upper < volatility_stop and vol_upper - vol <= 2 * volatility_tolerance) or \
+                       not (mr_lower <= mr <= mr_upper and vol_lower <= vol <= vol_upper) or \
+                       err > max(self.error_ratio * last['error'], self.error_tolerance)
+            if fallback:
+                full = golden_hw_calibration_cap_floor(problem, *(self.bounds + tolerances))
+                res = full if full[2] < err else res
+
+        mr, vol, err = res
+        self.records[key] = {
+            'mean_reversion': mr,
+            'volatility': vol,
+            'error': err,
+            'bracket': self.bounds if last is None else bracket,
+            'fallback': fallback,
+            'seconds': default_timer() - start,
+            'calibrations': 1 if last is None else last['calibrations'] + 1,
+            'fallbacks': (0 if last is None else last['fallbacks'] + int(fallback)),
+        }
+        return res
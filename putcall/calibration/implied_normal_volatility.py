@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+from math import log, sqrt, pi
+
+import numpy as np
+
+from putcall.formulas.normal_distribution import normal_cdf, normal_density, normal_cdf_array, \
+    normal_density_array, ACCURATE
+
+SQRT_TWO_PI = sqrt(2.0 * pi)
+ONE_OVER_SQRT_TWO_PI = 1.0 / SQRT_TWO_PI
+PHI_TILDE_STAR_THRESHOLD = -0.001882039271
+
+
+def _phi_tilde_inverse_guess(phi_tilde_star):
+    # rational approximation of the inverse of Phi(x) + phi(x) / x
+    if phi_tilde_star < PHI_TILDE_STAR_THRESHOLD:
+        g = 1.0 / (phi_tilde_star - 0.5)
+        g2 = g * g
+        xi = (0.032114372355 - g2 * (0.016969777977 - g2 * (0.0026207332461 - 0.000096066952861 * g2))) / \
+             (1.0 - g2 * (0.6635646938 - g2 * (0.14528712196 - 0.010472855461 * g2)))
+        return g * (ONE_OVER_SQRT_TWO_PI + xi * g2)
+    h = sqrt(-log(-phi_tilde_star))
+    return (9.4883409779 - h * (9.6320903635 - h * (0.58556997323 + 2.1464093351 * h))) / \
+           (1.0 - h * (0.65174820867 + h * (1.5120247828 + 0.000066437847132 * h)))
+
+
+def _householder_correction(x, q):
+    # third order correction step of the rational guess
+    return x + 3.0 * q * x * x * (2.0 - q * x * (2.0 + x * x)) / \
+        (6.0 + q * x * (-12.0 + x * (6.0 * q + x * (-6.0 + q * x * (3.0 + x * x)))))
+
+
+def bachelier_implied_vol(price_value, forward_value, strike_value, time_value, is_call_bool):
+    """
+    implied normal volatility of the Bachelier formula
+
+    :param float price_value: undiscounted option price
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float implied volatility
+
+    P. Jäckel's rational approximation of the inverse of
+    :math:`\\tilde{\\Phi}(x) = \\Phi(x) + \\phi(x) / x`
+    followed by one Householder(3) step gives the implied volatility
+    close to machine precision without any iteration,
+    see P. Jäckel, *Implied Normal Volatility*, Wilmott, 2017, pp. 54-57.
+
+    Prices below the intrinsic value raise a `ValueError`.
+
+    """
+    q = 1.0 if is_call_bool else -1.0
+    fms = forward_value - strike_value
+    intrinsic = max(q * fms, 0.0)
+    if price_value < intrinsic:
+        raise ValueError('Price %s below intrinsic value %s.' % (str(price_value), str(intrinsic)))
+    if price_value == intrinsic:
+        return 0.0
+    if not time_value > 0.0:
+        raise ValueError('Price %s above intrinsic value %s at expiry.' % (str(price_value), str(intrinsic)))
+    if fms == 0.0:
+        return price_value * SQRT_TWO_PI / sqrt(time_value)
+    # time value of the out-of-the-money option relative to |F - K|
+    phi_tilde_star = -abs(price_value - intrinsic) / abs(fms)
+    x = _phi_tilde_inverse_guess(phi_tilde_star)
+    density = normal_density(x)
+    q = (normal_cdf(x, ACCURATE) + density / x - phi_tilde_star) / density
+    x = _householder_correction(x, q)
+    return abs(fms) / (abs(x) * sqrt(time_value))
+
+
+def bachelier_implied_vol_array(price_value, forward_value, strike_value, time_value, is_call_bool):
+    """
+    implied normal volatility of the Bachelier formula for arrays
+
+    :param array_like price_value: undiscounted option prices
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Array version of `bachelier_implied_vol`. All arguments are broadcast against each other.
+    Instead of raising an error, prices below the intrinsic value give `nan`.
+
+    """
+    price_value = np.asarray(price_value, dtype=float)
+    time_value = np.asarray(time_value, dtype=float)
+    fms = np.asarray(forward_value, dtype=float) - np.asarray(strike_value, dtype=float)
+    intrinsic = np.maximum(np.where(is_call_bool, fms, -fms), 0.0)
+    abs_fms = np.abs(fms)
+    atm = abs_fms == 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        phi_tilde_star = -np.abs(price_value - intrinsic) / np.where(atm, 1.0, abs_fms)
+        phi_tilde_star = np.minimum(phi_tilde_star, -np.finfo(float).tiny)
+        # rational guess in two branches
+        g = 1.0 / (phi_tilde_star - 0.5)
+        g2 = g * g
+        xi = (0.032114372355 - g2 * (0.016969777977 - g2 * (0.0026207332461 - 0.000096066952861 * g2))) / \
+             (1.0 - g2 * (0.6635646938 - g2 * (0.14528712196 - 0.010472855461 * g2)))
+        x_low = g * (ONE_OVER_SQRT_TWO_PI + xi * g2)
+        h = np.sqrt(-np.log(-phi_tilde_star))
+        x_high = (9.4883409779 - h * (9.6320903635 - h * (0.58556997323 + 2.1464093351 * h))) / \
+                 (1.0 - h * (0.65174820867 + h * (1.5120247828 + 0.000066437847132 * h)))
+        x = np.where(phi_tilde_star < PHI_TILDE_STAR_THRESHOLD, x_low, x_high)
+        density = normal_density_array(x)
+        q = (normal_cdf_array(x, ACCURATE) + density / x - phi_tilde_star) / density
+        x = _householder_correction(x, q)
+        vol = np.where(atm, price_value * SQRT_TWO_PI, abs_fms / np.abs(x)) / np.sqrt(time_value)
+    vol = np.where(price_value == intrinsic, 0.0, vol)
+    return np.where(price_value < intrinsic, np.nan, vol)
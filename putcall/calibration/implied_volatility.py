@@ -10,9 +10,13 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
+import numpy as np
+
 from mathtoolspy import Optimizer1Dim, Constraint
 from mathtoolspy.solver.minimize_algorithm_1dim_brent import minimize_algorithm_1dim_brent as brent
 
+CONVERGED, BISECTION, MAX_ITERATIONS, NO_BRACKET = 0, 1, 2, 3
+
 
 class OptionValueByVolatility:
     def __init__(self, option_value_function, forward, strike, time, option_type, discount_factor=1.0):
@@ -60,3 +64,176 @@ class ImpliedVolCalculator:
             price = self.option_value(vol)
             diff = price - self.price
             return abs(diff)
+
+
+def implied_vol_array(price_value, value_function, vega_function, initial_value=0.2,
+                      lower_bound=0.0, upper_bound=ImpliedVolCalculator.MAX_VOL_FOR_IMPLIED_VOL,
+                      tolerance=1e-12, max_iterations=20, max_bisections=100):
+    """
+    batch implied volatility solver for arrays of prices
+
+    :param array_like price_value: one dimensional array of option prices
+    :param function value_function: `value_function(vol, index)` returns the option values
+        of the elements `index` (integer array) for volatilities `vol`
+    :param function vega_function: `vega_function(vol, index)` returns the option vegas
+        of the elements `index` (integer array) for volatilities `vol`
+    :param array_like initial_value: initial volatilities
+    :param float lower_bound: lower bound of volatilities
+    :param float upper_bound: upper bound of volatilities
+    :param float tolerance: volatility tolerance
+    :param int max_iterations: maximal number of Newton steps
+    :param int max_bisections: maximal number of bisection steps
+    :return: tuple(numpy.ndarray) of volatilities, status codes and number of iterations
+
+    All elements are solved at once by Newton steps safeguarded by a bracket
+    [`lower_bound`, `upper_bound`] which is narrowed in every step.
+    Steps leaving the bracket are replaced by bisection.
+    Elements not converged after `max_iterations` continue by bisection.
+
+    Instead of raising an exception the status code of each element is one of
+    `CONVERGED` (by Newton steps), `BISECTION` (converged by bisection),
+    `MAX_ITERATIONS` (not converged) or
+    `NO_BRACKET` (price not attained for volatilities within the bounds).
+    Volatilities of elements without bracket are `nan`.
+
+    """
+    price_value = np.asarray(price_value, dtype=float).ravel()
+    size = price_value.size
+    index = np.arange(size)
+    lower = np.full(size, float(lower_bound))
+    upper = np.full(size, float(upper_bound))
+    iterations = np.zeros(size, dtype=int)
+    status = np.full(size, MAX_ITERATIONS, dtype=int)
+
+    lower_error = value_function(lower, index) - price_value
+    upper_error = value_function(upper, index) - price_value
+    # orientation of the bracket: root lies above vol if direction * error < 0
+    direction = np.where(upper_error > lower_error, 1.0, -1.0)
+
+    vol = np.clip(np.broadcast_to(np.asarray(initial_value, dtype=float), (size,)), lower, upper)
+    vol = np.where(lower_error == 0.0, lower, np.where(upper_error == 0.0, upper, vol))
+    status[(lower_error == 0.0) | (upper_error == 0.0)] = CONVERGED
+    no_bracket = ~(lower_error * upper_error <= 0.0)
+    status[no_bracket] = NO_BRACKET
+    vol[no_bracket] = np.nan
+    active = status == MAX_ITERATIONS
+
+    # safeguarded Newton steps
+    for _ in range(max_iterations):
+        i = index[active]
+        if not i.size:
+            break
+        v = vol[i]
+        error = value_function(v, i) - price_value[i]
+        iterations[i] += 1
+        below = direction[i] * error < 0.0
+        lower[i] = np.where(below, v, lower[i])
+        upper[i] = np.where(below, upper[i], v)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = v - error / vega_function(v, i)
+        bisect = ~np.isfinite(step) | (step <= lower[i]) | (step >= upper[i])
+        step = np.where(bisect, 0.5 * (lower[i] + upper[i]), step)
+        converged = (error == 0.0) | (np.abs(step - v) <= tolerance)
+        vol[i] = np.where(error == 0.0, v, step)
+        status[i[converged]] = CONVERGED
+        active[i[converged]] = False
+
+    # bisection for the remaining elements
+    for _ in range(max_bisections):
+        i = index[active]
+        if not i.size:
+            break
+        v = 0.5 * (lower[i] + upper[i])
+        error = value_function(v, i) - price_value[i]
+        iterations[i] += 1
+        below = direction[i] * error < 0.0
+        lower[i] = np.where(below, v, lower[i])
+        upper[i] = np.where(below, upper[i], v)
+        converged = (error == 0.0) | (upper[i] - lower[i] <= 2.0 * tolerance)
+        vol[i] = np.where(error == 0.0, v, 0.5 * (lower[i] + upper[i]))
+        status[i[converged]] = BISECTION
+        active[i[converged]] = False
+
+    return vol, status, iterations
+
+
+def implied_vol_surface(forwards, strikes, expiries, prices, option_types, valuator, discount_factors=1.0,
+                        initial_value=None):
+    """
+    implied volatility surface of a strike by expiry grid of option prices
+
+    :param array_like forwards: forward prices of underlying (one per expiry)
+    :param array_like strikes: strike prices (one row or one row per expiry)
+    :param array_like expiries: year fractions until exercise dates (one per expiry)
+    :param array_like prices: option prices as matrix with one row per expiry
+    :param array_like option_types: OptionType (single, one row or matrix)
+    :param OptionValuator valuator: option valuator to imply volatilities
+    :param array_like discount_factors: discount factors (one per expiry)
+    :param float initial_value: initial volatility of first solve
+        (optional, default is `valuator.IMPLIED_VOL_INITIAL_VALUE`)
+    :return: tuple(numpy.ndarray) of volatility matrix and iteration count matrix
+
+    Quotes are solved in order of moneyness and expiry.
+    The at-the-money quote of each expiry starts from the solution of the previous expiry.
+    Then, all expiries at once, the solves move away from the money strike by strike
+    and each quote starts from the solution of its converged neighbour.
+
+    Volatilities of quotes which are not solved are `nan`.
+
+    """
+    def column(a):
+        a = np.asarray(a, dtype=float)
+        return a.reshape(-1, 1) if a.ndim == 1 else a
+
+    prices = np.asarray(prices, dtype=float)
+    if not prices.ndim == 2:
+        raise ValueError('Prices must be given as matrix with one row per expiry.')
+    forwards, strikes, expiries, option_types, discount_factors = np.broadcast_arrays(
+        column(forwards), np.asarray(strikes, dtype=float), column(expiries),
+        np.asarray(option_types, dtype=float), column(discount_factors), prices)[:5]
+    rows, size = np.arange(prices.shape[0]), prices.shape[1]
+
+    # sort strikes of each expiry and find at-the-money strike
+    order = np.argsort(strikes, axis=1, kind='stable')
+    sort = (lambda a: np.take_along_axis(a, order, axis=1))
+    forwards, strikes, expiries, option_types, discount_factors, prices = \
+        (sort(a) for a in (forwards, strikes, expiries, option_types, discount_factors, prices))
+    atm = np.argmin(np.abs(strikes - forwards), axis=1)
+
+    vol = np.full(prices.shape, np.nan)
+    iterations = np.zeros(prices.shape, dtype=int)
+
+    def solve(r, c, seed):
+        v, s, i = valuator.implied_vol_array(forwards[r, c], strikes[r, c], expiries[r, c], prices[r, c],
+                                             option_types[r, c], discount_factors[r, c], seed)
+        vol[r, c] = np.where((s == CONVERGED) | (s == BISECTION), v, np.nan)
+        iterations[r, c] = i
+        return vol[r, c]
+
+    # at-the-money quotes by expiry
+    seed = valuator.IMPLIED_VOL_INITIAL_VALUE if initial_value is None else initial_value
+    for r in np.argsort(expiries[:, 0], kind='stable'):
+        v = solve(r, atm[r], seed)
+        seed = v if np.isfinite(v) else seed
+    default = seed
+
+    # away from the money by strike
+    left = right = np.where(np.isfinite(vol[rows, atm]), vol[rows, atm], default)
+    for step in range(1, size):
+        c = np.concatenate((atm - step, atm + step))
+        r = np.concatenate((rows, rows))
+        seeds = np.concatenate((left, right))
+        valid = (0 <= c) & (c < size)
+        if not valid.any():
+            break
+        v = seeds.copy()
+        v[valid] = solve(r[valid], c[valid], seeds[valid])
+        seeds = np.where(np.isfinite(v), v, seeds)
+        left, right = seeds[:rows.size], seeds[rows.size:]
+
+    # restore original strike order
+    result = np.empty_like(vol)
+    count = np.empty_like(iterations)
+    np.put_along_axis(result, order, vol, axis=1)
+    np.put_along_axis(count, order, iterations, axis=1)
+    return result, count
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+import sys
+
+from math import exp, log, sqrt, sinh, pi
+
+from putcall.formulas.normal_distribution import normal_cdf, normal_inverse_cdf, ACCURATE
+
+DBL_EPSILON = sys.float_info.epsilon
+DBL_MIN = sys.float_info.min
+DBL_MAX = sys.float_info.max
+SQRT_DBL_MIN = sqrt(DBL_MIN)
+SQRT_DBL_MAX = sqrt(DBL_MAX)
+
+ONE_OVER_SQRT_TWO_PI = 1.0 / sqrt(2.0 * pi)
+SQRT_PI_OVER_TWO = sqrt(0.5 * pi)
+SQRT_THREE = sqrt(3.0)
+SQRT_ONE_OVER_THREE = sqrt(1.0 / 3.0)
+TWO_PI = 2.0 * pi
+PI_OVER_SIX = pi / 6.0
+TWO_PI_OVER_SQRT_TWENTY_SEVEN = 2.0 * pi / sqrt(27.0)
+
+MINIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE = -(1.0 - sqrt(DBL_EPSILON))
+MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE = 2.0 / (DBL_EPSILON * DBL_EPSILON)
+
+LETS_BE_RATIONAL_ITERATIONS = 2
+
+
+def _is_zero(x):
+    return abs(x) < DBL_MIN
+
+
+def _norm_cdf(x):
+    return normal_cdf(x, ACCURATE)
+
+
+def _norm_pdf(x):
+    return ONE_OVER_SQRT_TWO_PI * exp(-0.5 * x * x)
+
+
+# --- rational cubic interpolation ---
+
+def _rational_cubic_interpolation(x, x_l, x_r, y_l, y_r, d_l, d_r, r):
+    h = x_r - x_l
+    if abs(h) <= 0.0:
+        return 0.5 * (y_l + y_r)
+    t = (x - x_l) / h
+    if r >= MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE:
+        # linear interpolation without over-/underflow
+        return y_r * t + y_l * (1.0 - t)
+    omt = 1.0 - t
+    t2 = t * t
+    omt2 = omt * omt
+    return (y_r * t2 * t + (r * y_r - h * d_r) * t2 * omt + (r * y_l + h * d_l) * t * omt2 + y_l * omt2 * omt) / \
+        (1.0 + (r - 3.0) * t * omt)
+
+
+def _minimum_rational_cubic_control_parameter(d_l, d_r, s, prefer_shape_preservation):
+    monotonic = d_l * s >= 0.0 and d_r * s >= 0.0
+    convex = d_l <= s <= d_r
+    concave = d_l >= s >= d_r
+    if not monotonic and not convex and not concave:
+        return MINIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    d_r_m_d_l = d_r - d_l
+    d_r_m_s = d_r - s
+    s_m_d_l = s - d_l
+    r1 = r2 = -DBL_MAX
+    if monotonic:
+        if not _is_zero(s):
+            r1 = (d_r + d_l) / s
+        elif prefer_shape_preservation:
+            r1 = MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    if convex or concave:
+        if not (_is_zero(s_m_d_l) or _is_zero(d_r_m_s)):
+            r2 = max(abs(d_r_m_d_l / d_r_m_s), abs(d_r_m_d_l / s_m_d_l))
+        elif prefer_shape_preservation:
+            r2 = MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    elif monotonic and prefer_shape_preservation:
+        r2 = MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    return max(MINIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE, r1, r2)
+
+
+def _control_parameter_at_left_side(x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_l, prefer_shape_preservation):
+    h = x_r - x_l
+    numerator = 0.5 * h * second_derivative_l + (d_r - d_l)
+    denominator = (y_r - y_l) / h - d_l
+    if _is_zero(numerator):
+        r = 0.0
+    elif _is_zero(denominator):
+        r = MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE if numerator > 0.0 \
+            else MINIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    else:
+        r = numerator / denominator
+    r_min = _minimum_rational_cubic_control_parameter(d_l, d_r, (y_r - y_l) / h, prefer_shape_preservation)
+    return max(r, r_min)
+
+
+def _control_parameter_at_right_side(x_l, x_r, y_l, y_r, d_l, d_r, second_derivative_r, prefer_shape_preservation):
+    h = x_r - x_l
+    numerator = 0.5 * h * second_derivative_r + (d_r - d_l)
+    denominator = d_r - (y_r - y_l) / h
+    if _is_zero(numerator):
+        r = 0.0
+    elif _is_zero(denominator):
+        r = MAXIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE if numerator > 0.0 \
+            else MINIMUM_RATIONAL_CUBIC_CONTROL_PARAMETER_VALUE
+    else:
+        r = numerator / denominator
+    r_min = _minimum_rational_cubic_control_parameter(d_l, d_r, (y_r - y_l) / h, prefer_shape_preservation)
+    return max(r, r_min)
+
+
+# --- normalised black ---
+
+def normalised_intrinsic(x, q=1.0):
+    """
+    normalised intrinsic value :math:`\\max(q (e^{x/2} - e^{-x/2}), 0)`
+
+    :param float x: log moneyness :math:`\\ln(F/K)`
+    :param float q: call -> 1.0, put -> -1.0
+    :return: float
+
+    """
+    if q * x <= 0.0:
+        return 0.0
+    return abs(2.0 * sinh(0.5 * x))
+
+
+def normalised_black_call(x, s):
+    """
+    normalised Black call :math:`b(x, s) = e^{x/2} \\Phi(x/s + s/2) - e^{-x/2} \\Phi(x/s - s/2)`
+
+    :param float x: log moneyness :math:`\\ln(F/K)`
+    :param float s: total volatility :math:`\\sigma \\sqrt{T}`
+    :return: float
+
+    i.e. Black-76 call price divided by :math:`\\sqrt{FK}`
+
+    """
+    if x > 0.0:
+        # in-the-money by put-call parity
+        return normalised_intrinsic(x, 1.0) + normalised_black_call(-x, s)
+    if s <= 0.0:
+        return 0.0
+    h = x / s
+    t = 0.5 * s
+    return max(exp(0.5 * x) * _norm_cdf(h + t) - exp(-0.5 * x) * _norm_cdf(h - t), 0.0)
+
+
+def normalised_vega(x, s):
+    """
+    derivative of `normalised_black_call` with respect to the total volatility `s`
+
+    :param float x: log moneyness :math:`\\ln(F/K)`
+    :param float s: total volatility :math:`\\sigma \\sqrt{T}`
+    :return: float
+
+    """
+    ax = abs(x)
+    if ax <= 0.0:
+        return ONE_OVER_SQRT_TWO_PI * exp(-0.125 * s * s)
+    if s <= 0.0 or s <= ax * SQRT_DBL_MIN:
+        return 0.0
+    h = x / s
+    return ONE_OVER_SQRT_TWO_PI * exp(-0.5 * (h * h + 0.25 * s * s))
+
+
+# --- transformation maps of the initial guess ---
+
+def _f_lower_map_and_first_two_derivatives(x, s):
+    ax = abs(x)
+    z = SQRT_ONE_OVER_THREE * ax / s
+    y = z * z
+    s2 = s * s
+    phi_cdf = _norm_cdf(-z)
+    phi_pdf = _norm_pdf(z)
+    fpp = PI_OVER_SIX * y / (s2 * s) * phi_cdf * (
+        8.0 * SQRT_THREE * s * ax + (3.0 * s2 * (s2 - 8.0) - 8.0 * x * x) * phi_cdf / phi_pdf) * exp(2.0 * y + 0.25 * s2)
+    if _is_zero(s):
+        return 0.0, 1.0, fpp
+    phi_cdf2 = phi_cdf * phi_cdf
+    fp = TWO_PI * y * phi_cdf2 * exp(y + 0.125 * s2)
+    f = 0.0 if _is_zero(x) else TWO_PI_OVER_SQRT_TWENTY_SEVEN * ax * (phi_cdf2 * phi_cdf)
+    return f, fp, fpp
+
+
+def _inverse_f_lower_map(x, f):
+    if _is_zero(f):
+        return 0.0
+    return abs(x / (SQRT_THREE * normal_inverse_cdf((f / (TWO_PI_OVER_SQRT_TWENTY_SEVEN * abs(x))) ** (1.0 / 3.0))))
+
+
+def _f_upper_map_and_first_two_derivatives(x, s):
+    f = _norm_cdf(-0.5 * s)
+    if _is_zero(x):
+        return f, -0.5, 0.0
+    w = (x / s) ** 2
+    return f, -0.5 * exp(0.5 * w), SQRT_PI_OVER_TWO * exp(w + 0.125 * s * s) * w / s
+
+
+def _inverse_f_upper_map(f):
+    return -2.0 * normal_inverse_cdf(f)
+
+
+def _householder_factor(newton, halley, hh3):
+    return (1.0 + 0.5 * halley * newton) / (1.0 + newton * (halley + hh3 * newton / 6.0))
+
+
+# --- implied volatility ---
+
+class _Bracket(object):
+    """ bracket and step bookkeeping of the Householder iteration """
+
+    def __init__(self, s, s_left=DBL_MIN, s_right=DBL_MAX):
+        self.s = s
+        self.s_left = s_left
+        self.s_right = s_right
+        self.ds = -DBL_MAX
+        self.ds_previous = 0.0
+        self.direction_reversal_count = 0
+        self.iterations = 0
+
+    def proceed(self, max_iterations):
+        return self.iterations < max_iterations and abs(self.ds) > DBL_EPSILON * self.s
+
+    def nest(self):
+        # returns False if the bracket collapsed
+        if self.ds * self.ds_previous < 0.0:
+            self.direction_reversal_count += 1
+        if self.iterations > 0 and \
+                (self.direction_reversal_count == 3 or not self.s_left < self.s < self.s_right):
+            # looping inefficiently or step outside the bracket, so switch to bisection
+            self.s = 0.5 * (self.s_left + self.s_right)
+            if self.s_right - self.s_left <= DBL_EPSILON * self.s:
+                return False
+            self.direction_reversal_count = 0
+            self.ds = 0.0
+        self.ds_previous = self.ds
+        return True
+
+    def tighten(self, b, beta):
+        if b > beta and self.s < self.s_right:
+            self.s_right = self.s
+        elif b < beta and self.s > self.s_left:
+            self.s_left = self.s
+
+    def step(self, ds):
+        self.ds = max(-0.5 * self.s, ds)
+        self.s += self.ds
+        self.iterations += 1
+
+
+def _lower_branch(beta, x, bracket, max_iterations):
+    # objective g(s) = 1/ln(b(x,s)) - 1/ln(beta)
+    ln_beta = log(beta)
+    while bracket.proceed(max_iterations):
+        if not bracket.nest():
+            break
+        s = bracket.s
+        b = normalised_black_call(x, s)
+        bp = normalised_vega(x, s)
+        bracket.tighten(b, beta)
+        if b <= 0.0 or bp <= 0.0:
+            # underflow, so bisect
+            ds = 0.5 * (bracket.s_left + bracket.s_right) - s
+        else:
+            ln_b = log(b)
+            bpob = bp / b
+            h = x / s
+            b_halley = h * h / s - s / 4.0
+            newton = (ln_beta - ln_b) * ln_b / ln_beta / bpob
+            halley = b_halley - bpob * (1.0 + 2.0 / ln_b)
+            b_hh3 = b_halley * b_halley - 3.0 * (h / s) ** 2 - 0.25
+            hh3 = b_hh3 + 2.0 * bpob * bpob * (1.0 + 3.0 / ln_b * (1.0 + 1.0 / ln_b)) - \
+                3.0 * b_halley * bpob * (1.0 + 2.0 / ln_b)
+            ds = newton * _householder_factor(newton, halley, hh3)
+        bracket.step(ds)
+    return bracket
+
+
+def _upper_branch(beta, x, b_max, bracket, max_iterations):
+    # objective g(s) = ln(b_max - beta) - ln(b_max - b(x,s))
+    while bracket.proceed(max_iterations):
+        if not bracket.nest():
+            break
+        s = bracket.s
+        b = normalised_black_call(x, s)
+        bp = normalised_vega(x, s)
+        bracket.tighten(b, beta)
+        if b >= b_max or bp <= DBL_MIN:
+            ds = 0.5 * (bracket.s_left + bracket.s_right) - s
+        else:
+            b_max_minus_b = b_max - b
+            g = log((b_max - beta) / b_max_minus_b)
+            gp = bp / b_max_minus_b
+            b_halley = (x / s) ** 2 / s - s / 4.0
+            b_hh3 = b_halley * b_halley - 3.0 * (x / (s * s)) ** 2 - 0.25
+            newton = -g / gp
+            halley = b_halley + gp
+            hh3 = b_hh3 + gp * (2.0 * gp + 3.0 * b_halley)
+            ds = newton * _householder_factor(newton, halley, hh3)
+        bracket.step(ds)
+    return bracket
+
+
+def _middle_branch(beta, x, bracket, max_iterations):
+    # objective g(s) = b(x,s) - beta
+    while bracket.proceed(max_iterations):
+        if not bracket.nest():
+            break
+        s = bracket.s
+        b = normalised_black_call(x, s)
+        bp = normalised_vega(x, s)
+        bracket.tighten(b, beta)
+        if bp <= DBL_MIN:
+            ds = 0.5 * (bracket.s_left + bracket.s_right) - s
+        else:
+            newton = (beta - b) / bp
+            halley = (x / s) ** 2 / s - s / 4.0
+            hh3 = halley * halley - 3.0 * (x / (s * s)) ** 2 - 0.25
+            ds = newton * _householder_factor(newton, halley, hh3)
+        bracket.step(ds)
+    return bracket
+
+
+def normalised_implied_vol(beta, x, q=1.0, max_iterations=LETS_BE_RATIONAL_ITERATIONS):
+    """
+    total implied volatility :math:`s = \\sigma \\sqrt{T}` of a normalised Black price
+
+    :param float beta: normalised price, i.e. Black-76 price divided by :math:`\\sqrt{FK}`
+    :param float x: log moneyness :math:`\\ln(F/K)`
+    :param float q: call -> 1.0, put -> -1.0
+    :param int max_iterations: maximal number of Householder(3) iterations
+    :return: tuple(float, int) total implied volatility and number of iterations
+
+    """
+    if q * x > 0.0:
+        # map in-the-money to out-of-the-money
+        beta = abs(max(beta - normalised_intrinsic(x, q), 0.0))
+        q = -q
+    if q < 0.0:
+        # map puts to calls
+        x = -x
+        q = -q
+    if beta <= 0.0:
+        return 0.0, 0
+    b_max = exp(0.5 * x)
+    if beta >= b_max:
+        raise ValueError('Normalised price %s above maximum %s' % (str(beta), str(b_max)))
+
+    s_c = sqrt(abs(2.0 * x))
+    b_c = normalised_black_call(x, s_c)
+    v_c = normalised_vega(x, s_c)
+
+    # four branches of the rational guess
+    if beta < b_c:
+        s_l = s_c - b_c / v_c
+        b_l = normalised_black_call(x, s_l)
+        if beta < b_l:
+            f_l, dfl, d2fl = _f_lower_map_and_first_two_derivatives(x, s_l)
+            r_ll = _control_parameter_at_right_side(0.0, b_l, 0.0, f_l, 1.0, dfl, d2fl, True)
+            f = _rational_cubic_interpolation(beta, 0.0, b_l, 0.0, f_l, 1.0, dfl, r_ll)
+            if not f > 0.0:
+                # quadratic interpolation using f(0) = 0, f(b_l) and f'(0) = 1
+                t = beta / b_l
+                f = (f_l * t + b_l * (1.0 - t)) * t
+            bracket = _Bracket(_inverse_f_lower_map(x, f), s_right=s_l)
+            bracket = _lower_branch(beta, x, bracket, max_iterations)
+            return bracket.s, bracket.iterations
+        v_l = normalised_vega(x, s_l)
+        r_lm = _control_parameter_at_right_side(b_l, b_c, s_l, s_c, 1.0 / v_l, 1.0 / v_c, 0.0, False)
+        s = _rational_cubic_interpolation(beta, b_l, b_c, s_l, s_c, 1.0 / v_l, 1.0 / v_c, r_lm)
+        bracket = _Bracket(s, s_l, s_c)
+    else:
+        s_h = s_c + (b_max - b_c) / v_c if v_c > DBL_MIN else s_c
+        b_h = normalised_black_call(x, s_h)
+        if beta <= b_h:
+            v_h = normalised_vega(x, s_h)
+            r_hm = _control_parameter_at_left_side(b_c, b_h, s_c, s_h, 1.0 / v_c, 1.0 / v_h, 0.0, False)
+            s = _rational_cubic_interpolation(beta, b_c, b_h, s_c, s_h, 1.0 / v_c, 1.0 / v_h, r_hm)
+            bracket = _Bracket(s, s_c, s_h)
+        else:
+            f_h, dfh, d2fh = _f_upper_map_and_first_two_derivatives(x, s_h)
+            f = -DBL_MAX
+            if -SQRT_DBL_MAX < d2fh < SQRT_DBL_MAX:
+                r_hh = _control_parameter_at_left_side(b_h, b_max, f_h, 0.0, dfh, -0.5, d2fh, True)
+                f = _rational_cubic_interpolation(beta, b_h, b_max, f_h, 0.0, dfh, -0.5, r_hh)
+            if f <= 0.0:
+                # quadratic interpolation using f(b_h), f(b_max) = 0 and f'(b_max) = -1/2
+                h = b_max - b_h
+                t = (beta - b_h) / h
+                f = (f_h * (1.0 - t) + 0.5 * h * t) * (1.0 - t)
+            bracket = _Bracket(_inverse_f_upper_map(f), s_left=s_h)
+            if beta > 0.5 * b_max:
+                bracket = _upper_branch(beta, x, b_max, bracket, max_iterations)
+                return bracket.s, bracket.iterations
+    bracket = _middle_branch(beta, x, bracket, max_iterations)
+    return bracket.s, bracket.iterations
+
+
+def lets_be_rational(price_value, forward_value, strike_value, time_value, is_call_bool,
+                     max_iterations=LETS_BE_RATIONAL_ITERATIONS):
+    """
+    Black-76 implied volatility by P. Jäckel's *Let's Be Rational* algorithm
+
+    :param float price_value: undiscounted option price
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param int max_iterations: maximal number of Householder(3) iterations
+    :return: float implied volatility
+
+    A rational guess in four branches followed by (by default) two
+    Householder(3) iterations gives the implied volatility close to machine precision,
+    see P. Jäckel, *Let's Be Rational*, Wilmott, 2015, pp. 40-53.
+
+    Prices outside the arbitrage bounds, i.e. below the intrinsic value
+    or at and above the forward (call) resp. strike (put), raise a `ValueError`.
+
+    The inversion refers to the exact Black-76 formula.
+    Prices calculated with the `ABRAMOWITZ_STEGUN` normal cdf approximation
+    are matched to the accuracy of that approximation only.
+
+    """
+    if not forward_value > 0.0 or not strike_value > 0.0:
+        raise ValueError('Forward %s and strike %s must be positive.' % (str(forward_value), str(strike_value)))
+    q = 1.0 if is_call_bool else -1.0
+    intrinsic = max(q * (forward_value - strike_value), 0.0)
+    if price_value < intrinsic:
+        raise ValueError('Price %s below intrinsic value %s.' % (str(price_value), str(intrinsic)))
+    max_price = forward_value if is_call_bool else strike_value
+    if price_value >= max_price:
+        raise ValueError('Price %s above maximum value %s.' % (str(price_value), str(max_price)))
+    if price_value == intrinsic:
+        return 0.0
+    if not time_value > 0.0:
+        raise ValueError('Price %s above intrinsic value %s at expiry.' % (str(price_value), str(intrinsic)))
+    x = log(forward_value / strike_value)
+    if q * x > 0.0:
+        # map in-the-money to out-of-the-money
+        price_value = abs(max(price_value - intrinsic, 0.0))
+        q = -q
+    beta = price_value / sqrt(forward_value * strike_value)
+    s, _ = normalised_implied_vol(beta, x, q, max_iterations)
+    return s / sqrt(time_value)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from putcall.formulas.interest_rate_options.sabr import sabr_black_vol_and_gradient_array, \
+    sabr_alpha_from_atm_array
+
+EPS = 1e-12
+MAX_RHO = 1 - 1e-8
+
+
+def _sabr_start(forward_value, strike_values, vol_values, beta_value, rho_value, nu_value, time_value,
+                atm_vol_value=None):
+    # alpha matching the given or the closest to the money vol
+    if atm_vol_value is None:
+        atm_vol_value = vol_values[np.argmin(np.abs(strike_values - forward_value))]
+    alpha = sabr_alpha_from_atm_array(forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value)
+    if not alpha > 0.0:
+        alpha = atm_vol_value * forward_value ** (1 - beta_value)
+    return float(alpha)
+
+
+def _sabr_alpha_and_gradient(forward_value, atm_vol_value, beta_value, rho_value, nu_value, time_value):
+    # alpha matching the atm vol and its derivatives by rho and nu (implicit function theorem)
+    alpha = sabr_alpha_from_atm_array(forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value)
+    if not alpha > 0.0:
+        return None, 0.0, 0.0
+    _, d_alpha, d_rho, d_nu = sabr_black_vol_and_gradient_array(
+        forward_value, forward_value, alpha, beta_value, nu_value, rho_value, time_value)
+    return float(alpha), float(-d_rho / d_alpha), float(-d_nu / d_alpha)
+
+
+def sabr_calibration_smile(forward_value,
+                           strike_values,
+                           vol_values,
+                           time_value,
+                           beta_value=0.5,
+                           atm_vol_value=None,
+                           alpha_start=None,
+                           rho_start=0.0,
+                           nu_start=0.3,
+                           weights=None,
+                           tolerance=1e-12,
+                           max_iterations=100,
+                           obloj=False):
+    """
+    Levenberg-Marquardt calibration of the SABR model to a smile of Black volatilities
+
+    :param forward_value: forward
+    :type forward_value: float
+    :param strike_values: strikes of the smile
+    :type strike_values: array_like
+    :param vol_values: Black volatility quotes (`nan` for missing quotes)
+    :type vol_values: array_like
+    :param time_value: time to expiry
+    :type time_value: float
+    :param beta_value: fixed beta
+    :type beta_value: float
+    :param atm_vol_value: ATM volatility to match exactly (optional, default `None`, i.e. no matching)
+    :type atm_vol_value: float
+    :param alpha_start: initial alpha (optional, by default matching the closest to the money quote)
+    :type alpha_start: float
+    :param rho_start: initial rho
+    :type rho_start: float
+    :param nu_start: initial nu
+    :type nu_start: float
+    :param weights: weights of quotes (optional, default all 1.)
+    :type weights: array_like
+    :param tolerance: relative tolerance of parameters and of error
+    :type tolerance: float
+    :param max_iterations: maximal number of iterations
+    :type max_iterations: int
+    :param obloj: fit Obloj's variant of Hagan's formula (optional, default `False`)
+    :type obloj: bool
+    :return: alpha, rho, nu, corresponding error, number of iterations
+    :rtype: list
+
+    minimizes the sum of weighted squared volatility errors of `sabr_black_vol_array`
+    by Levenberg-Marquardt steps with analytic derivatives
+    (see `sabr_black_vol_and_gradient_array`).
+    Alpha is kept positive, rho within (-1, 1) and nu non negative.
+
+    If `atm_vol_value` is given, only rho and nu are fitted and alpha follows
+    from `sabr_alpha_from_atm_array`, so the ATM volatility is matched exactly.
+
+    """
+    strike_values = np.asarray(strike_values, dtype=float)
+    vol_values = np.asarray(vol_values, dtype=float)
+    weights = np.ones_like(vol_values) if weights is None else np.asarray(weights, dtype=float) * 1.
+    if not strike_values.shape == vol_values.shape == weights.shape or not strike_values.ndim == 1:
+        raise ValueError("Strikes, vols and weights must be one dimensional and of same length.")
+    valid = np.isfinite(strike_values) & np.isfinite(vol_values)
+    strike_values, vol_values, weights = strike_values[valid], vol_values[valid], weights[valid]
+    if not len(vol_values):
+        raise ValueError("No quotes given for SABR calibration.")
+    if not -1.0 < rho_start < 1.0 or not 0.0 <= nu_start:
+        raise AssertionError("Rho start must be within (-1, 1) and nu start non negative.")
+
+    match_atm = atm_vol_value is not None
+    if alpha_start is None:
+        alpha_start = _sabr_start(forward_value, strike_values, vol_values, beta_value, rho_start, nu_start,
+                                  time_value, atm_vol_value)
+    if not 0.0 < alpha_start:
+        raise AssertionError("Alpha start must be positive.")
+
+    def residuals_and_jacobian(parameters):
+        alpha, rho, nu = parameters
+        if match_atm:
+            alpha, d_alpha_d_rho, d_alpha_d_nu = \
+                _sabr_alpha_and_gradient(forward_value, atm_vol_value, beta_value, rho, nu, time_value)
+            if alpha is None:
+                return None, None, parameters
+        vol, d_alpha, d_rho, d_nu = sabr_black_vol_and_gradient_array(
+            strike_values, forward_value, alpha, beta_value, nu, rho, time_value, obloj)
+        if match_atm:
+            jacobian = np.column_stack((d_rho + d_alpha * d_alpha_d_rho, d_nu + d_alpha * d_alpha_d_nu))
+        else:
+            jacobian = np.column_stack((d_alpha, d_rho, d_nu))
+        return weights * (vol - vol_values), weights[:, np.newaxis] * jacobian, (alpha, rho, nu)
+
+    def bounded(parameters, step):
+        alpha, rho, nu = parameters
+        if match_atm:
+            step = (0.0,) + tuple(step)
+        return max(alpha + step[0], EPS), min(max(rho + step[1], -MAX_RHO), MAX_RHO), max(nu + step[2], 0.0)
+
+    parameters = float(alpha_start), float(rho_start), float(nu_start)
+    residuals, jacobian, parameters = residuals_and_jacobian(parameters)
+    if residuals is None:
+        raise ValueError("No positive SABR alpha matches ATM volatility %s." % str(atm_vol_value))
+    error = float(np.dot(residuals, residuals))
+    damping = 1e-3
+    iteration = 0
+    while iteration < max_iterations and error > 0.0:
+        iteration += 1
+        # normal equations (J^T J + damping diag(J^T J)) step = - J^T r
+        normal = np.dot(jacobian.T, jacobian)
+        gradient = np.dot(jacobian.T, residuals)
+        accepted = False
+        while not accepted and damping < 1e16:
+            damped = normal + damping * np.diag(np.diag(normal))
+            try:
+                step = -np.linalg.solve(damped, gradient)
+            except np.linalg.LinAlgError:
+                damping *= 10.0
+                continue
+            new_parameters = bounded(parameters, step)
+            new_residuals, new_jacobian, new_parameters = residuals_and_jacobian(new_parameters)
+            new_error = float('inf') if new_residuals is None else float(np.dot(new_residuals, new_residuals))
+            if new_error < error:
+                accepted = True
+                damping = max(damping / 10.0, 1e-12)
+            else:
+                damping *= 10.0
+        if not accepted:
+            break
+        small_step = all(abs(n - p) <= tolerance * max(abs(p), 1e-4) for n, p in zip(new_parameters, parameters))
+        small_gain = error - new_error <= tolerance * error
+        parameters, error, residuals, jacobian = new_parameters, new_error, new_residuals, new_jacobian
+        if small_step or small_gain:
+            break
+    alpha, rho, nu = parameters
+    return [float(alpha), float(rho), float(nu), error, iteration]
+
+
+def _sabr_calibration_column(args):
+    # calibrates smiles of one tenor along expiries, each starting from the previous result
+    forward_values, strike_values, vol_values, time_values, beta_value, atm_vol_values, kwargs = args
+    results = list()
+    start = dict()
+    for i in range(len(forward_values)):
+        atm_vol_value = None if atm_vol_values is None else atm_vol_values[i]
+        try:
+            res = sabr_calibration_smile(forward_values[i], strike_values[i], vol_values[i], time_values[i],
+                                         beta_value, atm_vol_value, **dict(kwargs, **start))
+        except (ValueError, AssertionError):
+            res = [np.nan] * 4 + [0]
+        if all(np.isfinite(res[:3])):
+            start = dict(rho_start=res[1], nu_start=res[2])
+        results.append(res)
+    return results
+
+
+def sabr_calibration_cube(forward_values,
+                          strike_values,
+                          vol_values,
+                          time_values,
+                          beta_value=0.5,
+                          atm_vol_values=None,
+                          executor=None,
+                          n_workers=None,
+                          **kwargs):
+    """
+    SABR calibration of a whole volatility cube
+
+    :param forward_values: forwards of (expiry, tenor) points
+    :type forward_values: array_like of shape (n_expiries, n_tenors)
+    :param strike_values: strikes of smiles
+    :type strike_values: array_like of shape (n_expiries, n_tenors, n_strikes)
+    :param vol_values: Black volatility quotes of smiles (`nan` for missing quotes)
+    :type vol_values: array_like of shape (n_expiries, n_tenors, n_strikes)
+    :param time_values: times to expiry
+    :type time_values: array_like broadcastable to shape (n_expiries, n_tenors)
+    :param beta_value: fixed beta
+    :type beta_value: float
+    :param atm_vol_values: ATM volatilities to match exactly (optional)
+    :type atm_vol_values: array_like of shape (n_expiries, n_tenors)
+    :param executor: executor to calibrate tenors in parallel (optional)
+    :type executor: concurrent.futures.Executor
+    :param n_workers: number of worker processes if no executor is given
+        (optional, default `None`, i.e. serial calibration)
+    :type n_workers: int
+    :param kwargs: further arguments of `sabr_calibration_smile`
+    :return: arrays of alpha, rho, nu, error and number of iterations, each of shape (n_expiries, n_tenors)
+    :rtype: tuple(numpy.ndarray)
+
+    Tenors are calibrated in parallel, each one by a worker process.
+    Along the expiries of a tenor each smile starts from rho and nu of its neighbouring
+    shorter expiry, so most smiles converge in very few iterations.
+    Smiles which can not be calibrated give `nan`.
+
+    """
+    forward_values = np.asarray(forward_values, dtype=float)
+    if not forward_values.ndim == 2:
+        raise ValueError("Forwards must be of shape (n_expiries, n_tenors).")
+    shape = forward_values.shape
+    strike_values = np.asarray(strike_values, dtype=float)
+    vol_values = np.asarray(vol_values, dtype=float)
+    if not strike_values.shape == vol_values.shape or not strike_values.shape[:2] == shape:
+        raise ValueError("Strikes and vols must be of shape (n_expiries, n_tenors, n_strikes).")
+    time_values = np.broadcast_to(np.asarray(time_values, dtype=float), shape)
+    if atm_vol_values is not None:
+        atm_vol_values = np.broadcast_to(np.asarray(atm_vol_values, dtype=float), shape)
+
+    columns = list()
+    for j in range(shape[1]):
+        atm = None if atm_vol_values is None else atm_vol_values[:, j]
+        columns.append((forward_values[:, j], strike_values[:, j], vol_values[:, j], time_values[:, j],
+                        beta_value, atm, kwargs))
+
+    shutdown = False
+    if executor is None and n_workers:
+        executor, shutdown = ProcessPoolExecutor(n_workers), True
+    try:
+        if executor is None:
+            results = list(map(_sabr_calibration_column, columns))
+        else:
+            results = list(executor.map(_sabr_calibration_column, columns))
+    finally:
+        if shutdown:
+            executor.shutdown()
+
+    results = np.array(results, dtype=float)  # tenor x expiry x result
+    results = np.transpose(results, (2, 1, 0))
+    alpha, rho, nu, error, iterations = results
+    return alpha, rho, nu, error, iterations.astype(int)
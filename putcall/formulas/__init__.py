@@ -10,6 +10,7 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
+from .normal_distribution import *
 from .option_payoffs import *
 from .plain_vanilla_options import *
 from .exotic_options import *
@@ -12,10 +12,11 @@
 
 from math import exp, sqrt, pi
 
-from mathtoolspy import cdf_abramowitz_stegun as normal_cdf
-from mathtoolspy import density_normal_dist as normal_density
+import numpy as np
 
+from ..normal_distribution import normal_cdf, normal_density, normal_cdf_array, normal_density_array
 from ..option_payoffs import option_payoff, digital_option_payoff, straddle_payoff
+from ..option_payoffs import option_payoff_array, digital_option_payoff_array, straddle_payoff_array
 
 
 def _bachelier_param(forward_value, strike_value, implied_vol_value, time_value):
@@ -66,7 +67,10 @@ def bachelier_delta(forward_value, strike_value, implied_vol_value, time_value,
     sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
 
     if sigma == 0.0:
-        return 1.0 if fms > 0.0 else 0.0
+        if is_call_bool:
+            return 1.0 if fms > 0.0 else 0.0
+        else:
+            return -1.0 if fms < 0.0 else 0.0
 
     return normal_cdf(d) if is_call_bool else -normal_cdf(-d)
 
@@ -131,9 +135,7 @@ def bachelier_digital(forward_value, strike_value, implied_vol_value, time_value
     if sigma == 0.0:
         return digital_option_payoff(forward_value, strike_value, is_call_bool)
 
-    # call
-    call_price = -1 * normal_cdf(d) + exp(-d ** 2 / 2) * sigma / sqrt(2 * pi)
-    return call_price if is_call_bool else call_price + 1  # put
+    return normal_cdf(d) if is_call_bool else normal_cdf(-d)
 
 
 def bachelier_digital_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -177,7 +179,9 @@ def bachelier_digital_gamma(forward_value, strike_value, implied_vol_value, time
     if sigma == 0.0:
         return 0.0
 
-    return d * normal_density(d) / (implied_vol_value * implied_vol_value * time_value)
+    # call
+    call_value = -d * normal_density(d) / (implied_vol_value * implied_vol_value * time_value)
+    return call_value if is_call_bool else -call_value  # put
 
 
 def bachelier_digital_vega(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -221,7 +225,7 @@ def bachelier_straddle(forward_value, strike_value, implied_vol_value, time_valu
     if sigma == 0.0:
         return straddle_payoff(forward_value, strike_value, is_call_bool)
 
-    return None  # TODO Bachelier for straddle payoff
+    return fms * (2.0 * normal_cdf(d) - 1.0) + 2.0 * sigma * normal_density(d)
 
 
 def bachelier_straddle_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -242,7 +246,7 @@ def bachelier_straddle_delta(forward_value, strike_value, implied_vol_value, tim
     if sigma == 0.0:
         return 1.0 if fms >= 0.0 else -1.0
 
-    return None  # TODO Bachelier delta for straddle payoff
+    return 2.0 * normal_cdf(d) - 1.0
 
 
 def bachelier_straddle_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -263,7 +267,7 @@ def bachelier_straddle_gamma(forward_value, strike_value, implied_vol_value, tim
     if sigma == 0.0:
         return 0.0
 
-    return None  # TODO Bachelier gamma for straddle payoff
+    return 2.0 * normal_density(d) / sigma
 
 
 def bachelier_straddle_vega(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -284,4 +288,979 @@ def bachelier_straddle_vega(forward_value, strike_value, implied_vol_value, time
     if sigma == 0.0:
         return 0.0
 
-    return None  # TODO Bachelier vega for straddle payoff
+    return 2.0 * sqrt(time_value) * normal_density(d)
+
+
+# --- vanna, volga, theta and dual greeks ---
+
+def bachelier_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vanna sensitivity (derivative of delta by volatility) for Bachelier formula.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return -d * normal_density(d) / implied_vol_value
+
+
+def bachelier_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    volga (vomma) sensitivity (derivative of vega by volatility) for Bachelier formula.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    vega = normal_density(d) * sqrt(time_value)
+    return vega * d * d / implied_vol_value
+
+
+def bachelier_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    theta sensitivity for Bachelier formula.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return -0.5 * normal_density(d) * implied_vol_value / sqrt(time_value)
+
+
+def bachelier_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual delta sensitivity for Bachelier formula.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        if is_call_bool:
+            return -1.0 if fms > 0.0 else 0.0
+        else:
+            return 1.0 if fms < 0.0 else 0.0
+
+    # call
+    call_value = -normal_cdf(d)
+    return call_value if is_call_bool else call_value + 1.0  # put
+
+
+def bachelier_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual gamma sensitivity for Bachelier formula.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return normal_density(d) / sigma
+
+
+def bachelier_digital_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vanna sensitivity for Bachelier formula for digital option.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = normal_density(d) * (d * d - 1.0) / (sigma * implied_vol_value)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def bachelier_digital_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    volga (vomma) sensitivity for Bachelier formula for digital option.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = -d * normal_density(d) * (d * d - 2.0) / (implied_vol_value * implied_vol_value)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def bachelier_digital_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    theta sensitivity for Bachelier formula for digital option.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = 0.5 * d * normal_density(d) / time_value
+    return call_value if is_call_bool else -call_value  # put
+
+
+def bachelier_digital_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual delta sensitivity for Bachelier formula for digital option.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = -normal_density(d) / sigma
+    return call_value if is_call_bool else -call_value  # put
+
+
+def bachelier_digital_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual gamma sensitivity for Bachelier formula for digital option.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = -d * normal_density(d) / (sigma * sigma)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def bachelier_straddle_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier vanna sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    return 2.0 * bachelier_vanna(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier volga (vomma) sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    return 2.0 * bachelier_volga(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier theta sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    return 2.0 * bachelier_theta(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier dual delta sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return -1.0 if fms >= 0.0 else 1.0
+
+    return 1.0 - 2.0 * normal_cdf(d)
+
+
+def bachelier_straddle_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier dual gamma sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    return 2.0 * bachelier_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+# --- price and greeks ---
+
+def bachelier_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                               second_order_bool=False):
+    """
+    Bachelier price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    d, the cdf and the density are evaluated only once for all figures.
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = option_payoff(forward_value, strike_value, is_call_bool)
+        if is_call_bool:
+            delta = 1.0 if fms > 0.0 else 0.0
+        else:
+            delta = -1.0 if fms < 0.0 else 0.0
+        return (value, delta, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, delta, 0.0, 0.0)
+
+    nd = normal_cdf(d)
+    density = normal_density(d)
+    value = fms * nd + sigma * density
+    delta = nd
+    if not is_call_bool:
+        value -= fms
+        delta -= 1.0
+    gamma = density / sigma
+    vega = sqrt(time_value) * density
+    if not second_order_bool:
+        return value, delta, gamma, vega
+    vanna = -d * density / implied_vol_value
+    volga = vega * d * d / implied_vol_value
+    return value, delta, gamma, vega, vanna, volga
+
+
+def bachelier_digital_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                                       second_order_bool=False):
+    """
+    Bachelier digital price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = digital_option_payoff(forward_value, strike_value, is_call_bool)
+        return (value, 0.0, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, 0.0, 0.0, 0.0)
+
+    w = 1.0 if is_call_bool else -1.0
+    density = normal_density(d)
+    value = normal_cdf(w * d)
+    delta = w * density / sigma
+    gamma = -w * d * density / (sigma * sigma)
+    vega = -w * d * density / implied_vol_value
+    if not second_order_bool:
+        return value, delta, gamma, vega
+    vanna = w * density * (d * d - 1.0) / (sigma * implied_vol_value)
+    volga = -w * d * density * (d * d - 2.0) / (implied_vol_value * implied_vol_value)
+    return value, delta, gamma, vega, vanna, volga
+
+
+def bachelier_straddle_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                                        second_order_bool=False):
+    """
+    Bachelier straddle price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    """
+
+    sigma, fms, d = _bachelier_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = straddle_payoff(forward_value, strike_value, is_call_bool)
+        delta = 1.0 if fms >= 0.0 else -1.0
+        return (value, delta, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, delta, 0.0, 0.0)
+
+    call = bachelier_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, True,
+                                      second_order_bool)
+    # straddle is call plus put and put delta is call delta minus one
+    value = 2.0 * call[0] - fms
+    delta = 2.0 * call[1] - 1.0
+    return (value, delta) + tuple(2.0 * g for g in call[2:])
+
+
+# --- array versions ---
+
+def _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value):
+    sigma = np.asarray(implied_vol_value, dtype=float) * np.sqrt(np.asarray(time_value, dtype=float))
+    fms = np.asarray(forward_value, dtype=float) - np.asarray(strike_value, dtype=float)
+    random = sigma > 0.0
+    d = np.where(random, fms / np.where(random, sigma, 1.0), 0.0)
+    return sigma, fms, d, random
+
+
+def _omega(is_call_bool):
+    return np.where(is_call_bool, 1.0, -1.0)
+
+
+def bachelier_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier formula (Black formula for normal underlying distribution) on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    All arguments are broadcast against each other.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    call_value = fms * normal_cdf_array(d) + sigma * normal_density_array(d)
+    value = np.where(is_call_bool, call_value, call_value - fms)
+    return np.where(random, value, option_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def bachelier_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    delta sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = np.where(is_call_bool, normal_cdf_array(d), -normal_cdf_array(-d))
+    intrinsic = np.where(is_call_bool, np.where(fms > 0.0, 1.0, 0.0), np.where(fms < 0.0, -1.0, 0.0))
+    return np.where(random, value, intrinsic)
+
+
+def bachelier_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    gamma sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = normal_density_array(d) / np.where(random, sigma, 1.0)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vega sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = np.sqrt(time_value) * normal_density_array(d)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier formula for digital option (Black formula for normal underlying distribution) on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = normal_cdf_array(_omega(is_call_bool) * d)
+    return np.where(random, value, digital_option_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def bachelier_digital_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    delta sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = _omega(is_call_bool) * normal_density_array(d) / np.where(random, sigma, 1.0)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    gamma sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = -_omega(is_call_bool) * d * normal_density_array(d) / (safe_sigma * safe_sigma)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vega sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -_omega(is_call_bool) * d * normal_density_array(d) / vol
+    return np.where(random, value, 0.0)
+
+
+def bachelier_straddle_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier formula for straddle option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = fms * (2.0 * normal_cdf_array(d) - 1.0) + 2.0 * sigma * normal_density_array(d)
+    return np.where(random, value, straddle_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def bachelier_straddle_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier delta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = 2.0 * normal_cdf_array(d) - 1.0
+    return np.where(random, value, np.where(fms >= 0.0, 1.0, -1.0))
+
+
+def bachelier_straddle_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier gamma sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * bachelier_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool)
+
+
+def bachelier_straddle_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier vega sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * bachelier_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool)
+
+
+def bachelier_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vanna sensitivity (derivative of delta by volatility) for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -d * normal_density_array(d) / vol
+    return np.where(random, value, 0.0)
+
+
+def bachelier_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    volga (vomma) sensitivity (derivative of vega by volatility) for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    vega = normal_density_array(d) * np.sqrt(time_value)
+    value = vega * d * d / vol
+    return np.where(random, value, 0.0)
+
+
+def bachelier_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    theta sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    time = np.where(random, time_value, 1.0)
+    value = -0.5 * normal_density_array(d) * implied_vol_value / np.sqrt(time)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual delta sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    call_value = -normal_cdf_array(d)
+    value = np.where(is_call_bool, call_value, call_value + 1.0)
+    intrinsic = np.where(is_call_bool, np.where(fms > 0.0, -1.0, 0.0), np.where(fms < 0.0, 1.0, 0.0))
+    return np.where(random, value, intrinsic)
+
+
+def bachelier_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual gamma sensitivity for Bachelier formula on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = normal_density_array(d) / safe_sigma
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    vanna sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = _omega(is_call_bool) * normal_density_array(d) * (d * d - 1.0) / (safe_sigma * vol)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    volga (vomma) sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -_omega(is_call_bool) * d * normal_density_array(d) * (d * d - 2.0) / (vol * vol)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    theta sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    time = np.where(random, time_value, 1.0)
+    value = 0.5 * _omega(is_call_bool) * d * normal_density_array(d) / time
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual delta sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = -_omega(is_call_bool) * normal_density_array(d) / safe_sigma
+    return np.where(random, value, 0.0)
+
+
+def bachelier_digital_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    dual gamma sensitivity for Bachelier formula for digital option on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = -_omega(is_call_bool) * d * normal_density_array(d) / (safe_sigma * safe_sigma)
+    return np.where(random, value, 0.0)
+
+
+def bachelier_straddle_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier vanna sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * bachelier_vanna_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier volga (vomma) sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * bachelier_volga_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier theta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    return 2.0 * bachelier_theta_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def bachelier_straddle_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier dual delta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d, random = _bachelier_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = 1.0 - 2.0 * normal_cdf_array(d)
+    return np.where(random, value, np.where(fms >= 0.0, -1.0, 1.0))
+
+
+def bachelier_straddle_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Bachelier dual gamma sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    return 2.0 * bachelier_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, True)
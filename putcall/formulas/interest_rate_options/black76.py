@@ -12,10 +12,11 @@
 
 from math import sqrt, log
 
-from mathtoolspy import cdf_abramowitz_stegun as normal_cdf
-from mathtoolspy import density_normal_dist as normal_density
+import numpy as np
 
+from ..normal_distribution import normal_cdf, normal_density, normal_cdf_array, normal_density_array
 from ..option_payoffs import option_payoff, digital_option_payoff, straddle_payoff
+from ..option_payoffs import option_payoff_array, digital_option_payoff_array, straddle_payoff_array
 #from putcall.formulas.option_payoffs import option_payoff, digital_option_payoff, straddle_payoff
 
 
@@ -97,7 +98,8 @@ def black_gamma(forward_value, strike_value, implied_vol_value, time_value, is_c
     if sigma == 0.0:
         return 0.0
 
-    return None  # TODO Black76 gamma
+    # call and put
+    return normal_density(d1) / (sigma * forward_value)
 
 
 def black_vega(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -162,10 +164,10 @@ def black_digital_delta(forward_value, strike_value, implied_vol_value, time_val
 
     if is_call_bool:
         # call
-        return normal_density(d1) / (sigma * forward_value)
+        return normal_density(d0) / (sigma * forward_value)
     else:
         # put
-        return -normal_density(-d1) / (sigma * forward_value)
+        return -normal_density(-d0) / (sigma * forward_value)
 
 
 def black_digital_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -186,7 +188,10 @@ def black_digital_gamma(forward_value, strike_value, implied_vol_value, time_val
     if sigma == 0.0:
         return 0.0
 
-    return None  # TODO Black76 gamma for digital payoff
+    # call
+    sf = sigma * forward_value
+    call_value = -d1 * normal_density(d0) / (sf * sf)
+    return call_value if is_call_bool else -call_value  # put
 
 
 def black_digital_vega(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -208,7 +213,7 @@ def black_digital_vega(forward_value, strike_value, implied_vol_value, time_valu
         return 0.0
 
     # call
-    call_value = d1 * normal_density(d0) / implied_vol_value
+    call_value = -d1 * normal_density(d0) / implied_vol_value
     return call_value if is_call_bool else -call_value  # put
 
 
@@ -256,7 +261,7 @@ def black_straddle_delta(forward_value, strike_value, implied_vol_value, time_va
     if sigma == 0.0:
         return 1.0 if fms >= 0.0 else -1.0
 
-    return 2.0 * normal_density(d1) - 1
+    return 2.0 * normal_cdf(d1) - 1
 
 
 def black_straddle_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -277,7 +282,7 @@ def black_straddle_gamma(forward_value, strike_value, implied_vol_value, time_va
     if sigma == 0.0:
         return 0.0
 
-    return None  # TODO Black76 gamma for straddle payoff
+    return 2.0 * normal_density(d1) / (sigma * forward_value)
 
 
 def black_straddle_vega(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
@@ -299,3 +304,990 @@ def black_straddle_vega(forward_value, strike_value, implied_vol_value, time_val
         return 0.0
 
     return 2.0 * forward_value * sqrt(time_value) * normal_density(d1)
+
+
+# --- vanna, volga, theta and dual greeks ---
+
+def black_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity (derivative of delta by volatility).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return -normal_density(d1) * d0 / implied_vol_value
+
+
+def black_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity (derivative of vega by volatility).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    vega = forward_value * normal_density(d1) * sqrt(time_value)
+    return vega * d0 * d1 / implied_vol_value
+
+
+def black_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return -0.5 * forward_value * normal_density(d1) * implied_vol_value / sqrt(time_value)
+
+
+def black_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        if is_call_bool:
+            return -1.0 if fms > 0.0 else 0.0
+        else:
+            return 1.0 if fms < 0.0 else 0.0
+
+    # call
+    call_value = -normal_cdf(d0)
+    return call_value if is_call_bool else call_value + 1.0  # put
+
+
+def black_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call and put
+    return normal_density(d0) / (strike_value * sigma)
+
+
+def black_digital_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity for digital payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = normal_density(d0) * (d0 * d1 - 1.0) / (forward_value * sigma * implied_vol_value)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def black_digital_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity for digital payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = -normal_density(d0) * (d0 * d1 * d1 - d0 - d1) / (implied_vol_value * implied_vol_value)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def black_digital_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity for digital payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = 0.5 * normal_density(d0) * d1 / time_value
+    return call_value if is_call_bool else -call_value  # put
+
+
+def black_digital_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity for digital payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = -normal_density(d0) / (strike_value * sigma)
+    return call_value if is_call_bool else -call_value  # put
+
+
+def black_digital_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity for digital payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return 0.0
+
+    # call
+    call_value = normal_density(d0) * (sigma - d0) / (strike_value * sigma) ** 2
+    return call_value if is_call_bool else -call_value  # put
+
+
+def black_straddle_vanna(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    return 2.0 * black_vanna(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_volga(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    """
+
+    return 2.0 * black_volga(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_theta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    return 2.0 * black_theta(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_dual_delta(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        return -1.0 if fms >= 0.0 else 1.0
+
+    return 1.0 - 2.0 * normal_cdf(d0)
+
+
+def black_straddle_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity for straddle payoff.
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :return: float
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    return 2.0 * black_dual_gamma(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+# --- price and greeks ---
+
+def black_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                           second_order_bool=False):
+    """
+    Black-76 price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    d0, d1, the cdfs and the density are evaluated only once for all figures.
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = option_payoff(forward_value, strike_value, is_call_bool)
+        if is_call_bool:
+            delta = 1.0 if fms > 0.0 else 0.0
+        else:
+            delta = -1.0 if fms < 0.0 else 0.0
+        return (value, delta, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, delta, 0.0, 0.0)
+
+    nd1 = normal_cdf(d1)
+    nd0 = normal_cdf(d0)
+    density = normal_density(d1)
+    if is_call_bool:
+        value = forward_value * nd1 - strike_value * nd0
+        delta = nd1
+    else:
+        value = strike_value * (1.0 - nd0) - forward_value * (1.0 - nd1)
+        delta = nd1 - 1.0
+    gamma = density / (forward_value * sigma)
+    vega = forward_value * sqrt(time_value) * density
+    if not second_order_bool:
+        return value, delta, gamma, vega
+    vanna = -density * d0 / implied_vol_value
+    volga = vega * d0 * d1 / implied_vol_value
+    return value, delta, gamma, vega, vanna, volga
+
+
+def black_digital_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                                   second_order_bool=False):
+    """
+    Black-76 digital price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = digital_option_payoff(forward_value, strike_value, is_call_bool)
+        return (value, 0.0, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, 0.0, 0.0, 0.0)
+
+    w = 1.0 if is_call_bool else -1.0
+    density = normal_density(d0)
+    fs = forward_value * sigma
+    value = normal_cdf(w * d0)
+    delta = w * density / fs
+    gamma = -w * density * d1 / (fs * fs)
+    vega = -w * density * d1 / implied_vol_value
+    if not second_order_bool:
+        return value, delta, gamma, vega
+    vanna = w * density * (d0 * d1 - 1.0) / (fs * implied_vol_value)
+    volga = -w * density * (d0 * d1 * d1 - d0 - d1) / (implied_vol_value * implied_vol_value)
+    return value, delta, gamma, vega, vanna, volga
+
+
+def black_straddle_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                                    second_order_bool=False):
+    """
+    Black-76 straddle price together with delta, gamma and vega (and optionally vanna and volga).
+
+    :param float forward_value: forward price of underlying at exercise date
+    :param float strike_value: strike price
+    :param float implied_vol_value: volatility of underlying price
+    :param float time_value: year fraction until exercise date
+    :param boolean is_call_bool: call -> True, put -> False
+    :param boolean second_order_bool: add vanna and volga to result
+    :return: tuple(float) of price, delta, gamma, vega (, vanna, volga)
+
+    """
+
+    sigma, fms, d0, d1 = _black_param(forward_value, strike_value, implied_vol_value, time_value)
+
+    if sigma == 0.0:
+        value = straddle_payoff(forward_value, strike_value, is_call_bool)
+        delta = 1.0 if fms >= 0.0 else -1.0
+        return (value, delta, 0.0, 0.0, 0.0, 0.0) if second_order_bool else (value, delta, 0.0, 0.0)
+
+    call = black_price_and_greeks(forward_value, strike_value, implied_vol_value, time_value, True, second_order_bool)
+    # straddle is call plus put and put delta is call delta minus one
+    value = 2.0 * call[0] - fms
+    delta = 2.0 * call[1] - 1.0
+    return (value, delta) + tuple(2.0 * g for g in call[2:])
+
+
+# --- array versions ---
+
+def _black_param_array(forward_value, strike_value, implied_vol_value, time_value):
+    forward_value = np.asarray(forward_value, dtype=float)
+    strike_value = np.asarray(strike_value, dtype=float)
+    sigma = np.asarray(implied_vol_value, dtype=float) * np.sqrt(np.asarray(time_value, dtype=float))
+    fms = forward_value - strike_value
+    random = sigma > 0.0
+    safe_sigma = np.where(random, sigma, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d0 = np.where(random, (np.log(forward_value / strike_value) - 0.5 * sigma ** 2) / safe_sigma, 0.0)
+    d1 = d0 + sigma
+    return sigma, fms, d0, d1, random
+
+
+def _omega(is_call_bool):
+    return np.where(is_call_bool, 1.0, -1.0)
+
+
+def black_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Standard Black-76 formula for log-normal underlying distribution on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    All arguments are broadcast against each other.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    w = _omega(is_call_bool)
+    value = w * (forward_value * normal_cdf_array(w * d1) - strike_value * normal_cdf_array(w * d0))
+    return np.where(random, value, option_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def black_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 delta sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    call_value = normal_cdf_array(d1)
+    value = np.where(is_call_bool, call_value, call_value - 1.0)
+    intrinsic = np.where(is_call_bool, np.where(fms > 0.0, 1.0, 0.0), np.where(fms < 0.0, -1.0, 0.0))
+    return np.where(random, value, intrinsic)
+
+
+def black_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 gamma sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = normal_density_array(d1) / (np.where(random, sigma, 1.0) * forward_value)
+    return np.where(random, value, 0.0)
+
+
+def black_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vega sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = forward_value * np.sqrt(time_value) * normal_density_array(d1)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Standard Black-76 formula for digital option on log-normal underlying distribution on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = normal_cdf_array(_omega(is_call_bool) * d0)
+    return np.where(random, value, digital_option_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def black_digital_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 delta sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = _omega(is_call_bool) * normal_density_array(d0) / (np.where(random, sigma, 1.0) * forward_value)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 gamma sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    sf = np.where(random, sigma, 1.0) * forward_value
+    value = -_omega(is_call_bool) * d1 * normal_density_array(d0) / (sf * sf)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vega sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -_omega(is_call_bool) * d1 * normal_density_array(d0) / vol
+    return np.where(random, value, 0.0)
+
+
+def black_straddle_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Standard Black-76 formula for straddle option on log-normal underlying distribution on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    nd1 = normal_cdf_array(d1)
+    nd2 = normal_cdf_array(d0)
+    mnd1 = normal_cdf_array(-d1)
+    mnd2 = normal_cdf_array(-d0)
+    value = forward_value * nd1 - strike_value * nd2 + strike_value * mnd2 - forward_value * mnd1
+    return np.where(random, value, straddle_payoff_array(forward_value, strike_value, is_call_bool))
+
+
+def black_straddle_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 delta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = 2.0 * normal_cdf_array(d1) - 1
+    return np.where(random, value, np.where(fms >= 0.0, 1.0, -1.0))
+
+
+def black_straddle_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 gamma sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * black_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool)
+
+
+def black_straddle_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vega sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * black_vega_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool)
+
+
+def black_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity (derivative of delta by volatility) on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -normal_density_array(d1) * d0 / vol
+    return np.where(random, value, 0.0)
+
+
+def black_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity (derivative of vega by volatility) on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    vega = forward_value * normal_density_array(d1) * np.sqrt(time_value)
+    value = vega * d0 * d1 / vol
+    return np.where(random, value, 0.0)
+
+
+def black_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    time = np.where(random, time_value, 1.0)
+    value = -0.5 * forward_value * normal_density_array(d1) * implied_vol_value / np.sqrt(time)
+    return np.where(random, value, 0.0)
+
+
+def black_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    call_value = -normal_cdf_array(d0)
+    value = np.where(is_call_bool, call_value, call_value + 1.0)
+    intrinsic = np.where(is_call_bool, np.where(fms > 0.0, -1.0, 0.0), np.where(fms < 0.0, 1.0, 0.0))
+    return np.where(random, value, intrinsic)
+
+
+def black_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = normal_density_array(d0) / (strike_value * safe_sigma)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = _omega(is_call_bool) * normal_density_array(d0) * (d0 * d1 - 1.0) / (forward_value * safe_sigma * vol)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    vol = np.where(random, implied_vol_value, 1.0)
+    value = -_omega(is_call_bool) * normal_density_array(d0) * (d0 * d1 * d1 - d0 - d1) / (vol * vol)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    time = np.where(random, time_value, 1.0)
+    value = 0.5 * _omega(is_call_bool) * normal_density_array(d0) * d1 / time
+    return np.where(random, value, 0.0)
+
+
+def black_digital_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = -_omega(is_call_bool) * normal_density_array(d0) / (strike_value * safe_sigma)
+    return np.where(random, value, 0.0)
+
+
+def black_digital_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity for digital payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    safe_sigma = np.where(random, sigma, 1.0)
+    value = _omega(is_call_bool) * normal_density_array(d0) * (sigma - d0) / (strike_value * safe_sigma) ** 2
+    return np.where(random, value, 0.0)
+
+
+def black_straddle_vanna_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 vanna sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * black_vanna_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_volga_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 volga (vomma) sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    """
+
+    return 2.0 * black_volga_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_theta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 theta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Theta is the negative derivative by time to expiry `time_value`
+    for a fixed forward, i.e. without discounting.
+
+    """
+
+    return 2.0 * black_theta_array(forward_value, strike_value, implied_vol_value, time_value, True)
+
+
+def black_straddle_dual_delta_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual delta sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    sigma, fms, d0, d1, random = _black_param_array(forward_value, strike_value, implied_vol_value, time_value)
+    value = 1.0 - 2.0 * normal_cdf_array(d0)
+    return np.where(random, value, np.where(fms >= 0.0, -1.0, 1.0))
+
+
+def black_straddle_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, is_call_bool):
+    """
+    Black-76 dual gamma sensitivity for straddle payoff on arrays.
+
+    :param array_like forward_value: forward prices of underlying at exercise date
+    :param array_like strike_value: strike prices
+    :param array_like implied_vol_value: volatilities of underlying price
+    :param array_like time_value: year fractions until exercise date
+    :param array_like is_call_bool: call -> True, put -> False
+    :return: numpy.ndarray
+
+    Dual delta and dual gamma are derivatives by strike `strike_value`.
+
+    """
+
+    return 2.0 * black_dual_gamma_array(forward_value, strike_value, implied_vol_value, time_value, True)
@@ -12,7 +12,9 @@
 
 import math
 
-from mathtoolspy.distribution.normal_distribution import cdf_abramowitz_stegun as normal_cdf
+import numpy as np
+
+from ..normal_distribution import normal_cdf, normal_cdf_array
 
 
 def hw_discount_bond_option(forward_value, strike_value, implied_vol_value, time_value, is_call_bool,
@@ -83,3 +85,177 @@ def hw_cap_floor_let(forward_rate_value, strike_value, implied_vol_value, time_v
     hw_bond_opt = hw_discount_bond_option(forward, strike, vol, t, not is_call_bool, yf, mr, df)
 
     return (1 + year_fraction_value * strike_value) * hw_bond_opt
+
+
+# --- price and gradient ---
+
+def hw_cap_floor_let_price_and_gradient(forward_rate_value, strike_value, implied_vol_value, time_value,
+                                        is_call_bool, year_fraction_value, mean_reversion_value, discount_value):
+    """
+    price of a caplet/floorlet under the Hull White framework
+    together with its derivatives with respect to mean reversion and volatility
+
+    :param float forward_rate_value: forward rate (LIBOR,EURIBOR...)
+    :param float strike_value: strike of the option
+    :param float implied_vol_value: volatility of the spot rate
+    :param float time_value: year_fraction between pricing date (e.g. start of the Cap) and start of the caplet Y(t,T)
+    :param bool is_call_bool: call(caplet) -> True, put(floorlet) -> False
+    :param float year_fraction_value: year fraction between start and maturity = tenor of the rate
+    :param float mean_reversion_value: mean reversion in the Hull White model
+    :param float discount_value: zero bond price between pricing time and start of the caplet (D(t,T,r))
+    :return: tuple(float) of value, derivative by mean reversion, derivative by volatility
+
+    As in `hw_cap_floor_let` the caplet is a put on the discount bond (and the floorlet a call).
+    The bond option is a Black formula in the bond volatility
+    :math:`\\Sigma = B(a, \\tau) \\sqrt{v(a, T)}\\ \\sigma`
+    with :math:`B(a, \\tau) = (1 - e^{-a\\tau}) / a` and :math:`v(a, T) = (1 - e^{-2aT}) / (2a)`.
+    So both derivatives follow by chain rule from the bond option vega
+    :math:`\\partial P / \\partial \\Sigma = F \\phi(h)`.
+
+    """
+    if time_value == 0:
+        return 0.0, 0.0, 0.0
+    tau, t, mr, vol = year_fraction_value, time_value, mean_reversion_value, implied_vol_value
+    forward = discount_value / (1 + tau * forward_rate_value)
+    strike = discount_value / (1 + tau * strike_value)
+
+    exp_tau, exp_two_t = math.exp(-mr * tau), math.exp(-2 * mr * t)
+    b = (1 - exp_tau) / mr
+    v = (1 - exp_two_t) / (2 * mr)
+    sigma = b * math.sqrt(v) * vol
+    d_b = tau * exp_tau / mr - b / mr
+    d_v = t * exp_two_t / mr - v / mr
+
+    h = math.log(forward / strike) / sigma + 0.5 * sigma
+    if is_call_bool:
+        # caplet is a put on the discount bond
+        value = strike * normal_cdf(-h + sigma) - forward * normal_cdf(-h)
+    else:
+        value = forward * normal_cdf(h) - strike * normal_cdf(h - sigma)
+    bond_vega = forward * math.exp(-0.5 * h * h) / math.sqrt(2 * math.pi)
+
+    notional = 1 + tau * strike_value
+    d_mr = bond_vega * sigma * (d_b / b + 0.5 * d_v / v)
+    d_vol = bond_vega * sigma / vol
+    return notional * value, notional * d_mr, notional * d_vol
+
+
+# --- array versions ---
+
+def hw_bond_volatility_array(implied_vol_value, time_value, year_fraction_value, mean_reversion_value):
+    """
+    volatility of the discount bond option in the Hull White framework for arrays
+
+    :param array_like implied_vol_value: volatilities of the spot rate
+    :param array_like time_value: year fractions until exercise date (option maturity date)
+    :param array_like year_fraction_value: year fractions between option's maturity and bond's maturity
+    :param array_like mean_reversion_value: mean reversions / alpha
+    :return: numpy.ndarray
+
+    :math:`\\Sigma = B(a, \\tau) \\sqrt{v(a, T)}\\ \\sigma`
+    with :math:`B(a, \\tau) = (1 - e^{-a\\tau}) / a` and :math:`v(a, T) = (1 - e^{-2aT}) / (2a)`.
+    All arguments are broadcast against each other.
+
+    """
+    mr = np.asarray(mean_reversion_value, dtype=float)
+    time_value = np.asarray(time_value, dtype=float)
+    b = (1 - np.exp(-mr * np.asarray(year_fraction_value, dtype=float))) / mr
+    var = (1 - np.exp(-2 * mr * time_value)) / (2 * mr)
+    return b * np.sqrt(var) * np.asarray(implied_vol_value, dtype=float)
+
+
+def hw_cap_floor_let_by_bond_volatility_array(forward_rate_value, strike_value, bond_vol_value, time_value,
+                                              is_call_bool, year_fraction_value, discount_value):
+    """
+    pricing formula of caplets/floorlets under the Hull White framework given the bond volatility for arrays
+
+    :param array_like forward_rate_value: forward rates (LIBOR,EURIBOR...)
+    :param array_like strike_value: strikes of the options
+    :param array_like bond_vol_value: volatilities of the discount bond options
+        (see `hw_bond_volatility_array`)
+    :param array_like time_value: year_fractions between pricing date and start of the caplets
+    :param array_like is_call_bool: call(caplet) -> True, put(floorlet) -> False
+    :param array_like year_fraction_value: year fractions between start and maturity = tenors of the rates
+    :param array_like discount_value: zero bond prices between pricing time and start of the caplets
+    :return: numpy.ndarray
+
+    All arguments are broadcast against each other.
+
+    """
+    year_fraction_value = np.asarray(year_fraction_value, dtype=float)
+    notional = 1 + year_fraction_value * np.asarray(strike_value, dtype=float)
+    forward = np.asarray(discount_value, dtype=float) / (1 + year_fraction_value * forward_rate_value)
+    strike = np.asarray(discount_value, dtype=float) / notional
+    sigma = np.asarray(bond_vol_value, dtype=float)
+    random = np.asarray(time_value, dtype=float) > 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = np.log(forward / strike) / sigma + 0.5 * sigma
+    # caplet is a put on the discount bond
+    w = np.where(is_call_bool, -1.0, 1.0)
+    value = w * (forward * normal_cdf_array(w * h) - strike * normal_cdf_array(w * (h - sigma)))
+    return np.where(random, notional * value, 0.0)
+
+
+def hw_cap_floor_let_array(forward_rate_value, strike_value, implied_vol_value, time_value, is_call_bool,
+                           year_fraction_value, mean_reversion_value, discount_value):
+    """
+    pricing formula of caplets/floorlets under the Hull White framework for arrays
+
+    :param array_like forward_rate_value: forward rates (LIBOR,EURIBOR...)
+    :param array_like strike_value: strikes of the options
+    :param array_like implied_vol_value: volatilities of the spot rate
+    :param array_like time_value: year_fractions between pricing date and start of the caplets
+    :param array_like is_call_bool: call(caplet) -> True, put(floorlet) -> False
+    :param array_like year_fraction_value: year fractions between start and maturity = tenors of the rates
+    :param array_like mean_reversion_value: mean reversions in the Hull White model
+    :param array_like discount_value: zero bond prices between pricing time and start of the caplets
+    :return: numpy.ndarray
+
+    Array version of `hw_cap_floor_let`. All arguments are broadcast against each other.
+
+    """
+    bond_vol = hw_bond_volatility_array(implied_vol_value, time_value, year_fraction_value, mean_reversion_value)
+    return hw_cap_floor_let_by_bond_volatility_array(forward_rate_value, strike_value, bond_vol, time_value,
+                                                     is_call_bool, year_fraction_value, discount_value)
+
+
+def hw_cap_floor_let_price_and_gradient_array(forward_rate_value, strike_value, implied_vol_value, time_value,
+                                              is_call_bool, year_fraction_value, mean_reversion_value,
+                                              discount_value):
+    """
+    prices of caplets/floorlets under the Hull White framework
+    together with their derivatives with respect to mean reversion and volatility for arrays
+
+    :param array_like forward_rate_value: forward rates (LIBOR,EURIBOR...)
+    :param array_like strike_value: strikes of the options
+    :param array_like implied_vol_value: volatilities of the spot rate
+    :param array_like time_value: year_fractions between pricing date and start of the caplets
+    :param array_like is_call_bool: call(caplet) -> True, put(floorlet) -> False
+    :param array_like year_fraction_value: year fractions between start and maturity = tenors of the rates
+    :param array_like mean_reversion_value: mean reversions in the Hull White model
+    :param array_like discount_value: zero bond prices between pricing time and start of the caplets
+    :return: tuple(numpy.ndarray) of values, derivatives by mean reversion, derivatives by volatility
+
+    Array version of `hw_cap_floor_let_price_and_gradient`. All arguments are broadcast against each other.
+
+    """
+    tau = np.asarray(year_fraction_value, dtype=float)
+    t = np.asarray(time_value, dtype=float)
+    mr = np.asarray(mean_reversion_value, dtype=float)
+    vol = np.asarray(implied_vol_value, dtype=float)
+    forward = np.asarray(discount_value, dtype=float) / (1 + tau * forward_rate_value)
+    notional = 1 + tau * np.asarray(strike_value, dtype=float)
+    random = t > 0.0
+
+    exp_tau, exp_two_t = np.exp(-mr * tau), np.exp(-2 * mr * t)
+    b = (1 - exp_tau) / mr
+    v = (1 - exp_two_t) / (2 * mr)
+    sigma = b * np.sqrt(v) * vol
+    value = hw_cap_floor_let_by_bond_volatility_array(forward_rate_value, strike_value, sigma, time_value,
+                                                      is_call_bool, year_fraction_value, discount_value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = np.log(forward * notional / discount_value) / sigma + 0.5 * sigma
+        bond_vega = notional * forward * np.exp(-0.5 * h * h) / math.sqrt(2 * math.pi)
+        d_mr = bond_vega * sigma * ((tau * exp_tau / mr - b / mr) / b + 0.5 * (t * exp_two_t / mr - v / mr) / v)
+        d_vol = bond_vega * sigma / vol
+    return value, np.where(random, d_mr, 0.0), np.where(random, d_vol, 0.0)
@@ -13,6 +13,8 @@
 import math
 import logging
 
+import numpy as np
+
 pace_log = logging.getLogger('pace')
 
 # ----- sabr -----
@@ -38,39 +40,12 @@ def sabr_black_vol(strike_value, forward_value, alpha_value, beta_value, nu_valu
     :type time_value:
     :return:
     :rtype:
+
+    Scalar version of `sabr_black_vol_array` (Hagan's formula including the factor :math:`z / x(z)`),
+    so parameters calibrated by `sabr_calibration_smile` reproduce the fitted smile.
     '''
-    return_value = 0.00
-    # Compute the Black equivalent voltatility from SABR model
-    forward_strike_value = forward_value * strike_value
-    log_moneyness_value = math.log(forward_value / strike_value)
-    one_minus_beta_value = 1 - beta_value
-    factor = 0.00
-    if abs(strike_value - forward_value) > EPS:
-        Z = nu_value / alpha_value * forward_strike_value ** (one_minus_beta_value / 2) * log_moneyness_value
-        xz = math.log((math.sqrt(1 - 2 * rho_value * Z + Z * Z) + Z - rho_value) / (1 - rho_value))
-        denom_value = forward_strike_value ** (one_minus_beta_value / 2) * (
-        1 + one_minus_beta_value ** 2 / 24 * log_moneyness_value ** 2 + one_minus_beta_value ** 4 / 1920 * log_moneyness_value ** 4)
-        factor = one_minus_beta_value ** 2 / 24 * alpha_value ** 2 / (forward_strike_value ** one_minus_beta_value)
-        factor = factor + 0.25 * rho_value * beta_value * alpha_value * nu_value / (
-        forward_strike_value ** (one_minus_beta_value / 2))
-        factor = factor + (2 - 3 * rho_value ** 2) * nu_value ** 2 / 24
-        factor = 1 + factor * time_value
-        # obloj correction
-        # return_value = alpha_value / denom_value * Z / xz * factor
-        return_value = alpha_value / denom_value * factor
-    else:
-        # factor = ( 1 +  ( one_minus_beta_value **2 / 24 * alpha_value ** 2 /  ( forward_value ** ( 2 * one_minus_beta_value ) ) + 0.25 * rho_value * beta_value * alpha_value * nu_value /  ( forward_value ** one_minus_beta_value )  +  ( 2 - 3 * rho_value * rho_value )  * nu_value * nu_value / 24 )  * time_value )
-        factor = one_minus_beta_value ** 2 / 24 * alpha_value ** 2 / (forward_value ** (2 * one_minus_beta_value))
-        factor = factor + 0.25 * rho_value * beta_value * alpha_value * nu_value / (
-        forward_value ** one_minus_beta_value)
-        factor = factor + (2 - 3 * rho_value ** 2) * nu_value ** 2 / 24
-        factor = 1 + factor * time_value
-        factor = (1 + (one_minus_beta_value ** 2 / 24 * alpha_value ** 2 / (
-        forward_value ** (2 * one_minus_beta_value)) + 0.25 * rho_value * beta_value * alpha_value * nu_value / (
-                       forward_value ** one_minus_beta_value) + (
-                       2 - 3 * rho_value * rho_value) * nu_value * nu_value / 24) * time_value)
-        return_value = alpha_value / forward_value ** one_minus_beta_value * factor
-    return return_value
+    return float(sabr_black_vol_array(
+        strike_value, forward_value, alpha_value, beta_value, nu_value, rho_value, time_value))
 
 
 def sabr_atmadj_black_vol(strike_value, forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value):
@@ -113,12 +88,258 @@ def sabr_alpha_from_atm(forward_value, atm_vol_value, beta_value, nu_value, rho_
     :type time_value:
     :return:
     :rtype:
+
+    Solves the Hagan ATM formula for alpha, see `sabr_alpha_from_atm_array`.
+    Raises `ValueError` if no positive alpha matches the ATM volatility.
     '''
-    alpha_value = 0.0
-    diff = sabr_black_vol(forward_value, forward_value, alpha_value, beta_value, nu_value, rho_value,
-                          time_value) - atm_vol_value
-    while diff < EPS:
-        alpha_value += EPS
-        diff = sabr_black_vol(forward_value, forward_value, alpha_value, beta_value, nu_value, rho_value,
-                              time_value) - atm_vol_value
+    alpha_value = float(sabr_alpha_from_atm_array(
+        forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value))
+    if math.isnan(alpha_value):
+        raise ValueError('No positive SABR alpha matches ATM volatility %s.' % str(atm_vol_value))
     return alpha_value
+
+
+def _sabr_atm_cubic(forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value):
+    # coefficients of the Hagan ATM formula as cubic polynomial in alpha
+    one_minus_beta_value = 1 - beta_value
+    f = forward_value ** one_minus_beta_value
+    a3 = one_minus_beta_value ** 2 / 24 * time_value / (f * f * f)
+    a2 = 0.25 * rho_value * beta_value * nu_value * time_value / (f * f)
+    a1 = (1 + (2 - 3 * rho_value ** 2) * nu_value ** 2 / 24 * time_value) / f
+    a0 = -atm_vol_value
+    return a3, a2, a1, a0
+
+
+def sabr_alpha_from_atm_array(forward_value, atm_vol_value, beta_value, nu_value, rho_value, time_value,
+                              newton_steps=2):
+    '''
+    :param forward_value: forward values
+    :type forward_value: array_like
+    :param atm_vol_value: Black ATM volatilities
+    :type atm_vol_value: array_like
+    :param beta_value: beta parameters
+    :type beta_value: array_like
+    :param nu_value: nu parameters
+    :type nu_value: array_like
+    :param rho_value: rho parameters
+    :type rho_value: array_like
+    :param time_value: times to expiry
+    :type time_value: array_like
+    :param newton_steps: number of Newton steps to polish the root (optional, default 2)
+    :type newton_steps: int
+    :return: alphas
+    :rtype: numpy.ndarray
+
+    At the money the Hagan formula is a cubic polynomial in alpha
+
+    .. math::
+
+        \\frac{(1-\\beta)^2 T}{24 f^3} \\alpha^3
+        + \\frac{\\rho \\beta \\nu T}{4 f^2} \\alpha^2
+        + \\frac{1}{f} \\Big(1 + \\frac{(2 - 3 \\rho^2) \\nu^2 T}{24}\\Big) \\alpha
+        - \\sigma_{ATM} = 0
+
+    with :math:`f = F^{1-\\beta}`. Alpha is taken as its smallest positive root,
+    given in closed form by Cardano's formula and polished by Newton steps.
+    For :math:`\\beta = 1` the cubic degenerates to a quadratic.
+
+    All arguments are broadcast against each other,
+    so a whole cube of (expiry, tenor) points is solved in one call.
+    Points without positive root give `nan`.
+    '''
+    a3, a2, a1, a0 = (np.asarray(c, dtype=float) for c in _sabr_atm_cubic(
+        np.asarray(forward_value, dtype=float), np.asarray(atm_vol_value, dtype=float),
+        np.asarray(beta_value, dtype=float), np.asarray(nu_value, dtype=float),
+        np.asarray(rho_value, dtype=float), np.asarray(time_value, dtype=float)))
+    a3, a2, a1, a0 = np.broadcast_arrays(a3, a2, a1, a0)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # smallest positive root of the quadratic a2 x^2 + a1 x + a0 (stable form, also covers a2 == 0)
+        disc = a1 * a1 - 4 * a2 * a0
+        quadratic = np.where(disc < 0, np.nan, -2 * a0 / (a1 + np.sqrt(np.abs(disc))))
+        quadratic = np.where(quadratic > 0, quadratic, np.nan)
+
+        # Cardano's formula for the monic cubic x^3 + b x^2 + c x + d
+        cubic = a3 != 0
+        a = np.where(cubic, a3, 1.)
+        b, c, d = a2 / a, a1 / a, a0 / a
+        p = c - b * b / 3
+        q = 2 * b * b * b / 27 - b * c / 3 + d
+        sqrt_disc = np.sqrt((q * q / 4 + p * p * p / 27).astype(complex))
+        w = -q / 2 + np.where(q > 0, -sqrt_disc, sqrt_disc)  # avoid cancellation
+        u = np.where(w == 0, 0j, np.exp(np.log(np.where(w == 0, 1., w)) / 3))
+        roots = list()
+        for k in range(3):
+            u_k = u * np.exp(2j * math.pi * k / 3)
+            v_k = np.where(u_k == 0, 0j, -p / (3 * np.where(u_k == 0, 1., u_k)))
+            roots.append(u_k + v_k - b / 3)
+        roots = np.array(roots)
+        scale = np.maximum(np.abs(roots.real), 1.)
+        real = (np.abs(roots.imag) < 1e-6 * scale) & (roots.real > 0)
+        candidates = np.where(real, roots.real, np.inf).min(axis=0)
+        alpha = np.where(cubic & np.isfinite(candidates), candidates, quadratic)
+
+        # Newton polish on the cubic
+        for _ in range(newton_steps):
+            value = ((a3 * alpha + a2) * alpha + a1) * alpha + a0
+            slope = (3 * a3 * alpha + 2 * a2) * alpha + a1
+            step = np.where(slope == 0, 0., value / slope)
+            alpha = alpha - step
+
+    alpha = np.where(alpha > 0, alpha, np.nan)
+    return alpha if alpha.ndim else alpha[()]
+
+
+# ----- sabr arrays -----
+
+def _sabr_z_over_x(z_value, rho_value, gradient=True):
+    # z / x(z) (and its derivatives by z and by rho) with a series expansion near z = 0
+    small = np.abs(z_value) < 1e-5
+    z = np.where(small, 1., z_value)
+    root = np.sqrt(1 - 2 * rho_value * z + z * z)
+    x = np.log((root + z - rho_value) / (1 - rho_value))
+    s = 1 - 0.5 * rho_value * z_value + (2 - 3 * rho_value * rho_value) / 12 * z_value * z_value
+    zx = np.where(small, s, z / x)
+    if not gradient:
+        return zx
+    dx_drho = (-z / root - 1) / (root + z - rho_value) + 1 / (1 - rho_value)
+    ds_dz = -0.5 * rho_value + (2 - 3 * rho_value * rho_value) / 6 * z_value
+    dzx_dz = np.where(small, ds_dz, (x - z / root) / (x * x))
+    ds_drho = -0.5 * z_value - 0.5 * rho_value * z_value * z_value
+    dzx_drho = np.where(small, ds_drho, -z / (x * x) * dx_drho)
+    return zx, dzx_dz, dzx_drho
+
+
+def _sabr_log_ratio(u):
+    # u / (1 - exp(-u)) with its limit 1 + u / 2 near u = 0
+    small = np.abs(u) < 1e-8
+    return np.where(small, 1 + 0.5 * u, u / -np.expm1(-np.where(small, 1., u)))
+
+
+def _sabr_precompute(forward_value, alpha_value, beta_value, nu_value, rho_value, time_value):
+    # strike independent terms of Hagan's formula, evaluated once per (forward, expiry, parameter set)
+    forward_value = np.asarray(forward_value, dtype=float)
+    alpha_value = np.asarray(alpha_value, dtype=float)
+    beta_value = np.asarray(beta_value, dtype=float)
+    nu_value = np.asarray(nu_value, dtype=float)
+    rho_value = np.asarray(rho_value, dtype=float)
+    time_value = np.asarray(time_value, dtype=float)
+    one_minus_beta_value = 1 - beta_value
+    p = dict()
+    p['alpha'], p['beta'], p['nu'], p['rho'], p['time'] = alpha_value, beta_value, nu_value, rho_value, time_value
+    p['log_forward'] = np.log(forward_value)
+    p['one_minus_beta'] = one_minus_beta_value
+    p['half_one_minus_beta'] = 0.5 * one_minus_beta_value
+    p['forward_one_minus_beta'] = forward_value ** one_minus_beta_value
+    p['nu_over_alpha'] = nu_value / alpha_value
+    # 1 + (1-beta)^2 / 24 L^2 + (1-beta)^4 / 1920 L^4
+    p['denom_2'] = one_minus_beta_value ** 2 / 24
+    p['denom_4'] = one_minus_beta_value ** 4 / 1920
+    # 1 + (a alpha^2 / s^2 + b alpha / s + c) T with s = (FK)^((1-beta)/2)
+    p['factor_a'] = one_minus_beta_value ** 2 / 24 * alpha_value * alpha_value * time_value
+    p['factor_b'] = 0.25 * rho_value * beta_value * nu_value * alpha_value * time_value
+    p['factor_c'] = 1 + (2 - 3 * rho_value * rho_value) / 24 * nu_value * nu_value * time_value
+    return p
+
+
+def _sabr_strike_terms(strike_value, p, obloj=False):
+    # strike dependent terms: level (vol without z/x(z) and factor), z, factor and 1 / s
+    log_strike_value = np.log(np.asarray(strike_value, dtype=float))
+    log_moneyness_value = p['log_forward'] - log_strike_value
+    inv_s = np.exp(-p['half_one_minus_beta'] * (p['log_forward'] + log_strike_value))
+    if obloj:
+        # z = nu / alpha (F^(1-beta) - K^(1-beta)) / (1-beta) and level nu L / z
+        q = _sabr_log_ratio(p['one_minus_beta'] * log_moneyness_value)
+        level = p['alpha'] * q / p['forward_one_minus_beta']
+        z_scale = p['forward_one_minus_beta'] * log_moneyness_value / q
+    else:
+        lm2 = log_moneyness_value * log_moneyness_value
+        level = p['alpha'] * inv_s / (1 + p['denom_2'] * lm2 + p['denom_4'] * lm2 * lm2)
+        z_scale = log_moneyness_value / inv_s
+    factor = p['factor_c'] + (p['factor_a'] * inv_s + p['factor_b']) * inv_s
+    return level, p['nu_over_alpha'] * z_scale, z_scale, factor, inv_s
+
+
+def sabr_black_vol_and_gradient_array(strike_value, forward_value, alpha_value, beta_value, nu_value, rho_value,
+                                      time_value, obloj=False):
+    '''
+    :param strike_value: strikes
+    :type strike_value: array_like
+    :param forward_value: forwards
+    :type forward_value: array_like
+    :param alpha_value: alpha parameters
+    :type alpha_value: array_like
+    :param beta_value: beta parameters
+    :type beta_value: array_like
+    :param nu_value: nu parameters
+    :type nu_value: array_like
+    :param rho_value: rho parameters
+    :type rho_value: array_like
+    :param time_value: times to expiry
+    :type time_value: array_like
+    :param obloj: use Obloj's leading term (optional, default `False`)
+    :type obloj: bool
+    :return: Black volatilities and their derivatives by alpha, by rho and by nu
+    :rtype: tuple(numpy.ndarray)
+
+    `sabr_black_vol_array` together with its analytic partial derivatives.
+    '''
+    p = _sabr_precompute(forward_value, alpha_value, beta_value, nu_value, rho_value, time_value)
+    level, z_value, z_scale, factor, inv_s = _sabr_strike_terms(strike_value, p, obloj)
+    alpha_value, beta_value, nu_value, rho_value, time_value = p['alpha'], p['beta'], p['nu'], p['rho'], p['time']
+    zx, dzx_dz, dzx_drho = _sabr_z_over_x(z_value, rho_value)
+
+    d_factor_d_alpha = (2 * p['factor_a'] * inv_s + p['factor_b']) * inv_s / alpha_value
+    d_factor_d_rho = (0.25 * beta_value * nu_value * alpha_value * inv_s - 0.25 * rho_value * nu_value * nu_value) \
+        * time_value
+    d_factor_d_nu = (0.25 * rho_value * beta_value * alpha_value * inv_s + (2 - 3 * rho_value * rho_value) / 12 *
+                     nu_value) * time_value
+
+    vol = level * zx * factor
+    d_alpha = vol / alpha_value + level * (dzx_dz * -z_value / alpha_value * factor + zx * d_factor_d_alpha)
+    d_rho = level * (dzx_drho * factor + zx * d_factor_d_rho)
+    d_nu = level * (dzx_dz * z_scale / alpha_value * factor + zx * d_factor_d_nu)
+    return vol, d_alpha, d_rho, d_nu
+
+
+def sabr_black_vol_array(strike_value, forward_value, alpha_value, beta_value, nu_value, rho_value, time_value,
+                         obloj=False):
+    '''
+    :param strike_value: strikes
+    :type strike_value: array_like
+    :param forward_value: forwards
+    :type forward_value: array_like
+    :param alpha_value: alpha parameters
+    :type alpha_value: array_like
+    :param beta_value: beta parameters
+    :type beta_value: array_like
+    :param nu_value: nu parameters
+    :type nu_value: array_like
+    :param rho_value: rho parameters
+    :type rho_value: array_like
+    :param time_value: times to expiry
+    :type time_value: array_like
+    :param obloj: use Obloj's leading term (optional, default `False`)
+    :type obloj: bool
+    :return: Black volatilities
+    :rtype: numpy.ndarray
+
+    Array version of Hagan's formula. All arguments are broadcast against each other,
+    e.g. a strike vector against a single (forward, expiry, parameter set)
+    or a strike matrix against columns of them.
+    Strike independent terms are evaluated once per (forward, expiry, parameter set)
+    and each strike costs one logarithm and one exponential only (besides :math:`x(z)`).
+
+    It includes the factor :math:`z / x(z)`
+    which is evaluated by its series expansion
+    :math:`1 - \\frac{\\rho}{2} z + \\frac{2 - 3 \\rho^2}{12} z^2` near the money,
+    so the smile depends on nu and rho beyond the term linear in time.
+
+    With `obloj=True` the leading term is replaced by
+    :math:`\\frac{\\nu \\log(F/K)}{x(z)}` with
+    :math:`z = \\frac{\\nu}{\\alpha} \\frac{F^{1-\\beta} - K^{1-\\beta}}{1-\\beta}`,
+    see J. Obloj, *Fine-tune your smile: Correction to Hagan et al*, Wilmott, 2008.
+    '''
+    p = _sabr_precompute(forward_value, alpha_value, beta_value, nu_value, rho_value, time_value)
+    level, z_value, _, factor, _ = _sabr_strike_terms(strike_value, p, obloj)
+    return level * _sabr_z_over_x(z_value, p['rho'], gradient=False) * factor
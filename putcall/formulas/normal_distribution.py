@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+from math import erfc, exp, log, sqrt
+
+import numpy as np
+
+try:
+    from scipy.special import erfc as _erfc_array
+except ImportError:
+    # optional dependency (extra `putcall[scipy]`), without it `ERFC` and `ACCURATE` arrays loop in Python
+    _erfc_array = np.vectorize(erfc, otypes=[float])
+
+ONE_OVER_SQRT_OF_TWO_PI = 0.3989422804014327
+ONE_OVER_SQRT_OF_TWO = 0.7071067811865476
+# rounded constant of mathtoolspy.cdf_abramowitz_stegun to reproduce it exactly
+_ABRAMOWITZ_STEGUN_FACTOR = 0.398942280401433
+
+ABRAMOWITZ_STEGUN, ERFC, ACCURATE = 'abramowitz_stegun', 'erfc', 'accurate'
+
+ASYMPTOTIC_EXPANSION_THRESHOLD = -10.0
+ASYMPTOTIC_EXPANSION_TERMS = 20
+
+_normal_cdf_method = [ABRAMOWITZ_STEGUN]
+
+
+def set_normal_cdf_method(method=ABRAMOWITZ_STEGUN):
+    """
+    sets the global method used by `normal_cdf` and `normal_cdf_array`
+
+    :param str method: one of
+        `ABRAMOWITZ_STEGUN` (polynomial approximation, about 1e-7 accuracy),
+        `ERFC` (complementary error function, close to machine precision) or
+        `ACCURATE` (as `ERFC` but asymptotic expansion in the deep tails)
+    :return: str previous method
+
+    For arrays `ERFC` and `ACCURATE` use `scipy.special.erfc` if `scipy` is installed
+    (e.g. by `pip install putcall[scipy]`).
+    Otherwise they call `math.erfc` element by element,
+    which is much slower than `ABRAMOWITZ_STEGUN`.
+
+    """
+    if method not in _SCALAR_CDF:
+        raise ValueError('Unknown normal cdf method %s' % str(method))
+    previous = _normal_cdf_method[0]
+    _normal_cdf_method[0] = method
+    return previous
+
+
+def get_normal_cdf_method():
+    """
+    :return: str global method used by `normal_cdf` and `normal_cdf_array`
+    """
+    return _normal_cdf_method[0]
+
+
+# --- scalar versions ---
+
+def normal_density(x):
+    """
+    density function of the standard normal distribution
+
+    :param float x: evaluation point
+    :return: float
+
+    """
+    return ONE_OVER_SQRT_OF_TWO_PI * exp(-0.5 * x * x)
+
+
+def _cdf_abramowitz_stegun(x):
+    result = 1.0 / (1.0 + 0.2316419 * abs(x))
+    tail = _ABRAMOWITZ_STEGUN_FACTOR * exp(-0.5 * x * x) * (
+        result * (0.31938153 +
+                  result * (-0.356563782 +
+                            result * (1.781477937 +
+                                      result * (-1.821255978 +
+                                                result * 1.330274429)))))
+    return 1.0 - tail if x >= 0 else tail
+
+
+def _cdf_erfc(x):
+    return 0.5 * erfc(-x * ONE_OVER_SQRT_OF_TWO)
+
+
+def _cdf_accurate(x):
+    if ASYMPTOTIC_EXPANSION_THRESHOLD <= x <= -ASYMPTOTIC_EXPANSION_THRESHOLD:
+        return _cdf_erfc(x)
+    y = -abs(x)
+    # asymptotic expansion of the tail avoids the rounding of x / sqrt(2)
+    # n(y) / |y| * (1 - 1/y^2 + 3/y^4 - 15/y^6 + ...)
+    q = 1.0 / (y * y)
+    term, total = 1.0, 1.0
+    for k in range(1, ASYMPTOTIC_EXPANSION_TERMS):
+        term *= -(2 * k - 1) * q
+        total += term
+    tail = normal_density(y) / -y * total
+    return tail if x < 0.0 else 1.0 - tail
+
+
+_SCALAR_CDF = {
+    ABRAMOWITZ_STEGUN: _cdf_abramowitz_stegun,
+    ERFC: _cdf_erfc,
+    ACCURATE: _cdf_accurate,
+}
+
+
+def normal_cdf(x, method=None):
+    """
+    cumulative distribution function of the standard normal distribution
+
+    :param float x: evaluation point
+    :param str method: method to use (optional, default is global method,
+        see `set_normal_cdf_method`)
+    :return: float
+
+    """
+    return _SCALAR_CDF[method or _normal_cdf_method[0]](x)
+
+
+# --- array versions ---
+
+def normal_density_array(x):
+    """
+    density function of the standard normal distribution for arrays
+
+    :param array_like x: evaluation points
+    :return: numpy.ndarray
+
+    """
+    x = np.asarray(x, dtype=float)
+    return ONE_OVER_SQRT_OF_TWO_PI * np.exp(-0.5 * x * x)
+
+
+def _cdf_abramowitz_stegun_array(x):
+    result = 1.0 / (1.0 + 0.2316419 * np.abs(x))
+    tail = _ABRAMOWITZ_STEGUN_FACTOR * np.exp(-0.5 * x * x) * (
+        result * (0.31938153 +
+                  result * (-0.356563782 +
+                            result * (1.781477937 +
+                                      result * (-1.821255978 +
+                                                result * 1.330274429)))))
+    return np.where(x >= 0, 1.0 - tail, tail)
+
+
+def _cdf_erfc_array(x):
+    return 0.5 * _erfc_array(-x * ONE_OVER_SQRT_OF_TWO)
+
+
+def _cdf_accurate_array(x):
+    y = -np.abs(x)
+    deep = y < ASYMPTOTIC_EXPANSION_THRESHOLD
+    y = np.where(deep, y, ASYMPTOTIC_EXPANSION_THRESHOLD)
+    q = 1.0 / (y * y)
+    term, total = np.ones_like(y), np.ones_like(y)
+    for k in range(1, ASYMPTOTIC_EXPANSION_TERMS):
+        term *= -(2 * k - 1) * q
+        total += term
+    tail = normal_density_array(y) / -y * total
+    return np.where(deep, np.where(x < 0.0, tail, 1.0 - tail), _cdf_erfc_array(x))
+
+
+_ARRAY_CDF = {
+    ABRAMOWITZ_STEGUN: _cdf_abramowitz_stegun_array,
+    ERFC: _cdf_erfc_array,
+    ACCURATE: _cdf_accurate_array,
+}
+
+
+def normal_cdf_array(x, method=None):
+    """
+    cumulative distribution function of the standard normal distribution for arrays
+
+    :param array_like x: evaluation points
+    :param str method: method to use (optional, default is global method,
+        see `set_normal_cdf_method`)
+    :return: numpy.ndarray
+
+    """
+    return _ARRAY_CDF[method or _normal_cdf_method[0]](np.asarray(x, dtype=float))
+
+
+# --- inverse ---
+
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+_ACKLAM_P_LOW = 0.02425
+
+
+def normal_inverse_cdf(p):
+    """
+    inverse of the cumulative distribution function of the standard normal distribution
+
+    :param float p: probability in (0, 1)
+    :return: float
+
+    P. J. Acklam's rational approximation refined by one Halley step
+    on the `ACCURATE` cdf, which gives close to machine precision.
+
+    """
+    if not 0.0 < p < 1.0:
+        if p == 0.0:
+            return -float('inf')
+        if p == 1.0:
+            return float('inf')
+        raise ValueError('Probability %s out of range (0, 1)' % str(p))
+    a, b, c, d = _ACKLAM_A, _ACKLAM_B, _ACKLAM_C, _ACKLAM_D
+    if p < _ACKLAM_P_LOW or 1.0 - _ACKLAM_P_LOW < p:
+        q = sqrt(-2.0 * log(min(p, 1.0 - p)))
+        x = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0)
+        x = x if p < 0.5 else -x
+    else:
+        q = p - 0.5
+        r = q * q
+        x = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+            (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+    # Halley refinement (on the smaller tail to avoid cancellation)
+    if x < 0.0:
+        e = _cdf_accurate(x) - p
+    else:
+        e = (1.0 - p) - _cdf_accurate(-x)
+    density = normal_density(x)
+    if density > 0.0:
+        u = e / density
+        x -= u / (1.0 + 0.5 * x * u)
+    return x
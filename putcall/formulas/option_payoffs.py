@@ -10,6 +10,9 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
+import numpy as np
+
+
 def option_payoff(forward_value, strike_value, is_call_bool):
     """
     simple option payoff
@@ -56,3 +59,41 @@ def straddle_payoff(forward_value, strike_value, is_call_bool=True):
     @return: option payoff value
     """
     return option_payoff(forward_value, strike_value, True) + option_payoff(forward_value, strike_value, False)
+
+
+def option_payoff_array(forward_value, strike_value, is_call_bool):
+    """
+    simple option payoff for arrays
+
+    @param strike_value: array of strike prices
+    @param forward_value: array of forward prices of underlying
+    @param is_call_bool: array of flags call -> True, put -> False
+    @return: array of option payoff values
+    """
+    fms = np.asarray(forward_value, dtype=float) - np.asarray(strike_value, dtype=float)
+    return np.maximum(np.where(is_call_bool, fms, -fms), 0.0)
+
+
+def digital_option_payoff_array(forward_value, strike_value, is_call_bool):
+    """
+    simple digital option payoff for arrays
+
+    @param strike_value: array of strike prices
+    @param forward_value: array of forward prices of underlying
+    @param is_call_bool: array of flags call -> True, put -> False
+    @return: array of option payoff values
+    """
+    itm = np.asarray(forward_value, dtype=float) >= np.asarray(strike_value, dtype=float)
+    return np.where(is_call_bool, itm, ~itm).astype(float)
+
+
+def straddle_payoff_array(forward_value, strike_value, is_call_bool=True):
+    """
+    simple straddle option payoff for arrays
+
+    @param strike_value: array of strike prices
+    @param forward_value: array of forward prices of underlying
+    @param is_call_bool: obsolete
+    @return: array of option payoff values
+    """
+    return np.abs(np.asarray(forward_value, dtype=float) - np.asarray(strike_value, dtype=float))
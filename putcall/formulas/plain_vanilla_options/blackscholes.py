@@ -12,7 +12,7 @@
 
 import math
 
-from mathtoolspy.distribution.normal_distribution import cdf_abramowitz_stegun as normal_cdf
+from ..normal_distribution import normal_cdf
 # from ..option_payoffs import option_payoff
 from putcall.formulas.option_payoffs import option_payoff, digital_option_payoff
 
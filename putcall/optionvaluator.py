@@ -10,6 +10,8 @@
 # License:  Apache License 2.0 (see LICENSE file)
 
 
+import numpy as np
+
 from .formulas import option_payoff, digital_option_payoff, straddle_payoff
 
 from .formulas import black, black_delta, black_gamma, black_vega
@@ -20,7 +22,48 @@ from .formulas import bachelier, bachelier_delta, bachelier_gamma, bachelier_veg
 from .formulas import bachelier_digital, bachelier_digital_delta, bachelier_digital_gamma, bachelier_digital_vega
 from .formulas import bachelier_straddle, bachelier_straddle_delta, bachelier_straddle_gamma, bachelier_straddle_vega
 
-from .calibration import OptionValueByVolatility, ImpliedVolCalculator
+from .formulas import black_price_and_greeks, black_digital_price_and_greeks, black_straddle_price_and_greeks
+from .formulas import bachelier_price_and_greeks, bachelier_digital_price_and_greeks, \
+    bachelier_straddle_price_and_greeks
+
+from .formulas import option_payoff_array, digital_option_payoff_array, straddle_payoff_array
+
+from .formulas import black_array, black_digital_array, black_straddle_array
+from .formulas import black_delta_array, black_digital_delta_array, black_straddle_delta_array
+from .formulas import black_gamma_array, black_digital_gamma_array, black_straddle_gamma_array
+from .formulas import black_vega_array, black_digital_vega_array, black_straddle_vega_array
+from .formulas import bachelier_array, bachelier_digital_array, bachelier_straddle_array
+from .formulas import bachelier_delta_array, bachelier_digital_delta_array, bachelier_straddle_delta_array
+from .formulas import bachelier_gamma_array, bachelier_digital_gamma_array, bachelier_straddle_gamma_array
+from .formulas import bachelier_vega_array, bachelier_digital_vega_array, bachelier_straddle_vega_array
+
+from .formulas import black_vanna, black_digital_vanna, black_straddle_vanna
+from .formulas import black_volga, black_digital_volga, black_straddle_volga
+from .formulas import black_theta, black_digital_theta, black_straddle_theta
+from .formulas import black_dual_delta, black_digital_dual_delta, black_straddle_dual_delta
+from .formulas import black_dual_gamma, black_digital_dual_gamma, black_straddle_dual_gamma
+from .formulas import black_vanna_array, black_digital_vanna_array, black_straddle_vanna_array
+from .formulas import black_volga_array, black_digital_volga_array, black_straddle_volga_array
+from .formulas import black_theta_array, black_digital_theta_array, black_straddle_theta_array
+from .formulas import black_dual_delta_array, black_digital_dual_delta_array, black_straddle_dual_delta_array
+from .formulas import black_dual_gamma_array, black_digital_dual_gamma_array, black_straddle_dual_gamma_array
+from .formulas import bachelier_vanna, bachelier_digital_vanna, bachelier_straddle_vanna
+from .formulas import bachelier_volga, bachelier_digital_volga, bachelier_straddle_volga
+from .formulas import bachelier_theta, bachelier_digital_theta, bachelier_straddle_theta
+from .formulas import bachelier_dual_delta, bachelier_digital_dual_delta, bachelier_straddle_dual_delta
+from .formulas import bachelier_dual_gamma, bachelier_digital_dual_gamma, bachelier_straddle_dual_gamma
+from .formulas import bachelier_vanna_array, bachelier_digital_vanna_array, bachelier_straddle_vanna_array
+from .formulas import bachelier_volga_array, bachelier_digital_volga_array, bachelier_straddle_volga_array
+from .formulas import bachelier_theta_array, bachelier_digital_theta_array, bachelier_straddle_theta_array
+from .formulas import bachelier_dual_delta_array, bachelier_digital_dual_delta_array, \
+    bachelier_straddle_dual_delta_array
+from .formulas import bachelier_dual_gamma_array, bachelier_digital_dual_gamma_array, \
+    bachelier_straddle_dual_gamma_array
+
+from .calibration import OptionValueByVolatility, ImpliedVolCalculator, lets_be_rational, bachelier_implied_vol
+from .calibration import implied_vol_array, CONVERGED
+
+from .cache import ValuationCache
 
 
 class OptionType(object):
@@ -28,11 +71,18 @@ class OptionType(object):
 
 
 class OptionValuator(object):
-    def __init__(self, delta=None, vega=None):
-        self._delta = self._parse(delta, (0.00001, 1.0, True))
+    IMPLIED_VOL_INITIAL_VALUE = 0.2
+    IMPLIED_VOL_INTRINSIC_TOLERANCE = 1e-7
+    THETA_SHIFT = 1. / 365.
+
+    def __init__(self, delta=None, vega=None, cache=None):
+        # bump configuration: shift, quote, shift_abs, central
+        self._delta = self._parse(delta, (0.00001, 1.0, True, False))
         self._analytical_delta = delta is None
-        self._vega = self._parse(vega, (0.0001, 1.0, True))
+        self._vega = self._parse(vega, (0.0001, 1.0, True, False))
         self._analytical_vega = vega is None
+        # cache of option values and implied vols: None, True (default ValuationCache) or ValuationCache
+        self.cache = ValuationCache() if cache is True else cache
 
     @staticmethod
     def _parse(arg, default=tuple()):
@@ -47,6 +97,8 @@ class OptionValuator(object):
 
     # --- pricing ---
     def option_value(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        if self.cache is not None:
+            return discount_factor * self.cache(self._option_value, forward, strike, time, volatility, option_type)
         return discount_factor * self._option_value(forward, strike, time, volatility, option_type)
 
     def _option_value(self, forward, strike, time, volatility, option_type):
@@ -54,11 +106,95 @@ class OptionValuator(object):
 
     # --- solving ---
     def implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
-        option_val = OptionValueByVolatility(self.option_value, forward, strike, time, option_type, discount_factor)
+        if self.cache is not None:
+            return self.cache(self._implied_vol, forward, strike, time, price, option_type, discount_factor)
+        return self._implied_vol(forward, strike, time, price, option_type, discount_factor)
+
+    def _implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
+        # solve on the uncached option value
+        option_value = (lambda f, k, t, v, o, d: d * self._option_value(f, k, t, v, o))
+        option_val = OptionValueByVolatility(option_value, forward, strike, time, option_type, discount_factor)
         implied_vol_calculator = ImpliedVolCalculator()
         impl_vol = implied_vol_calculator.implied_vol(price, option_val, 0.15, 0.03)
         return impl_vol
 
+    def _polish_implied_vol(self, forward, strike, time, price, option_type, impl_vol, steps=4):
+        # secant steps (starting with vega) against the normal cdf in use (see `set_normal_cdf_method`),
+        # accepted only while they reduce the pricing error
+        residual = self._option_value(forward, strike, time, impl_vol, option_type) - price
+        slope = self._analytic_vega(forward, strike, time, impl_vol, option_type)
+        for _ in range(steps):
+            if not residual or slope is None or not slope > 0.0:
+                break
+            vol = impl_vol - residual / slope
+            if not vol > 0.0:
+                break
+            vol_residual = self._option_value(forward, strike, time, vol, option_type) - price
+            if not abs(vol_residual) < abs(residual):
+                break
+            slope = (vol_residual - residual) / (vol - impl_vol)
+            impl_vol, residual = vol, vol_residual
+        return impl_vol
+
+    def _intrinsic_implied_vol(self, forward, strike, price, is_call_bool):
+        # zero volatility for (undiscounted) prices at the intrinsic value
+        # up to the accuracy of the normal cdf, None otherwise
+        intrinsic = max(forward - strike if is_call_bool else strike - forward, 0.0)
+        if abs(price - intrinsic) <= self.IMPLIED_VOL_INTRINSIC_TOLERANCE * (abs(forward) + abs(strike)):
+            return 0.0
+        return None
+
+    def implied_vol_array(self, forward, strike, time, price, option_type, discount_factor=1.0, initial_value=None):
+        """
+        implied volatilities of arrays of option prices
+
+        :param array_like forward: forward prices of underlying at exercise date
+        :param array_like strike: strike prices
+        :param array_like time: year fractions until exercise date
+        :param array_like price: option prices
+        :param array_like option_type: OptionType
+        :param array_like discount_factor: discount factors
+        :param array_like initial_value: initial volatilities
+            (optional, default is `IMPLIED_VOL_INITIAL_VALUE`)
+        :return: tuple(numpy.ndarray) of volatilities, status codes and number of iterations
+
+        All arguments are broadcast against each other.
+        Quotes of the same option type are solved at once
+        by :func:`putcall.calibration.implied_volatility.implied_vol_array`
+        using the analytic vega.
+
+        """
+        if initial_value is None:
+            initial_value = self.IMPLIED_VOL_INITIAL_VALUE
+        args = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in
+                                     (forward, strike, time, price, option_type, discount_factor, initial_value)))
+        shape = args[0].shape
+        forward, strike, time, price, option_type, discount_factor, initial_value = (a.ravel() for a in args)
+        undiscounted_price = price / discount_factor
+
+        vol = np.full(price.size, np.nan)
+        status = np.zeros(price.size, dtype=int)
+        iterations = np.zeros(price.size, dtype=int)
+        for t in np.unique(option_type):
+            i = np.flatnonzero(option_type == t)
+            f, k, s, t = forward[i], strike[i], time[i], int(t)
+
+            def value_function(v, j):
+                return self._option_value_array(f[j], k[j], s[j], v, t)
+
+            def vega_function(v, j):
+                return self._analytic_vega_array(f[j], k[j], s[j], v, t)
+
+            vol[i], status[i], iterations[i] = \
+                implied_vol_array(undiscounted_price[i], value_function, vega_function, initial_value[i])
+        return vol.reshape(shape), status.reshape(shape), iterations.reshape(shape)
+
+    def _option_value_array(self, forward, strike, time, volatility, option_type):
+        raise NotImplementedError
+
+    def _analytic_vega_array(self, forward, strike, time, volatility, option_type):
+        raise NotImplementedError
+
     # --- delta risk ---
     def delta(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
         risk = None
@@ -72,10 +208,7 @@ class OptionValuator(object):
         return None
 
     def _bump_delta(self, forward, strike, time, volatility, option_type):
-        f = (lambda x: self.option_value(x, strike, time, volatility, option_type))
-        shift, quote, shift_abs = self._delta
-        forward_shift = shift if shift_abs else forward * shift
-        return quote * (f(forward + forward_shift) - f(forward)) / shift
+        return self._bump(forward, strike, time, volatility, option_type, delta=True)[1]
 
     # --- gamma risk ---
     def gamma(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
@@ -90,10 +223,7 @@ class OptionValuator(object):
         return None
 
     def _bump_gamma(self, forward, strike, time, volatility, option_type):
-        f = (lambda x: self._bump_delta(x, strike, time, volatility, option_type))
-        shift, quote, shift_abs = self._delta
-        forward_shift = shift if shift_abs else forward / shift
-        return quote * (f(forward) - f(forward - forward_shift)) / shift
+        return self._bump(forward, strike, time, volatility, option_type, gamma=True)[2]
 
     # --- vega risk ---
     def vega(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
@@ -108,10 +238,362 @@ class OptionValuator(object):
         return None
 
     def _bump_vega(self, forward, strike, time, volatility, option_type):
-        f = (lambda x: self.option_value(forward, strike, time, x, option_type))
-        shift, quote, shift_abs = self._vega
+        return self._bump(forward, strike, time, volatility, option_type, vega=True)[3]
+
+    # --- vanna and volga risk ---
+    def vanna(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        """ derivative of delta by volatility (analytic if available, otherwise vega bumped by forward) """
+        risk = None
+        if self._analytical_delta and self._analytical_vega:
+            risk = self._analytic_vanna(forward, strike, time, volatility, option_type)
+        if risk is None:
+            risk = self._bump_vanna(forward, strike, time, volatility, option_type)
+        return discount_factor * risk
+
+    def _analytic_vanna(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _bump_vanna(self, forward, strike, time, volatility, option_type, vega=None):
+        if vega is None:
+            vega = self.vega(forward, strike, time, volatility, option_type)
+        shift, quote, shift_abs = self._delta[:3]
+        forward_shift = shift if shift_abs else forward * shift
+        return quote * (self.vega(forward + forward_shift, strike, time, volatility, option_type) - vega) / shift
+
+    def volga(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        """ derivative of vega by volatility (analytic if available, otherwise vega bumped by volatility) """
+        risk = None
+        if self._analytical_vega:
+            risk = self._analytic_volga(forward, strike, time, volatility, option_type)
+        if risk is None:
+            risk = self._bump_volga(forward, strike, time, volatility, option_type)
+        return discount_factor * risk
+
+    def _analytic_volga(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _bump_volga(self, forward, strike, time, volatility, option_type, vega=None):
+        if vega is None:
+            vega = self.vega(forward, strike, time, volatility, option_type)
+        shift, quote, shift_abs = self._vega[:3]
         volatility_shift = shift if shift_abs else volatility * shift
-        return quote * (f(volatility + volatility_shift) - f(volatility)) / shift
+        return quote * (self.vega(forward, strike, time, volatility + volatility_shift, option_type) - vega) / shift
+
+    # --- theta risk ---
+    def theta(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        """
+        negative derivative by time to expiry for fixed forward and discount factor
+
+        Analytic if available, otherwise by a forward difference of `THETA_SHIFT` (one day).
+
+        """
+        risk = None
+        if self._analytical_delta and self._analytical_vega:
+            risk = self._analytic_theta(forward, strike, time, volatility, option_type)
+        if risk is None:
+            risk = self._bump_theta(forward, strike, time, volatility, option_type)
+        return discount_factor * risk
+
+    def _analytic_theta(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _bump_theta(self, forward, strike, time, volatility, option_type):
+        value = self.option_value(forward, strike, time, volatility, option_type)
+        later = self.option_value(forward, strike, time + self.THETA_SHIFT, volatility, option_type)
+        return (value - later) / self.THETA_SHIFT
+
+    # --- dual delta and dual gamma risk ---
+    def dual_delta(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        """ derivative by strike (analytic if available, otherwise strike bumped as forward for delta) """
+        risk = None
+        if self._analytical_delta:
+            risk = self._analytic_dual_delta(forward, strike, time, volatility, option_type)
+        if risk is None:
+            risk = self._bump_dual(forward, strike, time, volatility, option_type)[0]
+        return discount_factor * risk
+
+    def _analytic_dual_delta(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def dual_gamma(self, forward, strike, time, volatility, option_type, discount_factor=1.0):
+        """ second derivative by strike (analytic if available, otherwise strike bumped as forward for gamma) """
+        risk = None
+        if self._analytical_delta:
+            risk = self._analytic_dual_gamma(forward, strike, time, volatility, option_type)
+        if risk is None:
+            risk = self._bump_dual(forward, strike, time, volatility, option_type)[1]
+        return discount_factor * risk
+
+    def _analytic_dual_gamma(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _bump_dual(self, forward, strike, time, volatility, option_type):
+        # dual delta (central differences) and dual gamma from one up and one down strike scenario
+        shift, quote, shift_abs = self._delta[:3]
+        strike_shift = shift if shift_abs else strike * shift
+        base = self.option_value(forward, strike, time, volatility, option_type)
+        up = self.option_value(forward, strike + strike_shift, time, volatility, option_type)
+        down = self.option_value(forward, strike - strike_shift, time, volatility, option_type)
+        return quote * (up - down) / (2. * shift), quote * quote * (up - 2. * base + down) / (shift * shift)
+
+    # --- bump engine ---
+    def _bump_scenarios(self, forward, volatility, value=False, delta=False, gamma=False, vega=False):
+        # (forward, volatility) scenarios to reprice and function deriving value, delta, gamma, vega from them
+        shift, quote, shift_abs, central = self._delta
+        forward_shift = shift if shift_abs else forward * shift
+        v_shift, v_quote, v_shift_abs, v_central = self._vega
+        volatility_shift = v_shift if v_shift_abs else volatility * v_shift
+
+        keys, scenarios = list(), list()
+        if value or gamma or (delta and not central) or (vega and not v_central):
+            keys.append('base')
+            scenarios.append((forward, volatility))
+        if delta or gamma:
+            keys.append('up')
+            scenarios.append((forward + forward_shift, volatility))
+        if gamma or (delta and central):
+            keys.append('down')
+            scenarios.append((forward - forward_shift, volatility))
+        if vega:
+            keys.append('vol_up')
+            scenarios.append((forward, volatility + volatility_shift))
+        if vega and v_central:
+            keys.append('vol_down')
+            scenarios.append((forward, volatility - volatility_shift))
+
+        def risks(values):
+            v = dict(zip(keys, values))
+            base = v.get('base')
+            result = [base if value else None, None, None, None]
+            if delta:
+                if central:
+                    result[1] = quote * (v['up'] - v['down']) / (2. * shift)
+                else:
+                    result[1] = quote * (v['up'] - base) / shift
+            if gamma:
+                result[2] = quote * quote * (v['up'] - 2. * base + v['down']) / (shift * shift)
+            if vega:
+                if v_central:
+                    result[3] = v_quote * (v['vol_up'] - v['vol_down']) / (2. * v_shift)
+                else:
+                    result[3] = v_quote * (v['vol_up'] - base) / v_shift
+            return result
+
+        return scenarios, risks
+
+    def _bump(self, forward, strike, time, volatility, option_type,
+              value=False, delta=False, gamma=False, vega=False):
+        # bumped risk of a single option, each scenario valued once
+        scenarios, risks = self._bump_scenarios(forward, volatility, value, delta, gamma, vega)
+        return risks([self.option_value(f, strike, time, v, option_type) for f, v in scenarios])
+
+    def _bump_array(self, forward, strike, time, volatility, option_type,
+                    value=False, delta=False, gamma=False, vega=False):
+        # bumped risk of arrays of options of one type, all scenarios valued by one vectorized call
+        forward, strike, time, volatility = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (forward, strike, time, volatility)))
+        scenarios, risks = self._bump_scenarios(forward, volatility, value, delta, gamma, vega)
+        forwards = np.stack([f for f, _ in scenarios])
+        volatilities = np.stack([v for _, v in scenarios])
+        values = self._option_value_array(forwards, strike, time, volatilities, option_type)
+        return risks(list(values))
+
+    # --- price and greeks ---
+    def price_and_greeks(self, forward, strike, time, volatility, option_type, discount_factor=1.0,
+                         second_order=False):
+        """
+        option value together with delta, gamma and vega (and optionally vanna and volga)
+
+        :param float forward: forward price of underlying at exercise date
+        :param float strike: strike price
+        :param float time: year fraction until exercise date
+        :param float volatility: volatility of underlying price
+        :param int option_type: OptionType
+        :param float discount_factor: discount factor
+        :param bool second_order: add vanna and volga to result
+        :return: tuple(float) of value, delta, gamma, vega (, vanna, volga)
+
+        If analytic sensitivities are available all figures are derived
+        from one single evaluation of the pricing formula terms.
+        Otherwise they are calculated by
+        :meth:`option_value`, :meth:`delta`, :meth:`gamma` and :meth:`vega`
+        and vanna and volga are bumped on vega.
+
+        """
+        result = None
+        if self._analytical_delta and self._analytical_vega:
+            result = self._price_and_greeks(forward, strike, time, volatility, option_type, second_order)
+        if result is None:
+            result = self._bump_price_and_greeks(forward, strike, time, volatility, option_type, second_order)
+        return tuple(discount_factor * r for r in result)
+
+    def _price_and_greeks(self, forward, strike, time, volatility, option_type, second_order=False):
+        return None
+
+    def _bump_price_and_greeks(self, forward, strike, time, volatility, option_type, second_order=False):
+        result = self._greeks(forward, strike, time, volatility, option_type)
+        if not second_order:
+            return result
+        vega = result[3]
+        vanna = self._bump_vanna(forward, strike, time, volatility, option_type, vega)
+        volga = self._bump_volga(forward, strike, time, volatility, option_type, vega)
+        return result + (vanna, volga)
+
+    def _greeks(self, forward, strike, time, volatility, option_type, array=False):
+        # value, delta, gamma and vega, analytic if available and the remaining ones by one bump
+        if array:
+            hooks = self._analytic_delta_array, self._analytic_gamma_array, self._analytic_vega_array
+            bump = self._bump_array
+        else:
+            hooks = self._analytic_delta, self._analytic_gamma, self._analytic_vega
+            bump = self._bump
+        analytic = self._analytical_delta, self._analytical_delta, self._analytical_vega
+        args = forward, strike, time, volatility, option_type
+        delta, gamma, vega = (h(*args) if a else None for h, a in zip(hooks, analytic))
+        bumped = bump(*args, value=True, delta=delta is None, gamma=gamma is None, vega=vega is None)
+        return tuple(b if a is None else a for a, b in zip((None, delta, gamma, vega), bumped))
+
+    # --- portfolio ---
+    def value_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """
+        option values of a portfolio
+
+        :param array_like forwards: forward prices of underlying at exercise date
+        :param array_like strikes: strike prices
+        :param array_like times: year fractions until exercise date
+        :param array_like vols: volatilities of underlying price
+        :param array_like option_types: OptionType
+        :param array_like discount_factors: discount factors
+        :return: numpy.ndarray
+
+        All arguments are broadcast against each other.
+        Positions are grouped by option type and each group is valued
+        by one call of the vectorized pricing formula.
+        Valuators without vectorized formulas value position by position.
+
+        """
+        return self._portfolio(self._option_value_array, self.option_value,
+                               forwards, strikes, times, vols, option_types, discount_factors)
+
+    def delta_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ deltas of a portfolio (see :meth:`value_portfolio` and :meth:`price_and_greeks_portfolio`) """
+        if self._analytical_delta:
+            hook = self._analytic_delta_array
+        else:
+            hook = (lambda *args: self._bump_array(*args, delta=True)[1])
+        return self._portfolio(hook, self.delta, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def gamma_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ gammas of a portfolio (see :meth:`value_portfolio` and :meth:`price_and_greeks_portfolio`) """
+        if self._analytical_delta:
+            hook = self._analytic_gamma_array
+        else:
+            hook = (lambda *args: self._bump_array(*args, gamma=True)[2])
+        return self._portfolio(hook, self.gamma, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def vega_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ vegas of a portfolio (see :meth:`value_portfolio` and :meth:`price_and_greeks_portfolio`) """
+        if self._analytical_vega:
+            hook = self._analytic_vega_array
+        else:
+            hook = (lambda *args: self._bump_array(*args, vega=True)[3])
+        return self._portfolio(hook, self.vega, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def vanna_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ vannas of a portfolio (see :meth:`value_portfolio` and :meth:`vanna`) """
+        hook = self._analytic_vanna_array if self._analytical_delta and self._analytical_vega else None
+        return self._portfolio(hook, self.vanna, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def volga_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ volgas of a portfolio (see :meth:`value_portfolio` and :meth:`volga`) """
+        hook = self._analytic_volga_array if self._analytical_vega else None
+        return self._portfolio(hook, self.volga, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def theta_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ thetas of a portfolio (see :meth:`value_portfolio` and :meth:`theta`) """
+        hook = self._analytic_theta_array if self._analytical_delta and self._analytical_vega else None
+        return self._portfolio(hook, self.theta, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def dual_delta_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ dual deltas of a portfolio (see :meth:`value_portfolio` and :meth:`dual_delta`) """
+        hook = self._analytic_dual_delta_array if self._analytical_delta else None
+        return self._portfolio(hook, self.dual_delta, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def dual_gamma_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """ dual gammas of a portfolio (see :meth:`value_portfolio` and :meth:`dual_gamma`) """
+        hook = self._analytic_dual_gamma_array if self._analytical_delta else None
+        return self._portfolio(hook, self.dual_gamma, forwards, strikes, times, vols, option_types, discount_factors)
+
+    def price_and_greeks_portfolio(self, forwards, strikes, times, vols, option_types, discount_factors=1.0):
+        """
+        option values together with deltas, gammas and vegas of a portfolio
+
+        :param array_like forwards: forward prices of underlying at exercise date
+        :param array_like strikes: strike prices
+        :param array_like times: year fractions until exercise date
+        :param array_like vols: volatilities of underlying price
+        :param array_like option_types: OptionType
+        :param array_like discount_factors: discount factors
+        :return: tuple(numpy.ndarray) of values, deltas, gammas and vegas
+
+        Sensitivities are analytic if available.
+        Bumped sensitivities (see `delta` and `vega` arguments of the valuator,
+        given as tuple of shift, quote, shift_abs and central)
+        reuse one base value per position,
+        use one-sided or central differences as configured
+        and all bumped scenarios of a group of positions
+        of the same option type are valued by one vectorized call.
+
+        """
+        return tuple(self._portfolio((lambda *args: self._greeks(*args, array=True)), self.price_and_greeks,
+                                     forwards, strikes, times, vols, option_types, discount_factors, outputs=4))
+
+    def _portfolio(self, hook, method, forwards, strikes, times, vols, option_types, discount_factors=1.0,
+                   outputs=None):
+        # group positions by option type, evaluate hook per group and scatter results back
+        args = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in
+                                     (forwards, strikes, times, vols, option_types, discount_factors)))
+        shape = args[0].shape
+        forward, strike, time, vol, option_type, discount_factor = (a.ravel() for a in args)
+        result = np.empty((forward.size,) if outputs is None else (outputs, forward.size))
+        order = np.argsort(option_type, kind='stable')
+        bounds = np.flatnonzero(np.diff(option_type[order])) + 1
+        for i in np.split(order, bounds):
+            if not i.size:
+                continue
+            t = int(option_type[i[0]])
+            value = None
+            if hook is not None:
+                try:
+                    value = hook(forward[i], strike[i], time[i], vol[i], t)
+                except NotImplementedError:
+                    value = None
+            if value is None:
+                value = [method(f, k, s, v, t) for f, k, s, v in zip(forward[i], strike[i], time[i], vol[i])]
+                value = np.transpose(value)
+            result[..., i] = value
+        return (result * discount_factor).reshape(result.shape[:-1] + shape)
+
+    def _analytic_delta_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_gamma_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_vanna_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_volga_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_theta_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_dual_delta_array(self, forward, strike, time, volatility, option_type):
+        return None
+
+    def _analytic_dual_gamma_array(self, forward, strike, time, volatility, option_type):
+        return None
 
 
 class OptionValuatorIntrinsic(OptionValuator):
@@ -130,11 +612,31 @@ class OptionValuatorIntrinsic(OptionValuator):
             raise Exception('Unknown OptionType ' + str(option_type) + ' ' + __name__)
         return discount_factor * result
 
-    def implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
+    def _option_value_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return option_payoff_array(forward, strike, True)
+        if option_type == OptionType.PUT:
+            return option_payoff_array(forward, strike, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return digital_option_payoff_array(forward, strike, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return digital_option_payoff_array(forward, strike, False)
+        if option_type == OptionType.STRADDLE:
+            return straddle_payoff_array(forward, strike)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
         return 0.0
 
+    def implied_vol_array(self, forward, strike, time, price, option_type, discount_factor=1.0, initial_value=None):
+        shape = np.broadcast(*(np.asarray(a) for a in
+                               (forward, strike, time, price, option_type, discount_factor))).shape
+        return np.zeros(shape), np.full(shape, CONVERGED, dtype=int), np.zeros(shape, dtype=int)
+
 
 class OptionValuatorN(OptionValuator):
+    IMPLIED_VOL_INITIAL_VALUE = 0.01
+
     def _option_value(self, forward, strike, time, volatility, option_type):
         if option_type == OptionType.CALL:
             return bachelier(forward, strike, volatility, time, True)
@@ -187,6 +689,223 @@ class OptionValuatorN(OptionValuator):
             return bachelier_straddle_vega(forward, strike, volatility, time, False)
         return None
 
+    def _price_and_greeks(self, forward, strike, time, volatility, option_type, second_order=False):
+        if option_type == OptionType.CALL:
+            return bachelier_price_and_greeks(forward, strike, volatility, time, True, second_order)
+        if option_type == OptionType.PUT:
+            return bachelier_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_price_and_greeks(forward, strike, volatility, time, True, second_order)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        return None
+
+    def _option_value_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_delta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_delta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_gamma_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_gamma_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_vega_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_vega_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_vega_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_vega_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_vega_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_vega_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_vanna(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_vanna(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_vanna(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_vanna(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_vanna(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_vanna(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_volga(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_volga(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_volga(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_volga(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_volga(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_volga(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_theta(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_theta(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_theta(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_theta(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_theta(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_theta(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_dual_delta(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_dual_delta(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_dual_delta(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_dual_delta(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_dual_delta(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_dual_delta(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_dual_gamma(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_dual_gamma(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_dual_gamma(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_dual_gamma(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_dual_gamma(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_dual_gamma(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_vanna_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_vanna_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_vanna_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_vanna_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_vanna_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_vanna_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_volga_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_volga_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_volga_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_volga_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_volga_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_volga_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_theta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_theta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_theta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_theta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_theta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_theta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_dual_delta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_dual_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_dual_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_dual_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_dual_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_dual_delta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_dual_gamma_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return bachelier_dual_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return bachelier_dual_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return bachelier_digital_dual_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return bachelier_digital_dual_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return bachelier_straddle_dual_gamma_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
+        # closed form for vanilla payoffs and Brent as fallback
+        impl_vol = None
+        if option_type in (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE):
+            undiscounted_price = price / discount_factor
+            if option_type == OptionType.STRADDLE:
+                # straddle = call + put = 2 * call - (forward - strike)
+                undiscounted_price = 0.5 * (undiscounted_price + forward - strike)
+            try:
+                impl_vol = bachelier_implied_vol(undiscounted_price, forward, strike, time,
+                                                 option_type != OptionType.PUT)
+            except ValueError:
+                impl_vol = self._intrinsic_implied_vol(forward, strike, undiscounted_price,
+                                                       option_type != OptionType.PUT)
+            if impl_vol:
+                impl_vol = self._polish_implied_vol(forward, strike, time, price / discount_factor, option_type,
+                                                    impl_vol)
+        if impl_vol is None or not 0.0 <= impl_vol < float('inf'):
+            impl_vol = super(OptionValuatorN, self)._implied_vol(forward, strike, time, price, option_type,
+                                                                 discount_factor)
+        return impl_vol
+
 
 class OptionValuatorLN(OptionValuator):
     def _option_value(self, forward, strike, time, volatility, option_type, ):
@@ -241,10 +960,226 @@ class OptionValuatorLN(OptionValuator):
             return black_straddle_vega(forward, strike, volatility, time, False)
         return None
 
+    def _price_and_greeks(self, forward, strike, time, volatility, option_type, second_order=False):
+        if option_type == OptionType.CALL:
+            return black_price_and_greeks(forward, strike, volatility, time, True, second_order)
+        if option_type == OptionType.PUT:
+            return black_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_price_and_greeks(forward, strike, volatility, time, True, second_order)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_price_and_greeks(forward, strike, volatility, time, False, second_order)
+        return None
+
+    def _option_value_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_delta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_delta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_gamma_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_gamma_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_vega_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_vega_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_vega_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_vega_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_vega_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_vega_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_vanna(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_vanna(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_vanna(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_vanna(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_vanna(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_vanna(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_volga(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_volga(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_volga(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_volga(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_volga(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_volga(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_theta(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_theta(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_theta(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_theta(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_theta(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_theta(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_dual_delta(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_dual_delta(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_dual_delta(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_dual_delta(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_dual_delta(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_dual_delta(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_dual_gamma(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_dual_gamma(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_dual_gamma(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_dual_gamma(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_dual_gamma(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_dual_gamma(forward, strike, volatility, time, False)
+        return None
+
+    def _analytic_vanna_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_vanna_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_vanna_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_vanna_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_vanna_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_vanna_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_volga_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_volga_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_volga_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_volga_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_volga_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_volga_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_theta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_theta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_theta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_theta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_theta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_theta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_dual_delta_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_dual_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_dual_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_dual_delta_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_dual_delta_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_dual_delta_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _analytic_dual_gamma_array(self, forward, strike, time, volatility, option_type):
+        if option_type == OptionType.CALL:
+            return black_dual_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.PUT:
+            return black_dual_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.DIGITAL_CALL:
+            return black_digital_dual_gamma_array(forward, strike, volatility, time, True)
+        if option_type == OptionType.DIGITAL_PUT:
+            return black_digital_dual_gamma_array(forward, strike, volatility, time, False)
+        if option_type == OptionType.STRADDLE:
+            return black_straddle_dual_gamma_array(forward, strike, volatility, time, False)
+        raise ValueError('Unknown OptionType ' + str(option_type))
+
+    def _implied_vol(self, forward, strike, time, price, option_type, discount_factor=1.0):
+        # Let's Be Rational (polished against the normal cdf in use) for vanilla payoffs and Brent as fallback
+        impl_vol = None
+        if option_type in (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE):
+            undiscounted_price = price / discount_factor
+            if option_type == OptionType.STRADDLE:
+                # straddle = call + put = 2 * call - (forward - strike)
+                undiscounted_price = 0.5 * (undiscounted_price + forward - strike)
+            try:
+                impl_vol = lets_be_rational(undiscounted_price, forward, strike, time, option_type != OptionType.PUT)
+            except ValueError:
+                impl_vol = self._intrinsic_implied_vol(forward, strike, undiscounted_price,
+                                                       option_type != OptionType.PUT)
+            if impl_vol:
+                impl_vol = self._polish_implied_vol(forward, strike, time, price / discount_factor, option_type,
+                                                    impl_vol)
+        if impl_vol is None or not 0.0 <= impl_vol < float('inf'):
+            impl_vol = super(OptionValuatorLN, self)._implied_vol(forward, strike, time, price, option_type,
+                                                                  discount_factor)
+        return impl_vol
+
 
 class OptionValuatorSLN(OptionValuator):
-    def __init__(self, displacement=0.03, delta=None, vega=None):
-        super(OptionValuatorSLN, self).__init__(delta, vega)
+    def __init__(self, displacement=0.03, delta=None, vega=None, cache=None):
+        super(OptionValuatorSLN, self).__init__(delta, vega, cache)
         self.displacement = displacement
         self._option_valuatorLN = OptionValuatorLN()
 
@@ -255,9 +1190,9 @@ class OptionValuatorSLN(OptionValuator):
         fwd, k = self._get_shifted_forward_and_strike(forward, strike)
         return self._option_valuatorLN._option_value(fwd, k, time, volatility, optionType)
 
-    def implied_vol(self, forward, strike, time, price, optionType, discount_factor=1.0):
+    def _implied_vol(self, forward, strike, time, price, optionType, discount_factor=1.0):
         fwd, k = self._get_shifted_forward_and_strike(forward, strike)
-        return self._option_valuatorLN.implied_vol(fwd, k, time, price, optionType, discount_factor)
+        return self._option_valuatorLN._implied_vol(fwd, k, time, price, optionType, discount_factor)
 
     def _analytic_vega(self, forward, strike, time, volatility, option_type):
         fwd, k = self._get_shifted_forward_and_strike(forward, strike)
@@ -270,3 +1205,68 @@ class OptionValuatorSLN(OptionValuator):
     def _analytic_delta(self, forward, strike, time, volatility, option_type):
         fwd, k = self._get_shifted_forward_and_strike(forward, strike)
         return self._option_valuatorLN._analytic_delta(fwd, k, time, volatility, option_type)
+
+    def _price_and_greeks(self, forward, strike, time, volatility, option_type, second_order=False):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._price_and_greeks(fwd, k, time, volatility, option_type, second_order)
+
+    def _option_value_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._option_value_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_delta_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_delta_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_gamma_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_gamma_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_vega_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_vega_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_vanna(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._analytic_vanna(fwd, k, time, volatility, option_type)
+
+    def _analytic_volga(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._analytic_volga(fwd, k, time, volatility, option_type)
+
+    def _analytic_theta(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._analytic_theta(fwd, k, time, volatility, option_type)
+
+    def _analytic_dual_delta(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._analytic_dual_delta(fwd, k, time, volatility, option_type)
+
+    def _analytic_dual_gamma(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(forward, strike)
+        return self._option_valuatorLN._analytic_dual_gamma(fwd, k, time, volatility, option_type)
+
+    def _analytic_vanna_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_vanna_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_volga_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_volga_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_theta_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_theta_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_dual_delta_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_dual_delta_array(fwd, k, time, volatility, option_type)
+
+    def _analytic_dual_gamma_array(self, forward, strike, time, volatility, option_type):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN._analytic_dual_gamma_array(fwd, k, time, volatility, option_type)
+
+    def implied_vol_array(self, forward, strike, time, price, option_type, discount_factor=1.0, initial_value=None):
+        fwd, k = self._get_shifted_forward_and_strike(np.asarray(forward), np.asarray(strike))
+        return self._option_valuatorLN.implied_vol_array(fwd, k, time, price, option_type, discount_factor,
+                                                         initial_value)
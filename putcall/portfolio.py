@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+import numpy as np
+
+from .optionvaluator import OptionType, OptionValuatorLN
+from .scenario import CHUNK_SIZE, scenario_pnl_chunks, _scenario_reduce
+
+_INPUTS = 'forward', 'strike', 'time', 'volatility', 'discount_factor'
+_RESULTS = 'value', 'delta', 'gamma', 'vega'
+_OPTION_TYPES = OptionType.CALL, OptionType.PUT, OptionType.DIGITAL_CALL, OptionType.DIGITAL_PUT, \
+    OptionType.STRADDLE
+
+
+class Portfolio(object):
+    """
+    option trades stored column-wise with incremental revaluation
+
+    :param list valuators: valuators (optional, default a single :class:`OptionValuatorLN`),
+        the `model` of a trade is the index of its valuator in this list
+    :param int capacity: initial number of rows to allocate (optional, default 64)
+
+    Trade data is kept in contiguous columns of `float64`
+    (`forward`, `strike`, `time`, `volatility` and `discount_factor`),
+    an `int8` column `option_type` and an `int16` column `model`.
+    Value, delta, gamma and vega of the last valuation are cached per row.
+
+    Rows added by :meth:`add` or changed by :meth:`update` are dirty
+    and :meth:`revalue` recomputes only these,
+    each model by one call of
+    :meth:`OptionValuator.price_and_greeks_portfolio`.
+    Columns are exposed as read-only views, so any change goes through :meth:`update`.
+
+    >>> from putcall import Portfolio, OptionType
+    >>> portfolio = Portfolio()
+    >>> portfolio.add([0.02, 0.03], 0.025, 3.25, 0.55, OptionType.CALL, 0.9)
+    array([0, 1])
+    >>> len(portfolio.revalue())
+    2
+    >>> portfolio.update(1, forward=0.031)
+    >>> portfolio.revalue()
+    array([1])
+
+    """
+
+    def __init__(self, valuators=None, capacity=64):
+        self.valuators = [OptionValuatorLN()] if valuators is None else list(valuators)
+        self._size = 0
+        capacity = max(int(capacity), 1)
+        self._columns = dict((name, np.zeros(capacity)) for name in _INPUTS)
+        self._columns['option_type'] = np.zeros(capacity, dtype=np.int8)
+        self._columns['model'] = np.zeros(capacity, dtype=np.int16)
+        self._results = dict((name, np.full(capacity, np.nan)) for name in _RESULTS)
+        self._dirty = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return '%s(%d trades, %d dirty)' % (self.__class__.__name__, self._size, int(np.sum(self.dirty)))
+
+    # --- columns ---
+    def _view(self, array):
+        view = array[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def forward(self):
+        return self._view(self._columns['forward'])
+
+    @property
+    def strike(self):
+        return self._view(self._columns['strike'])
+
+    @property
+    def time(self):
+        return self._view(self._columns['time'])
+
+    @property
+    def volatility(self):
+        return self._view(self._columns['volatility'])
+
+    @property
+    def discount_factor(self):
+        return self._view(self._columns['discount_factor'])
+
+    @property
+    def option_type(self):
+        return self._view(self._columns['option_type'])
+
+    @property
+    def model(self):
+        return self._view(self._columns['model'])
+
+    @property
+    def dirty(self):
+        """ rows which changed since the last :meth:`revalue` """
+        return self._view(self._dirty)
+
+    # --- results ---
+    @property
+    def value(self):
+        """ option values of the last valuation (`nan` if never valued) """
+        return self._view(self._results['value'])
+
+    @property
+    def delta(self):
+        return self._view(self._results['delta'])
+
+    @property
+    def gamma(self):
+        return self._view(self._results['gamma'])
+
+    @property
+    def vega(self):
+        return self._view(self._results['vega'])
+
+    # --- trades ---
+    def _reserve(self, size):
+        capacity = len(self._dirty)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for store in (self._columns, self._results):
+            for name, array in store.items():
+                grown = np.full(capacity, np.nan) if store is self._results else np.zeros(capacity, array.dtype)
+                grown[:self._size] = array[:self._size]
+                store[name] = grown
+        dirty = np.zeros(capacity, dtype=bool)
+        dirty[:self._size] = self._dirty[:self._size]
+        self._dirty = dirty
+
+    def _validate(self, option_type=None, model=None):
+        if option_type is not None and not np.all(np.isin(option_type, _OPTION_TYPES)):
+            raise ValueError('Unknown OptionType in ' + str(option_type))
+        if model is not None and not np.all((0 <= np.asarray(model)) & (np.asarray(model) < len(self.valuators))):
+            raise ValueError('Model must refer to one of %d valuators.' % len(self.valuators))
+
+    def add(self, forward, strike, time, volatility, option_type, discount_factor=1.0, model=0):
+        """
+        appends trades
+
+        :param array_like forward: forward prices of underlying at exercise date
+        :param array_like strike: strike prices
+        :param array_like time: year fractions until exercise date
+        :param array_like volatility: volatilities of underlying price
+        :param array_like option_type: OptionType
+        :param array_like discount_factor: discount factors (optional, default 1.)
+        :param array_like model: indices of valuators (optional, default 0)
+        :return: new rows, a single `int` if all arguments are scalars, otherwise `numpy.ndarray`
+
+        All arguments are broadcast against each other. New rows are dirty.
+
+        """
+        self._validate(option_type, model)
+        values = forward, strike, time, volatility, discount_factor, option_type, model
+        scalar = all(np.ndim(v) == 0 for v in values)
+        values = np.broadcast_arrays(*(np.asarray(v) for v in values))
+        rows = np.arange(self._size, self._size + values[0].size)
+        self._reserve(self._size + rows.size)
+        for name, v in zip(_INPUTS + ('option_type', 'model'), values):
+            self._columns[name][rows] = v.ravel()
+        for array in self._results.values():
+            array[rows] = np.nan
+        self._dirty[rows] = True
+        self._size += rows.size
+        return int(rows[0]) if scalar else rows
+
+    def update(self, rows, forward=None, strike=None, time=None, volatility=None, option_type=None,
+               discount_factor=None, model=None):
+        """
+        changes trade data
+
+        :param array_like rows: rows to change
+        :param array_like forward: new forward prices (optional)
+        :param array_like strike: new strike prices (optional)
+        :param array_like time: new year fractions until exercise date (optional)
+        :param array_like volatility: new volatilities (optional)
+        :param array_like option_type: new OptionType (optional)
+        :param array_like discount_factor: new discount factors (optional)
+        :param array_like model: new indices of valuators (optional)
+
+        Given values are broadcast against `rows`.
+        Only rows where some value actually changed become dirty.
+
+        """
+        self._validate(option_type, model)
+        rows = np.atleast_1d(np.asarray(rows, dtype=int))
+        if rows.size and not np.all((-self._size <= rows) & (rows < self._size)):
+            raise IndexError('Rows must be within %d trades.' % self._size)
+        rows = rows % max(self._size, 1)
+        values = dict(forward=forward, strike=strike, time=time, volatility=volatility, option_type=option_type,
+                      discount_factor=discount_factor, model=model)
+        for name, value in values.items():
+            if value is None:
+                continue
+            column = self._columns[name]
+            value = np.broadcast_to(np.asarray(value, dtype=column.dtype), rows.shape)
+            self._dirty[rows] |= column[rows] != value
+            column[rows] = value
+
+    def mark_dirty(self, rows=None):
+        """ marks rows (optional, default all) to be recomputed by the next :meth:`revalue` """
+        if rows is None:
+            rows = slice(0, self._size)
+        self._dirty[rows] = True
+
+    def revalue(self):
+        """
+        recomputes value, delta, gamma and vega of dirty rows
+
+        :return: revalued rows
+        :rtype: numpy.ndarray
+
+        """
+        rows = np.flatnonzero(self._dirty[:self._size])
+        if not rows.size:
+            return rows
+        models = self._columns['model'][rows]
+        for model in np.unique(models):
+            i = rows[models == model]
+            args = tuple(self._columns[name][i] for name in ('forward', 'strike', 'time', 'volatility', 'option_type',
+                                                             'discount_factor'))
+            results = self.valuators[model].price_and_greeks_portfolio(*args)
+            for name, result in zip(_RESULTS, results):
+                self._results[name][i] = result
+        self._dirty[rows] = False
+        return rows
+
+    def scenario_pnl(self, scenarios, notionals=1.0, relative=False, quantiles=(0.01, 0.05), chunk_size=CHUNK_SIZE):
+        """
+        total profit and loss per scenario and its quantiles (see :func:`putcall.scenario.scenario_pnl`)
+
+        :param array_like scenarios: forward shift, vol shift and optionally time decay (in years) per scenario,
+            i.e. of shape (n_scenarios, 2) or (n_scenarios, 3)
+        :param array_like notionals: notionals of rows (optional, default 1.)
+        :param relative: relative instead of absolute shifts as `bool` or as pair of `bool` for
+            forward and vol shifts (optional, default `False`)
+        :param array_like quantiles: levels of quantiles (optional, default (0.01, 0.05))
+        :param int chunk_size: maximal number of trade and scenario pairs per chunk
+            (optional, default `CHUNK_SIZE`)
+        :return: totals per scenario (n_scenarios), quantiles of totals (n_quantiles)
+            and quantiles of each row (n_trades, n_quantiles)
+        :rtype: tuple(numpy.ndarray)
+
+        """
+        notionals = np.broadcast_to(np.asarray(notionals, dtype=float), (self._size,))
+        models = self.model
+
+        def chunks():
+            for model in np.unique(models):
+                rows = np.flatnonzero(models == model)
+                forward, strike, time, volatility, option_type, discount_factor = \
+                    (self._columns[name][rows] for name in ('forward', 'strike', 'time', 'volatility', 'option_type',
+                                                            'discount_factor'))
+                for i, pnl in scenario_pnl_chunks(self.valuators[model], forward, strike, time, volatility,
+                                                  option_type, scenarios, discount_factor, notionals[rows], relative,
+                                                  chunk_size):
+                    yield rows[i], pnl
+
+        return _scenario_reduce(chunks(), scenarios, self._size, quantiles)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+import numpy as np
+
+CHUNK_SIZE = 2 ** 20
+
+
+def _scenario_shifts(scenarios, relative=False):
+    # forward shift, vol shift and time decay columns and relative flags of forward and vol shifts
+    scenarios = np.asarray(scenarios, dtype=float)
+    if scenarios.ndim == 1:
+        scenarios = scenarios[np.newaxis, :]
+    if not scenarios.ndim == 2 or scenarios.shape[1] not in (2, 3):
+        raise ValueError("Scenarios must be of shape (n_scenarios, 2) or (n_scenarios, 3).")
+    forward_shift, vol_shift = scenarios[:, 0], scenarios[:, 1]
+    time_decay = scenarios[:, 2] if scenarios.shape[1] == 3 else np.zeros(len(scenarios))
+    relative = tuple(relative) if isinstance(relative, (list, tuple)) else (relative, relative)
+    return forward_shift, vol_shift, time_decay, bool(relative[0]), bool(relative[1])
+
+
+def _scenario_reduce(chunks, scenarios, n_trades, quantiles):
+    # totals per scenario, their quantiles and quantiles per trade of (rows, pnl) chunks
+    quantiles = np.atleast_1d(np.asarray(quantiles, dtype=float))
+    totals = np.zeros(len(_scenario_shifts(scenarios)[0]))
+    trade_quantiles = np.full((n_trades, quantiles.size), np.nan)
+    for rows, pnl in chunks:
+        totals += pnl.sum(axis=0)
+        trade_quantiles[rows] = np.quantile(pnl, quantiles, axis=1).T
+    return totals, np.quantile(totals, quantiles), trade_quantiles
+
+
+def scenario_pnl_chunks(valuator, forwards, strikes, times, vols, option_types, scenarios, discount_factors=1.0,
+                        notionals=1.0, relative=False, chunk_size=CHUNK_SIZE):
+    """
+    profit and loss of trades under market scenarios, chunk by chunk of trades
+
+    :param OptionValuator valuator: valuator of all trades
+    :param array_like forwards: forward prices of underlying at exercise date
+    :param array_like strikes: strike prices
+    :param array_like times: year fractions until exercise date
+    :param array_like vols: volatilities of underlying price
+    :param array_like option_types: OptionType
+    :param array_like scenarios: forward shift, vol shift and optionally time decay (in years) per scenario,
+        i.e. of shape (n_scenarios, 2) or (n_scenarios, 3)
+    :param array_like discount_factors: discount factors (optional, default 1.)
+    :param array_like notionals: notionals (optional, default 1.)
+    :param relative: relative instead of absolute shifts as `bool` or as pair of `bool` for
+        forward and vol shifts (optional, default `False`)
+    :param int chunk_size: maximal number of trade and scenario pairs per chunk
+        (optional, default `CHUNK_SIZE`)
+    :return: generator of trade `slice` and `numpy.ndarray` of shape (n_chunk_trades, n_scenarios)
+
+    Trade arguments are broadcast against each other.
+    A relative shift `s` moves forward (or vol) `x` to `x * (1 + s)`, an absolute one to `x + s`.
+    Shifted vols are floored at zero and times less time decay at zero, so expiring trades pay off.
+    Discount factors are not shifted.
+
+    Each chunk of trades is valued under all scenarios
+    by one call of :meth:`OptionValuator.value_portfolio`,
+    so memory is bounded by `chunk_size` no matter the number of trades.
+
+    """
+    trades = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in
+                                   (forwards, strikes, times, vols, option_types, discount_factors, notionals)))
+    forward, strike, time, vol, option_type, discount_factor, notional = (a.ravel() for a in trades)
+    forward_shift, vol_shift, time_decay, relative_forward, relative_vol = _scenario_shifts(scenarios, relative)
+    n = forward.size
+    step = max(1, int(chunk_size) // max(1, forward_shift.size))
+    for start in range(0, n, step):
+        i = slice(start, min(start + step, n))
+        f, k, t, v, o, d, q = (a[i, np.newaxis] for a in (forward, strike, time, vol, option_type, discount_factor,
+                                                          notional))
+        base = valuator.value_portfolio(f, k, t, v, o, d)
+        shifted_forward = f * (1. + forward_shift) if relative_forward else f + forward_shift
+        shifted_vol = v * (1. + vol_shift) if relative_vol else v + vol_shift
+        shifted_vol = np.maximum(shifted_vol, 0.)
+        shifted_time = np.maximum(t - time_decay, 0.)
+        values = valuator.value_portfolio(shifted_forward, k, shifted_time, shifted_vol, o, d)
+        yield i, q * (values - base)
+
+
+def scenario_pnl(valuator, forwards, strikes, times, vols, option_types, scenarios, discount_factors=1.0,
+                 notionals=1.0, relative=False, quantiles=(0.01, 0.05), chunk_size=CHUNK_SIZE):
+    """
+    total profit and loss of trades per scenario and its quantiles
+
+    :param OptionValuator valuator: valuator of all trades
+    :param array_like forwards: forward prices of underlying at exercise date
+    :param array_like strikes: strike prices
+    :param array_like times: year fractions until exercise date
+    :param array_like vols: volatilities of underlying price
+    :param array_like option_types: OptionType
+    :param array_like scenarios: forward shift, vol shift and optionally time decay (in years) per scenario,
+        i.e. of shape (n_scenarios, 2) or (n_scenarios, 3)
+    :param array_like discount_factors: discount factors (optional, default 1.)
+    :param array_like notionals: notionals (optional, default 1.)
+    :param relative: relative instead of absolute shifts as `bool` or as pair of `bool` for
+        forward and vol shifts (optional, default `False`)
+    :param array_like quantiles: levels of quantiles (optional, default (0.01, 0.05))
+    :param int chunk_size: maximal number of trade and scenario pairs per chunk
+        (optional, default `CHUNK_SIZE`)
+    :return: totals per scenario (n_scenarios), quantiles of totals (n_quantiles)
+        and quantiles of each trade (n_trades, n_quantiles)
+    :rtype: tuple(numpy.ndarray)
+
+    Profit and loss of trades under scenarios is derived chunk by chunk
+    (see :func:`scenario_pnl_chunks`) and reduced to totals and quantiles,
+    so the full trades times scenarios matrix is never materialized.
+
+    >>> from putcall import OptionValuatorN, OptionType, scenario_pnl
+    >>> scenarios = [(-0.001, 0.), (0., 0.), (0.001, 0.)]
+    >>> totals, q, trade_q = scenario_pnl(OptionValuatorN(), [0.02, 0.02], 0.02, 1., 0.01,
+    ...                                   [OptionType.CALL, OptionType.PUT], scenarios, quantiles=(0.5,))
+    >>> totals.shape, q.shape, trade_q.shape
+    ((3,), (1,), (2, 1))
+
+    """
+    shape = np.broadcast(*(np.asarray(a) for a in (forwards, strikes, times, vols, option_types, discount_factors,
+                                                   notionals))).shape
+    chunks = scenario_pnl_chunks(valuator, forwards, strikes, times, vols, option_types, scenarios,
+                                 discount_factors, notionals, relative, chunk_size)
+    totals, total_quantiles, trade_quantiles = _scenario_reduce(chunks, scenarios, int(np.prod(shape)), quantiles)
+    return totals, total_quantiles, trade_quantiles.reshape(shape + total_quantiles.shape)
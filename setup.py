@@ -31,6 +31,7 @@ setup(
     package_data={pkg.__name__: list(pkg.__data__)},
     scripts=pkg.__scripts__,
     install_requires=pkg.__dependencies__,
+    extras_require=dict((k, list(v)) for k, v in pkg.__extras__.items()),
     dependency_links=pkg.__dependency_links__,
     long_description='\n'+codecs.open('README.rst', encoding='utf-8').read(),
     platforms='any',
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# putcall
+# -------
+# Collection of classical option pricing formulas.
+#
+# Author:   sonntagsgesicht, based on a fork of Deutsche Postbank [pbrisk]
+# Version:  0.2, copyright Wednesday, 18 September 2019
+# Website:  https://github.com/sonntagsgesicht/putcall
+# License:  Apache License 2.0 (see LICENSE file)
+
+
+import os
+import sys
+
+from timeit import timeit
+from datetime import datetime
+
+sys.path.append('.')
+sys.path.append('..')
+
+import numpy as np
+
+from mathtoolspy import cdf_abramowitz_stegun
+
+from putcall import normal_cdf, normal_cdf_array, ABRAMOWITZ_STEGUN, ERFC, ACCURATE
+
+
+def _time(func, number):
+    return timeit(func, number=number) / number
+
+
+def benchmark_normal_cdf(size=100000, number=3):
+    """ compares speed and accuracy of normal cdf methods against `mathtoolspy.cdf_abramowitz_stegun` """
+    x = np.linspace(-8., 8., size)
+    sx = list(x)
+    reference = normal_cdf_array(x, ACCURATE)
+    print('normal cdf on %d points' % size)
+    print('%-28s %14s %14s' % ('method', 'time [sec]', 'max abs error'))
+    t = _time(lambda: [cdf_abramowitz_stegun(y) for y in sx], number)
+    e = max(abs(cdf_abramowitz_stegun(y) - r) for y, r in zip(sx, reference))
+    print('%-28s %14.6f %14.3e' % ('mathtoolspy', t, e))
+    for method in (ABRAMOWITZ_STEGUN, ERFC, ACCURATE):
+        t = _time(lambda: [normal_cdf(y, method) for y in sx], number)
+        e = max(abs(normal_cdf(y, method) - r) for y, r in zip(sx, reference))
+        print('%-28s %14.6f %14.3e' % (method, t, e))
+    for method in (ABRAMOWITZ_STEGUN, ERFC, ACCURATE):
+        t = _time(lambda: normal_cdf_array(x, method), number)
+        e = np.max(np.abs(normal_cdf_array(x, method) - reference))
+        print('%-28s %14.6f %14.3e' % (method + ' (array)', t, e))
+    print('')
+
+
+if __name__ == "__main__":
+    start_time = datetime.now()
+
+    print('')
+    print('======================================================================')
+    print('')
+    print(('run %s' % __file__))
+    print(('in %s' % os.getcwd()))
+    print(('started  at %s' % str(start_time)))
+    print('')
+    print('----------------------------------------------------------------------')
+    print('')
+
+    benchmark_normal_cdf()
+
+    print('')
+    print('======================================================================')
+    print('')
+    print(('ran %s' % __file__))
+    print(('in %s' % os.getcwd()))
+    print(('started  at %s' % str(start_time)))
+    print(('finished at %s' % str(datetime.now())))
+    print('')
+    print('----------------------------------------------------------------------')
+    print('')
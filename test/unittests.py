@@ -14,16 +14,37 @@ import os
 import sys
 import unittest
 
-from math import exp
+import numpy as np
+
+from math import exp, fabs
+from time import sleep
 
 sys.path.append('.')
 sys.path.append('..')
 
 from putcall import black_scholes
+from putcall import lets_be_rational, normalised_black_call, normalised_implied_vol
+from putcall import bachelier_implied_vol, bachelier_implied_vol_array
+from putcall import CONVERGED, BISECTION, NO_BRACKET, implied_vol_surface
+from putcall import ValuationCache, TaylorValuationCache, Portfolio, scenario_pnl, scenario_pnl_chunks
+from putcall import hw_cap_floor_let, hw_cap_floor_let_price_and_gradient, \
+    brute_hw_calibration_cap_floor, lm_hw_calibration_cap_floor
+from putcall import hw_cap_floor_let_array, grid_hw_calibration_cap_floor
+from putcall import binary_mr_hw_calibration_cap_floor, HullWhiteCalibrationExecutor, golden_hw_calibration_cap_floor
+from putcall import HullWhiteCalibrationProblem, HullWhiteCalibrationState
+from putcall import cap_floor_value_array, caplet_value_array, caplet_vol_stripping
+from putcall import sabr_black_vol, sabr_alpha_from_atm, sabr_alpha_from_atm_array
+from putcall import sabr_black_vol_array, sabr_black_vol_and_gradient_array, sabr_calibration_smile, \
+    sabr_calibration_cube
+from putcall import normal_cdf, normal_cdf_array, set_normal_cdf_method, get_normal_cdf_method, \
+    ABRAMOWITZ_STEGUN, ERFC, ACCURATE
+from putcall.formulas.interest_rate_options import black76
 from putcall import OptionType, OptionValuatorIntrinsic, \
     OptionValuatorN, OptionValuatorLN, OptionValuatorSLN
 from datetime import datetime
 
+import putcall
+
 
 class OptionValuatorTests(unittest.TestCase):
 
@@ -103,6 +124,7 @@ class OptionValuatorTests(unittest.TestCase):
         b_delta = 0.300775792005
         r_gamma = opt_val.gamma(forward, strike, time, volatility, option_type, discount_factor)
         b_gamma = 33.03739172857978
+        b_gamma = 33.03723977921657
         r_vega = opt_val.vega(forward, strike, time, volatility, option_type, discount_factor)
         b_vega = 0.00590540661053
 
@@ -127,13 +149,14 @@ class OptionValuatorTests(unittest.TestCase):
         r_gamma = opt_val.gamma(forward, strike, time, volatility, option_type, discount_factor)
         b_gamma = 8.915958112439837
         b_gamma = 8.91595814366486
+        b_gamma = 8.915985347352619
         r_vega = opt_val.vega(forward, strike, time, volatility, option_type, discount_factor)
         b_vega = 0.0254997180934
 
         places = 10
         self.assertAlmostEqual(b_option_value, r_option_value, places)
         self.assertAlmostEqual(b_delta, r_delta, places)
-        self.assertAlmostEqual(b_gamma, r_gamma, int(places*6/10))
+        self.assertAlmostEqual(b_gamma, r_gamma, places)
         self.assertAlmostEqual(b_vega, r_vega, places)
 
     def test_option_valuator_intrinsic(self):
@@ -183,6 +206,814 @@ class OptionValuatorTests(unittest.TestCase):
         self.assertAlmostEqual(impl_vol, vol, 8)
         self.assertAlmostEqual(price_with_impl_vol, price, 8)
 
+    def test_implied_vol_N_02(self):
+        # deep out of the money prices below intrinsic value by the normal cdf approximation
+        opt_val = OptionValuatorN()
+        for strike, option_type in ((0.03, OptionType.CALL), (0.01, OptionType.PUT), (0.03, OptionType.STRADDLE)):
+            for vol in (0.001, 0.002, 0.003):
+                price = opt_val.option_value(0.02, strike, 0.25, vol, option_type, 0.9)
+                impl_vol = opt_val.implied_vol(0.02, strike, 0.25, price, option_type, 0.9)
+                price_with_impl_vol = opt_val.option_value(0.02, strike, 0.25, impl_vol, option_type, 0.9)
+                self.assertAlmostEqual(price, price_with_impl_vol, 15)
+
+    def test_implied_vol_LN(self):
+        for opt_val in (OptionValuatorLN(), OptionValuatorSLN()):
+            # round trip against the default normal cdf
+            price = opt_val.option_value(0.02, 0.03, 0.25, 0.2, OptionType.CALL)
+            self.assertAlmostEqual(1., opt_val.implied_vol(0.02, 0.03, 0.25, price, OptionType.CALL) / 0.2, 12)
+            # roundoff below intrinsic value
+            price = opt_val.option_value(0.02, 0.01, 0.25, 0.05, OptionType.STRADDLE, 0.9)
+            impl_vol = opt_val.implied_vol(0.02, 0.01, 0.25, price, OptionType.STRADDLE, 0.9)
+            price_with_impl_vol = opt_val.option_value(0.02, 0.01, 0.25, impl_vol, OptionType.STRADDLE, 0.9)
+            self.assertAlmostEqual(price, price_with_impl_vol, 15)
+
+
+    def test_value_portfolio(self):
+        n = 200
+        forwards = np.linspace(0.01, 0.05, n)
+        strikes = np.linspace(0.04, 0.015, n)
+        times = np.linspace(0.25, 10., n)
+        option_types = np.arange(n) % 5
+        discount_factors = np.exp(-0.02 * times)
+        for valuator, vol in ((OptionValuatorN(), 0.01), (OptionValuatorLN(), 0.2), (OptionValuatorSLN(), 0.1),
+                              (OptionValuatorLN(delta=0.0001, vega=0.0001), 0.2)):
+            vols = np.full(n, vol)
+            for portfolio, single in ((valuator.value_portfolio, valuator.option_value),
+                                      (valuator.delta_portfolio, valuator.delta),
+                                      (valuator.gamma_portfolio, valuator.gamma),
+                                      (valuator.vega_portfolio, valuator.vega)):
+                values = portfolio(forwards, strikes, times, vols, option_types, discount_factors)
+                self.assertEqual((n,), values.shape)
+                for i in range(n):
+                    expected = single(forwards[i], strikes[i], times[i], vols[i], option_types[i],
+                                      discount_factors[i])
+                    self.assertAlmostEqual(expected, values[i], delta=1e-10 * max(1., abs(expected)))
+        values = OptionValuatorIntrinsic().value_portfolio(forwards, strikes, times, 0., OptionType.CALL)
+        self.assertTrue(np.allclose(np.maximum(forwards - strikes, 0.), values))
+        self.assertEqual((2, 3), OptionValuatorN().value_portfolio(0.02, [[0.01], [0.02]], 1., 0.01, [0, 1, 4]).shape)
+
+    def test_bumped_portfolio(self):
+        n = 100
+        forwards = np.linspace(0.01, 0.05, n)
+        strikes = np.linspace(0.04, 0.015, n)
+        times = np.linspace(0.25, 10., n)
+        option_types = np.arange(n) % 5
+        discount_factors = np.exp(-0.02 * times)
+        analytic = OptionValuatorN()
+        exact = analytic.price_and_greeks_portfolio(forwards, strikes, times, 0.01, option_types, discount_factors)
+        for delta, vega, tolerance in (((1e-6, 1., True, False), (1e-5, 1., True, False), 1e-3),
+                                       ((1e-6, 1., True, True), (1e-5, 1., True, True), 1e-4),
+                                       ((1e-4, 1., False, True), (1e-3, 1., False, True), None)):
+            valuator = OptionValuatorN(delta=delta, vega=vega)
+            bumped = valuator.price_and_greeks_portfolio(forwards, strikes, times, 0.01, option_types,
+                                                         discount_factors)
+            for i in range(n):
+                single = valuator.price_and_greeks(forwards[i], strikes[i], times[i], 0.01, option_types[i],
+                                                   discount_factors[i])
+                for b, s in zip(bumped, single):
+                    self.assertAlmostEqual(s, b[i], delta=1e-5 * max(1., abs(s)))
+            if tolerance:
+                for e, b in zip(exact, bumped):
+                    self.assertLess(np.max(np.abs(b - e)), tolerance * np.max(np.abs(e)))
+
+        # number of valuations per option
+        class Counter(OptionValuatorN):
+            calls = list()
+
+            def _option_value(self, *args):
+                self.calls.append(args)
+                return super(Counter, self)._option_value(*args)
+
+        Counter(delta=(1e-6, 1., True, False), vega=(1e-5, 1., True, False)).price_and_greeks(0.01, 0.02, 1., 0.01, 0)
+        self.assertEqual(4, len(Counter.calls))
+        del Counter.calls[:]
+        Counter(delta=(1e-6, 1., True, True), vega=(1e-5, 1., True, True)).price_and_greeks(0.01, 0.02, 1., 0.01, 0)
+        self.assertEqual(5, len(Counter.calls))
+
+
+class LetsBeRationalUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.previous = set_normal_cdf_method(ERFC)
+
+    def tearDown(self):
+        set_normal_cdf_method(self.previous)
+
+    def test_normalised_implied_vol(self):
+        for x in (0.0, -1e-8, -1e-4, -0.01, -0.1, -0.5, -1., -2., -5., -10., -30., -100.):
+            for s in (1e-4, 1e-3, 0.01, 0.05, 0.1, 0.3, 0.7, 1., 2., 4., 8.):
+                beta = normalised_black_call(x, s)
+                if not 1e-290 < beta:
+                    continue
+                for q in (1., -1.):
+                    vol, iterations = normalised_implied_vol(beta, q * x, q)
+                    self.assertAlmostEqual(1.0, vol / s, 10, msg=str((x, s)))
+                    self.assertTrue(iterations <= 2)
+
+    def test_valuator(self):
+        forward, time = 0.01, 3.25
+        for opt_val in (OptionValuatorLN(), OptionValuatorSLN()):
+            for strike in (0.005, 0.01, 0.025):
+                for vol in (0.2, 0.55):
+                    for option_type in (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE):
+                        price = opt_val.option_value(forward, strike, time, vol, option_type, 0.9)
+                        impl_vol = opt_val.implied_vol(forward, strike, time, price, option_type, 0.9)
+                        self.assertAlmostEqual(vol, impl_vol, 8)
+
+    def test_bounds(self):
+        self.assertRaises(ValueError, lets_be_rational, 0.004, 0.01, 0.005, 1., True)
+        self.assertRaises(ValueError, lets_be_rational, 0.011, 0.01, 0.005, 1., True)
+        self.assertRaises(ValueError, lets_be_rational, 0.005, 0.01, 0.005, 1., False)
+        self.assertRaises(ValueError, lets_be_rational, 0.001, 0.01, 0.005, 0., False)
+        self.assertRaises(ValueError, lets_be_rational, 0.001, -0.01, 0.005, 1., False)
+        self.assertEqual(0.0, lets_be_rational(0.005, 0.01, 0.005, 1., True))
+        self.assertEqual(0.0, lets_be_rational(0.0, 0.01, 0.005, 1., False))
+
+    def test_fallback(self):
+        forward, strike, time, vol = 0.01, 0.0101, 1.0, 0.02
+        opt_val = OptionValuatorLN()
+        price = opt_val.option_value(forward, strike, time, vol, OptionType.DIGITAL_CALL)
+        impl_vol = opt_val.implied_vol(forward, strike, time, price, OptionType.DIGITAL_CALL)
+        self.assertAlmostEqual(vol, impl_vol, 6)
+
+
+class ImpliedNormalVolatilityUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.previous = set_normal_cdf_method(ERFC)
+        self.forward = 0.01
+        self.strikes = (-0.01, -0.002, 0.0, 0.005, 0.01, 0.011, 0.02, 0.05)
+        self.vols = (0.001, 0.005, 0.012, 0.03)
+        self.times = (0.1, 1., 5., 30.)
+
+    def tearDown(self):
+        set_normal_cdf_method(self.previous)
+
+    def test_implied_vol(self):
+        for strike in self.strikes:
+            for vol in self.vols:
+                for time in self.times:
+                    if 5. * vol * time ** 0.5 < abs(self.forward - strike):
+                        continue
+                    is_call = self.forward <= strike
+                    price = putcall.bachelier(self.forward, strike, vol, time, is_call)
+                    impl_vol = bachelier_implied_vol(price, self.forward, strike, time, is_call)
+                    self.assertAlmostEqual(1.0, impl_vol / vol, 9, msg=str((strike, vol, time)))
+
+    def test_implied_vol_array(self):
+        strike, vol, time = np.meshgrid(self.strikes, self.vols, self.times)
+        is_call = self.forward <= strike
+        price = putcall.bachelier_array(self.forward, strike, vol, time, is_call)
+        impl_vol = bachelier_implied_vol_array(price, self.forward, strike, time, is_call)
+        for p, k, t, c, v in zip(price.flat, strike.flat, time.flat, is_call.flat, impl_vol.flat):
+            self.assertAlmostEqual(bachelier_implied_vol(p, self.forward, k, t, c), v, 15)
+        self.assertTrue(np.isnan(bachelier_implied_vol_array(0.004, 0.01, 0.005, 1., True)))
+        self.assertEqual(0.0, bachelier_implied_vol_array(0.005, 0.01, 0.005, 1., True))
+
+    def test_bounds(self):
+        self.assertRaises(ValueError, bachelier_implied_vol, 0.004, 0.01, 0.005, 1., True)
+        self.assertRaises(ValueError, bachelier_implied_vol, 0.001, 0.01, 0.005, 0., False)
+        self.assertEqual(0.0, bachelier_implied_vol(0.005, 0.01, 0.005, 1., True))
+        self.assertEqual(0.0, bachelier_implied_vol(0.0, 0.01, 0.005, 1., False))
+        price = putcall.bachelier(0.01, 0.01, 0.02, 4., True)
+        self.assertAlmostEqual(0.02, bachelier_implied_vol(price, 0.01, 0.01, 4., True), 15)
+
+    def test_valuator(self):
+        forward, time = 0.01, 3.25
+        opt_val = OptionValuatorN()
+        for strike in (-0.005, 0.005, 0.01, 0.025):
+            for vol in (0.002, 0.011):
+                for option_type in (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE):
+                    price = opt_val.option_value(forward, strike, time, vol, option_type, 0.9)
+                    impl_vol = opt_val.implied_vol(forward, strike, time, price, option_type, 0.9)
+                    self.assertAlmostEqual(vol, impl_vol, 8)
+
+
+class ImpliedVolArrayUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.forward = 0.01
+        self.strikes = np.array([0.005, 0.0075, 0.01, 0.0125, 0.015, 0.025])
+        self.times = np.array([0.5, 2., 10.])
+        self.option_types = (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE,
+                             OptionType.DIGITAL_CALL, OptionType.DIGITAL_PUT)
+
+    def _test_valuator(self, opt_val, vol):
+        strike, time, option_type = np.meshgrid(self.strikes, self.times, self.option_types)
+        price = np.vectorize(opt_val.option_value)(self.forward, strike, time, vol, option_type, 0.9)
+        impl_vol, status, iterations = opt_val.implied_vol_array(self.forward, strike, time, price, option_type, 0.9)
+        self.assertEqual(price.shape, impl_vol.shape)
+        self.assertEqual(price.shape, status.shape)
+        self.assertEqual(price.shape, iterations.shape)
+        for p, k, t, o, v, s in zip(price.flat, strike.flat, time.flat, option_type.flat, impl_vol.flat, status.flat):
+            if s == NO_BRACKET:
+                # out-of-the-money digitals may have two implied volatilities
+                self.assertTrue(o in (OptionType.DIGITAL_CALL, OptionType.DIGITAL_PUT))
+                continue
+            self.assertTrue(s in (CONVERGED, BISECTION))
+            self.assertAlmostEqual(p, opt_val.option_value(self.forward, k, t, v, o, 0.9), 14)
+            if o in (OptionType.CALL, OptionType.PUT, OptionType.STRADDLE):
+                self.assertAlmostEqual(vol, v, 8)
+
+    def test_valuator_n(self):
+        self._test_valuator(OptionValuatorN(), 0.008)
+
+    def test_valuator_ln(self):
+        self._test_valuator(OptionValuatorLN(), 0.35)
+
+    def test_valuator_sln(self):
+        self._test_valuator(OptionValuatorSLN(), 0.15)
+
+    def test_status(self):
+        opt_val = OptionValuatorLN()
+        # above maximal call price, at intrinsic value, below intrinsic value
+        price = np.array([0.011, 0.005, 0.004])
+        impl_vol, status, iterations = opt_val.implied_vol_array(0.01, 0.005, 1., price, OptionType.CALL)
+        self.assertEqual([NO_BRACKET, CONVERGED, NO_BRACKET], list(status))
+        self.assertTrue(np.isnan(impl_vol[0]))
+        self.assertEqual(0.0, impl_vol[1])
+        self.assertEqual([0, 0, 0], list(iterations))
+
+
+class ImpliedVolSurfaceUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.forwards = np.array([0.01, 0.012, 0.015, 0.02])
+        self.expiries = np.array([0.5, 1., 5., 10.])
+        self.strikes = np.linspace(0.005, 0.03, 11)
+
+    def _test_valuator(self, opt_val, smile, option_type):
+        forward, strike, time = self.forwards[:, None], self.strikes[None, :], self.expiries[:, None]
+        vol = smile(forward, strike, time)
+        price = np.vectorize(opt_val.option_value)(forward, strike, time, vol, option_type, 0.9)
+        impl_vol, iterations = implied_vol_surface(self.forwards, self.strikes, self.expiries, price, option_type,
+                                                   opt_val, 0.9)
+        self.assertEqual(price.shape, impl_vol.shape)
+        self.assertEqual(price.shape, iterations.shape)
+        for v, w in zip(vol.flat, impl_vol.flat):
+            self.assertAlmostEqual(v, w, 8)
+        # warm starts need less iterations than cold starts
+        cold_iterations = opt_val.implied_vol_array(forward, strike, time, price, option_type, 0.9)[2]
+        self.assertTrue(iterations.sum() < cold_iterations.sum())
+        # strike order does not matter
+        permutation = np.array([7, 2, 10, 0, 5, 1, 9, 3, 8, 4, 6])
+        permuted_vol, permuted_iterations = implied_vol_surface(
+            self.forwards, self.strikes[permutation], self.expiries, price[:, permutation], option_type, opt_val, 0.9)
+        self.assertEqual(impl_vol[:, permutation].tolist(), permuted_vol.tolist())
+        self.assertEqual(iterations[:, permutation].tolist(), permuted_iterations.tolist())
+
+    def test_valuator_ln(self):
+        smile = (lambda f, k, t: 0.2 + 300. * (k - f) ** 2 + 0.02 / np.sqrt(t))
+        self._test_valuator(OptionValuatorLN(), smile, OptionType.CALL)
+
+    def test_valuator_n(self):
+        smile = (lambda f, k, t: 0.006 + 2. * (k - f) ** 2 + 0.001 / np.sqrt(t))
+        self._test_valuator(OptionValuatorN(), smile, OptionType.STRADDLE)
+
+
+class ValuationCacheUnitTests(unittest.TestCase):
+    def test_lru(self):
+        cache = ValuationCache(maxsize=2)
+        self.assertEqual(4., cache(pow, 2., 2))
+        self.assertEqual(8., cache(pow, 2., 3))
+        self.assertEqual(4., cache(pow, 2., 2))
+        self.assertEqual(16., cache(pow, 2., 4))
+        self.assertEqual(2, len(cache))
+        self.assertEqual((1, 3, 1), (cache.hits, cache.misses, cache.evictions))
+        # least recently used entry has been evicted
+        self.assertEqual(8., cache(pow, 2., 3))
+        self.assertEqual((1, 4, 2), (cache.hits, cache.misses, cache.evictions))
+        cache.clear()
+        self.assertEqual((0, 0, 0, 0), (len(cache), cache.hits, cache.misses, cache.evictions))
+
+    def test_ttl(self):
+        cache = ValuationCache(ttl=0.01)
+        cache(pow, 2., 2)
+        cache(pow, 2., 2)
+        sleep(0.02)
+        cache(pow, 2., 2)
+        self.assertEqual((1, 2, 1), (cache.hits, cache.misses, cache.evictions))
+
+    def test_digits(self):
+        cache = ValuationCache(digits=8)
+        self.assertEqual(cache(pow, 2., 2), cache(pow, 2.000000001, 2))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        cache(pow, 2.00001, 2)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_valuator(self):
+        forward, strike, time, vol = 0.01, 0.012, 2., 0.3
+        for opt_val in (OptionValuatorN(cache=True), OptionValuatorLN(cache=True), OptionValuatorSLN(cache=True)):
+            price = opt_val.option_value(forward, strike, time, vol, OptionType.CALL, 0.9)
+            impl_vol = opt_val.implied_vol(forward, strike, time, price, OptionType.CALL, 0.9)
+            self.assertEqual(price, opt_val.option_value(forward, strike, time, vol, OptionType.CALL, 0.9))
+            self.assertEqual(impl_vol, opt_val.implied_vol(forward, strike, time, price, OptionType.CALL, 0.9))
+            self.assertEqual((2, 2), (opt_val.cache.hits, opt_val.cache.misses))
+            uncached = opt_val.__class__()
+            self.assertEqual(price, uncached.option_value(forward, strike, time, vol, OptionType.CALL, 0.9))
+            self.assertEqual(impl_vol, uncached.implied_vol(forward, strike, time, price, OptionType.CALL, 0.9))
+
+    def test_normal_cdf_method(self):
+        forward, strike, time, vol = 0.01, 0.012, 2., 0.3
+        opt_val, uncached = OptionValuatorLN(cache=True), OptionValuatorLN()
+        method = get_normal_cdf_method()
+        try:
+            set_normal_cdf_method(ABRAMOWITZ_STEGUN)
+            price = opt_val.option_value(forward, strike, time, vol, OptionType.CALL)
+            set_normal_cdf_method(ACCURATE)
+            accurate = opt_val.option_value(forward, strike, time, vol, OptionType.CALL)
+            self.assertEqual((0, 2), (opt_val.cache.hits, opt_val.cache.misses))
+            self.assertNotEqual(price, accurate)
+            self.assertEqual(uncached.option_value(forward, strike, time, vol, OptionType.CALL), accurate)
+            set_normal_cdf_method(ABRAMOWITZ_STEGUN)
+            self.assertEqual(price, opt_val.option_value(forward, strike, time, vol, OptionType.CALL))
+            self.assertEqual((1, 2), (opt_val.cache.hits, opt_val.cache.misses))
+        finally:
+            set_normal_cdf_method(method)
+
+    def test_threads(self):
+        from multiprocessing.pool import ThreadPool
+        opt_val = OptionValuatorLN(cache=ValuationCache(maxsize=16))
+        args = [(0.01, 0.005 + 0.001 * (i % 32), 2., 0.2, OptionType.CALL) for i in range(1000)]
+        values = ThreadPool(8).map(lambda a: opt_val.option_value(*a), args)
+        self.assertEqual([OptionValuatorLN().option_value(*a) for a in args], values)
+        self.assertEqual(1000, opt_val.cache.hits + opt_val.cache.misses)
+        self.assertTrue(len(opt_val.cache) <= 16)
+
+
+class PortfolioUnitTests(unittest.TestCase):
+    def setUp(self):
+        n = 50
+        self.portfolio = Portfolio([OptionValuatorLN(), OptionValuatorN()], capacity=8)
+        self.rows = self.portfolio.add(np.linspace(0.01, 0.05, n), 0.025, np.linspace(0.5, 10., n),
+                                       np.where(np.arange(n) % 2, 0.01, 0.3), np.arange(n) % 5,
+                                       np.exp(-0.02 * np.linspace(0.5, 10., n)), np.arange(n) % 2)
+
+    def assertValued(self):
+        p = self.portfolio
+        for i in range(len(p)):
+            valuator = p.valuators[p.model[i]]
+            expected = valuator.price_and_greeks(p.forward[i], p.strike[i], p.time[i], p.volatility[i],
+                                                 p.option_type[i], p.discount_factor[i])
+            for e, r in zip(expected, (p.value[i], p.delta[i], p.gamma[i], p.vega[i])):
+                self.assertAlmostEqual(e, r, delta=1e-10 * max(1., abs(e)))
+
+    def test_revalue(self):
+        p = self.portfolio
+        self.assertEqual(50, len(p))
+        self.assertEqual(np.float64, p.forward.dtype)
+        self.assertEqual(np.int8, p.option_type.dtype)
+        self.assertTrue(np.all(np.isnan(p.value)))
+        self.assertEqual(50, len(p.revalue()))
+        self.assertFalse(np.any(p.dirty))
+        self.assertValued()
+        self.assertEqual(0, len(p.revalue()))
+
+    def test_incremental(self):
+        p = self.portfolio
+        p.revalue()
+        p.update([3, 7], forward=0.031)
+        p.update(11, volatility=p.volatility[11])  # unchanged
+        p.update(-1, option_type=OptionType.STRADDLE, model=0, volatility=0.4)
+        self.assertEqual([3, 7, 49], list(p.revalue()))
+        self.assertValued()
+        row = p.add(0.02, 0.02, 1., 0.2, OptionType.PUT)
+        self.assertEqual(50, row)
+        self.assertEqual([50], list(p.revalue()))
+        self.assertValued()
+
+    def test_validation(self):
+        p = self.portfolio
+        self.assertRaises(ValueError, p.add, 0.02, 0.02, 1., 0.2, 7)
+        self.assertRaises(ValueError, p.add, 0.02, 0.02, 1., 0.2, 0, 1., 2)
+        self.assertRaises(IndexError, p.update, 50, forward=0.02)
+        self.assertRaises(ValueError, p.forward.__setitem__, 0, 0.02)
+
+
+class ScenarioUnitTests(unittest.TestCase):
+    def setUp(self):
+        n = 23
+        self.valuator = OptionValuatorN()
+        self.trades = (np.linspace(0.01, 0.05, n), 0.025, np.linspace(0.01, 5., n), 0.01, np.arange(n) % 5,
+                       np.exp(-0.02 * np.linspace(0.01, 5., n)), np.linspace(-1., 2., n))
+        rnd = np.random.RandomState(0)
+        self.scenarios = np.column_stack((rnd.normal(0., 0.002, 40), rnd.normal(0., 0.001, 40), np.full(40, 0.02)))
+
+    def brute_force(self, relative):
+        forwards, strike, times, vol, option_types, discount_factors, notionals = self.trades
+        pnl = np.zeros((len(forwards), len(self.scenarios)))
+        for i in range(len(forwards)):
+            args = forwards[i], strike, times[i], vol, option_types[i]
+            base = self.valuator.option_value(*(args + (discount_factors[i],)))
+            for j, (df, dv, dt) in enumerate(self.scenarios):
+                f = forwards[i] * (1 + df) if relative else forwards[i] + df
+                v = vol * (1 + dv) if relative else vol + dv
+                t = max(times[i] - dt, 0.)
+                value = self.valuator.option_value(f, strike, t, max(v, 0.), option_types[i], discount_factors[i])
+                pnl[i, j] = notionals[i] * (value - base)
+        return pnl
+
+    def test_scenario_pnl(self):
+        forwards, strike, times, vol, option_types, discount_factors, notionals = self.trades
+        for relative in (False, True):
+            self.scenarios = scenarios = self.scenarios * ((10., 10., 1.) if relative else 1.)
+            expected = self.brute_force(relative)
+            for chunk_size in (1, 100, 10000):
+                totals, quantiles, trade_quantiles = scenario_pnl(
+                    self.valuator, forwards, strike, times, vol, option_types, scenarios, discount_factors,
+                    notionals, relative, (0.05, 0.5), chunk_size)
+                for e, t in zip(expected.sum(axis=0), totals):
+                    self.assertAlmostEqual(e, t, 12)
+                for e, q in zip(np.quantile(expected.sum(axis=0), (0.05, 0.5)), quantiles):
+                    self.assertAlmostEqual(e, q, 12)
+                self.assertTrue(np.allclose(np.quantile(expected, (0.05, 0.5), axis=1).T, trade_quantiles,
+                                            rtol=0., atol=1e-12))
+
+    def test_chunks(self):
+        chunks = list(scenario_pnl_chunks(self.valuator, *(self.trades[:5] + (self.scenarios,)), chunk_size=200))
+        self.assertEqual(5, len(chunks))
+        for i, pnl in chunks:
+            self.assertLessEqual(pnl.size, 200)
+        self.assertRaises(ValueError, lambda: list(scenario_pnl_chunks(self.valuator, *(self.trades[:5] + ([[0.]],)))))
+
+    def test_portfolio(self):
+        forwards, strike, times, vol, option_types, discount_factors, notionals = self.trades
+        portfolio = Portfolio([OptionValuatorN(), OptionValuatorSLN()])
+        portfolio.add(forwards, strike, times, np.where(np.arange(len(forwards)) % 2, vol, 0.3), option_types,
+                      discount_factors, np.arange(len(forwards)) % 2)
+        totals, quantiles, trade_quantiles = portfolio.scenario_pnl(self.scenarios, notionals, chunk_size=50)
+        expected = np.zeros(len(self.scenarios))
+        for model, valuator in enumerate(portfolio.valuators):
+            i = portfolio.model == model
+            t, _, q = scenario_pnl(valuator, portfolio.forward[i], strike, portfolio.time[i], portfolio.volatility[i],
+                                   portfolio.option_type[i], self.scenarios, portfolio.discount_factor[i],
+                                   notionals[i])
+            expected += t
+            self.assertTrue(np.allclose(q, trade_quantiles[i], rtol=0., atol=1e-12))
+        self.assertTrue(np.allclose(expected, totals, rtol=0., atol=1e-12))
+        self.assertTrue(np.allclose(np.quantile(expected, (0.01, 0.05)), quantiles, rtol=0., atol=1e-12))
+
+
+class TaylorValuationCacheUnitTests(unittest.TestCase):
+    def setUp(self):
+        n = 50
+        self.trades = np.linspace(0.01, 0.05, n), 0.025, np.linspace(0.5, 10., n), 0.01, np.arange(n) % 5, 0.9
+
+    def test_speed(self):
+        forwards, strike, times, vol, option_types, discount_factor = self.trades
+        for valuator, vol in ((OptionValuatorLN(), 0.3), (OptionValuatorSLN(), 0.3), (OptionValuatorN(), vol)):
+            cache = TaylorValuationCache(valuator)
+            cache.fit(forwards, strike, times, vol, option_types, discount_factor)
+            value, delta, gamma, vega, vanna, volga, speed = cache.greeks
+            for i, (f, t, o) in enumerate(zip(forwards, times, option_types)):
+                h = 1e-5 * f
+                scalar = (lambda x: valuator.gamma(x, strike, t, vol, o, discount_factor))
+                self.assertAlmostEqual(scalar(f), gamma[i], delta=1e-10 * max(1., abs(gamma[i])))
+                expected = (scalar(f + h) - scalar(f - h)) / (2 * h)
+                self.assertAlmostEqual(expected, speed[i], delta=1e-2 * max(1., abs(expected)))
+
+    def test_approximation(self):
+        valuator = OptionValuatorN()
+        cache = TaylorValuationCache(valuator, tolerance=1e-6)
+        values = cache.fit(*self.trades)
+        self.assertTrue(np.allclose(valuator.value_portfolio(*self.trades), values, rtol=0., atol=1e-15))
+        forwards, strike, times, vol, option_types, discount_factor = self.trades
+        for move in (1e-6, 1e-5, 1e-4, 1e-3, 1e-2):
+            fallbacks = cache.fallbacks
+            new_forwards, new_vol = forwards + move, vol + 0.1 * move
+            approximated = cache.value(new_forwards, new_vol)
+            exact = valuator.value_portfolio(new_forwards, strike, times, new_vol, option_types, discount_factor)
+            self.assertLess(np.max(np.abs(approximated - exact)), 1e-5)
+            if move <= 1e-5:
+                self.assertEqual(fallbacks, cache.fallbacks)
+        self.assertEqual(250, cache.approximations + cache.fallbacks)
+        self.assertTrue(0. < cache.fallback_ratio < 1.)
+
+    def test_fallback(self):
+        valuator = OptionValuatorLN()
+        cache = TaylorValuationCache(valuator, tolerance=0.)
+        forwards, strike, times, vol, option_types, discount_factor = self.trades
+        cache.fit(forwards, strike, times, 0.3, option_types, discount_factor)
+        rows = [1, 3, 5]
+        values = cache.value(forwards[rows] * 1.1, 0.35, rows)
+        exact = valuator.value_portfolio(forwards[rows] * 1.1, strike, times[rows], 0.35, option_types[rows],
+                                         discount_factor)
+        self.assertTrue(np.allclose(exact, values, rtol=0., atol=1e-15))
+        self.assertEqual((0, 3, 1.), (cache.approximations, cache.fallbacks, cache.fallback_ratio))
+        # anchored anew, so no move is exact
+        self.assertTrue(np.allclose(exact, cache.value(rows=rows), rtol=0., atol=1e-15))
+        self.assertEqual(3, cache.approximations)
+
+
+class HullWhiteCalibrationUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.previous = set_normal_cdf_method(ERFC)
+
+    def tearDown(self):
+        set_normal_cdf_method(self.previous)
+
+    @staticmethod
+    def _price_dict(mean_reversion, volatility, size=40):
+        price_dict = dict((key, list()) for key in
+                          ('forward_values', 'strike', 'time_value', 'bool', 'year_fraction', 'discfact', 'price'))
+        for i in range(size):
+            time_value = 0.25 * (i + 1)
+            forward = 0.01 + 0.0005 * i
+            strike = forward + 0.001 * (i % 7 - 3)
+            discount = exp(-0.015 * time_value)
+            price = hw_cap_floor_let(forward, strike, volatility, time_value, bool(i % 2), 0.25, mean_reversion,
+                                     discount)
+            for key, value in zip(sorted(price_dict),
+                                  (bool(i % 2), discount, forward, price, strike, time_value, 0.25)):
+                price_dict[key].append(value)
+        return price_dict
+
+    @staticmethod
+    def _error(price_dict, mean_reversion, volatility, error_func=(lambda x: x * x)):
+        # aggregated error caplet by caplet
+        error = 0.
+        for i in range(len(price_dict['strike'])):
+            value = hw_cap_floor_let(price_dict['forward_values'][i], price_dict['strike'][i], volatility,
+                                     price_dict['time_value'][i], price_dict['bool'][i],
+                                     price_dict['year_fraction'][i], mean_reversion, price_dict['discfact'][i])
+            error += error_func(value - price_dict['price'][i])
+        return error
+
+    def test_gradient(self):
+        args = (0.02, 0.025, 0.01, 2., True, 0.5, 0.05, 0.95), (0.02, 0.015, 0.007, 7., False, 0.25, 0.1, 0.8)
+        for forward, strike, vol, time, is_call, year_fraction, mean_reversion, discount in args:
+            value, d_mr, d_vol = hw_cap_floor_let_price_and_gradient(
+                forward, strike, vol, time, is_call, year_fraction, mean_reversion, discount)
+            price = (lambda m, v: hw_cap_floor_let(forward, strike, v, time, is_call, year_fraction, m, discount))
+            self.assertAlmostEqual(price(mean_reversion, vol), value, 15)
+            self.assertAlmostEqual((price(mean_reversion + 1e-7, vol) - price(mean_reversion - 1e-7, vol)) / 2e-7,
+                                   d_mr, 8)
+            self.assertAlmostEqual((price(mean_reversion, vol + 1e-9) - price(mean_reversion, vol - 1e-9)) / 2e-9,
+                                   d_vol, 6)
+
+    def test_levenberg_marquardt(self):
+        for mean_reversion, volatility in ((0.03, 0.008), (0.005, 0.004), (0.2, 0.012), (0.001, 0.002)):
+            price_dict = self._price_dict(mean_reversion, volatility)
+            mr, vol, err, iterations, seconds = lm_hw_calibration_cap_floor(price_dict)
+            self.assertAlmostEqual(mean_reversion, mr, 10)
+            self.assertAlmostEqual(volatility, vol, 12)
+            self.assertAlmostEqual(0.0, err, 20)
+            self.assertTrue(iterations < 20)
+
+    def test_brute_force(self):
+        price_dict = self._price_dict(0.0053, 0.0041, 10)
+        brute = brute_hw_calibration_cap_floor(price_dict, 0., 0.01, 0.001, 0.001, 0.01, 0.001)
+        mr, vol, err, iterations, seconds = lm_hw_calibration_cap_floor(price_dict)
+        self.assertTrue(err <= brute[2])
+        self.assertAlmostEqual(brute[1], vol, 3)
+
+    def test_array(self):
+        args = (0.02, 0.025, 0.01, 2., True, 0.5, 0.05, 0.95), (0.02, 0.015, 0.007, 7., False, 0.25, 0.1, 0.8), \
+            (0.02, 0.015, 0.007, 0., False, 0.25, 0.1, 0.8)
+        for a in args:
+            self.assertAlmostEqual(hw_cap_floor_let(*a), hw_cap_floor_let_array(*a), 15)
+        values = hw_cap_floor_let_array(*(np.array(a) for a in zip(*args)))
+        self.assertEqual([hw_cap_floor_let_array(*a) for a in args], list(values))
+
+    def test_grid(self):
+        price_dict = self._price_dict(0.0053, 0.0041, 20)
+        grid = 0., 0.01, 0.0005, 0.0001, 0.01, 0.0005
+        brute = brute_hw_calibration_cap_floor(price_dict, *grid)
+        mr, vol, err, errors = grid_hw_calibration_cap_floor(price_dict, *grid)
+        self.assertEqual(brute[:2], [mr, vol])
+        self.assertAlmostEqual(brute[2], err, 20)
+        self.assertEqual(err, errors.min())
+        self.assertAlmostEqual(errors[3, 7], self._error(price_dict, 0.0015, 0.0036), 15)
+        # block size does not change the result
+        self.assertEqual(errors.tolist(), grid_hw_calibration_cap_floor(price_dict, *grid, memory_budget=1)[3].tolist())
+
+    def test_golden_section(self):
+        for mean_reversion, volatility in ((0.0053, 0.0041), (0.002, 0.008), (0.009, 0.001)):
+            price_dict = self._price_dict(mean_reversion, volatility, 20)
+            mr, vol, err = golden_hw_calibration_cap_floor(price_dict)
+            self.assertAlmostEqual(mean_reversion, mr, 4)
+            self.assertAlmostEqual(volatility, vol, 6)
+            self.assertTrue(err < 1e-14)
+        brute = brute_hw_calibration_cap_floor(price_dict, 0., 0.01, 0.001, 0.0001, 0.01, 0.0005)
+        self.assertTrue(err <= brute[2])
+
+    def test_columnar(self):
+        price_dict = self._price_dict(0.0053, 0.0041, 20)
+        keys = HullWhiteCalibrationProblem.KEYS
+        structured = np.zeros(20, dtype=[(k, bool if k == 'bool' else float) for k in keys])
+        for k in keys:
+            structured[k] = price_dict[k]
+        arrays = dict((k, np.array(price_dict[k])) for k in keys)
+        buffers = dict((k, memoryview(arrays[k])) for k in keys)
+        expected = self._error(price_dict, 0.004, 0.003)
+        lm = lm_hw_calibration_cap_floor(price_dict)[:3]
+        for columns in (price_dict, structured, arrays, buffers):
+            problem = HullWhiteCalibrationProblem(columns)
+            self.assertEqual(20, len(problem))
+            self.assertAlmostEqual(expected, problem.error(0.004, 0.003), 18)
+            self.assertEqual(lm, lm_hw_calibration_cap_floor(columns)[:3])
+            self.assertEqual(lm, lm_hw_calibration_cap_floor(problem)[:3])
+        # columns are not copied
+        self.assertTrue(np.shares_memory(structured, HullWhiteCalibrationProblem(structured)['strike']))
+        self.assertTrue(np.shares_memory(arrays['price'], HullWhiteCalibrationProblem(buffers)['price']))
+        arrays['price'] = arrays['price'][1:]
+        self.assertRaises(ValueError, HullWhiteCalibrationProblem, arrays)
+
+    def test_state(self):
+        state = HullWhiteCalibrationState()
+        self.assertEqual(state.bounds, state.bracket('EUR'))
+        history = (0.005, 0.004), (0.0052, 0.00405), (0.0051, 0.0041), (0.008, 0.002)
+        for mean_reversion, volatility in history:
+            res = state.calibrate(self._price_dict(mean_reversion, volatility), 'EUR')
+            self.assertAlmostEqual(mean_reversion, res[0], 5)
+            self.assertAlmostEqual(volatility, res[1], 7)
+            self.assertEqual(res, [state['EUR'][k] for k in ('mean_reversion', 'volatility', 'error')])
+        self.assertEqual(4, state['EUR']['calibrations'])
+        self.assertEqual(1, state['EUR']['fallbacks'])
+        self.assertTrue(state['EUR']['fallback'])
+        self.assertNotIn('USD', state)
+
+        # restart from stored records
+        state = HullWhiteCalibrationState(records=state.records)
+        self.assertEqual(1, len(state))
+        state.calibrate(self._price_dict(0.0081, 0.00201), 'EUR')
+        self.assertFalse(state['EUR']['fallback'])
+        self.assertEqual(5, state['EUR']['calibrations'])
+
+    def test_parallel(self):
+        price_dict = self._price_dict(0.0053, 0.0041, 10)
+        grid = 0., 0.01, 0.001, 0.0001, 0.01, 0.0005
+        serial = brute_hw_calibration_cap_floor(price_dict, *grid)
+        for n_workers in (1, 3):
+            self.assertEqual(serial, brute_hw_calibration_cap_floor(price_dict, *grid, n_workers=n_workers))
+        serial = binary_mr_hw_calibration_cap_floor(price_dict, *grid)
+        with HullWhiteCalibrationExecutor(price_dict, 2) as executor:
+            self.assertEqual(serial, binary_mr_hw_calibration_cap_floor(price_dict, *grid, executor=executor))
+            self.assertRaises(ValueError, brute_hw_calibration_cap_floor, dict(price_dict), executor=executor)
+        self.assertRaises(ValueError, binary_mr_hw_calibration_cap_floor, price_dict, 0., 0.002, 0.001, 0.0001, 0.01,
+                          0.0005, n_workers=2)
+
+    def test_scalar_error_func(self):
+        price_dict = self._price_dict(0.0053, 0.0041, 10)
+        problem = HullWhiteCalibrationProblem(price_dict)
+        grid = 0., 0.01, 0.001, 0.0001, 0.01, 0.0005
+        for error_func in (fabs, (lambda x: max(x, -x))):
+            expected = self._error(price_dict, 0.004, 0.003, error_func)
+            self.assertAlmostEqual(expected, problem.error(0.004, 0.003, error_func), delta=1e-15)
+            self.assertAlmostEqual(expected, problem.errors([0.004], [0.003], error_func)[0, 0], delta=1e-15)
+            brute = brute_hw_calibration_cap_floor(price_dict, *grid, error_func=error_func)
+            expected = self._error(price_dict, brute[0], brute[1], error_func)
+            self.assertAlmostEqual(expected, brute[2], delta=1e-15)
+            self.assertEqual(brute[:2], grid_hw_calibration_cap_floor(price_dict, *grid, error_func=error_func)[:2])
+        self.assertEqual(brute_hw_calibration_cap_floor(price_dict, *grid, error_func=fabs),
+                         brute_hw_calibration_cap_floor(price_dict, *grid, n_workers=2, error_func=fabs))
+
+
+class SabrUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.forwards = np.linspace(0.005, 0.06, 12)[:, np.newaxis]
+        self.times = np.array([0.25, 1., 5., 10., 30.])[np.newaxis, :]
+        self.parameters = [(0.01, 0.5, 0.4, -0.3), (0.02, 1., 0.4, -0.3), (0.003, 0., 0.4, 0.3),
+                           (0.05, 0.7, 1., 0.9), (0.1, 1., 0., 0.)]
+
+    def test_alpha_from_atm(self):
+        for alpha, beta, nu, rho in self.parameters:
+            for forward in self.forwards.flat:
+                for time in self.times.flat:
+                    vol = sabr_black_vol(forward, forward, alpha, beta, nu, rho, time)
+                    self.assertAlmostEqual(alpha, sabr_alpha_from_atm(forward, vol, beta, nu, rho, time), 12)
+        self.assertRaises(ValueError, sabr_alpha_from_atm, 0.03, -0.1, 0.5, 0.4, -0.3, 1.)
+
+    def test_alpha_from_atm_array(self):
+        black_vol = np.vectorize(sabr_black_vol)
+        for alpha, beta, nu, rho in self.parameters:
+            vols = black_vol(self.forwards, self.forwards, alpha, beta, nu, rho, self.times)
+            alphas = sabr_alpha_from_atm_array(self.forwards, vols, beta, nu, rho, self.times)
+            self.assertEqual(vols.shape, alphas.shape)
+            for a in alphas.flat:
+                self.assertAlmostEqual(alpha, a, 12)
+
+    def test_black_vol_array(self):
+        forward, time = 0.03, 5.
+        strikes = np.linspace(0.005, 0.08, 31)
+        for alpha, beta, nu, rho in self.parameters:
+            self.assertAlmostEqual(sabr_black_vol(forward, forward, alpha, beta, nu, rho, time),
+                                   float(sabr_black_vol_array(forward, forward, alpha, beta, nu, rho, time)), 14)
+            self.assertAlmostEqual(sabr_black_vol(forward, forward, alpha, beta, nu, rho, time),
+                                   float(sabr_black_vol_array(forward, forward, alpha, beta, nu, rho, time, True)), 14)
+            for strike in strikes:
+                self.assertAlmostEqual(float(sabr_black_vol_array(strike, forward, alpha, beta, nu, rho, time)),
+                                       sabr_black_vol(strike, forward, alpha, beta, nu, rho, time), 14)
+            if beta == 1.:
+                self.assertTrue(np.allclose(sabr_black_vol_array(strikes, forward, alpha, beta, nu, rho, time),
+                                            sabr_black_vol_array(strikes, forward, alpha, beta, nu, rho, time, True)))
+            for obloj in (False, True):
+                vol, d_alpha, d_rho, d_nu = sabr_black_vol_and_gradient_array(strikes, forward, alpha, beta, nu, rho,
+                                                                              time, obloj)
+                shift = 1e-7
+                for i, gradient in enumerate((d_alpha, d_rho, d_nu)):
+                    up, down = [alpha, rho, nu], [alpha, rho, nu]
+                    up[i] += shift
+                    down[i] -= shift
+                    up = sabr_black_vol_array(strikes, forward, up[0], beta, up[2], up[1], time, obloj)
+                    down = sabr_black_vol_array(strikes, forward, down[0], beta, down[2], down[1], time, obloj)
+                    for g, u, d in zip(gradient, up, down):
+                        self.assertAlmostEqual(g, (u - d) / (2 * shift), 5)
+
+    def test_black_vol_array_near_the_money(self):
+        forward, time = 0.03, 5.
+        strikes = forward * (1. + np.array([-1e-3, -1e-6, -1e-9, -1e-12, 0., 1e-12, 1e-9, 1e-6, 1e-3]))
+        for alpha, beta, nu, rho in self.parameters:
+            for obloj in (False, True):
+                vols = sabr_black_vol_array(strikes, forward, alpha, beta, nu, rho, time, obloj)
+                self.assertTrue(np.all(np.isfinite(vols)))
+                # monotone in strike, no jump at the money
+                self.assertTrue(np.all(np.diff(vols) <= 0.) or np.all(np.diff(vols) >= 0.))
+                atm = sabr_black_vol(forward, forward, alpha, beta, nu, rho, time)
+                self.assertAlmostEqual(atm, vols[3], 12)
+                self.assertAlmostEqual(atm, vols[5], 12)
+
+    def test_calibration_smile(self):
+        forward, time = 0.03, 5.
+        strikes = forward + np.array([-0.015, -0.01, -0.005, -0.0025, 0., 0.0025, 0.005, 0.01, 0.015, 0.03])
+        for alpha, beta, nu, rho in self.parameters[:4]:
+            vols = sabr_black_vol_array(strikes, forward, alpha, beta, nu, rho, time)
+            res = sabr_calibration_smile(forward, strikes, vols, time, beta)
+            self.assertAlmostEqual(alpha, res[0], 8)
+            self.assertAlmostEqual(rho, res[1], 6)
+            self.assertAlmostEqual(nu, res[2], 6)
+            atm_vol = sabr_black_vol(forward, forward, alpha, beta, nu, rho, time)
+            res = sabr_calibration_smile(forward, strikes, vols, time, beta, atm_vol)
+            self.assertAlmostEqual(atm_vol, float(sabr_black_vol_array(forward, forward, res[0], beta, res[2],
+                                                                       res[1], time)), 14)
+            self.assertAlmostEqual(rho, res[1], 6)
+            self.assertAlmostEqual(nu, res[2], 6)
+
+    def test_calibration_cube(self):
+        forwards = np.linspace(0.01, 0.04, 12).reshape(4, 3)
+        times = np.array([1., 2., 5., 10.])[:, np.newaxis]
+        strikes = forwards[..., np.newaxis] + np.array([-0.005, -0.0025, 0., 0.0025, 0.005, 0.01, 0.02])
+        rhos = (-0.2 + 0.1 * np.arange(3)) + 0. * forwards
+        nus = (0.3 + 0.05 * np.arange(4))[:, np.newaxis] + 0. * forwards
+        vols = sabr_black_vol_array(strikes, forwards[..., np.newaxis], 0.01, 0.5, nus[..., np.newaxis],
+                                    rhos[..., np.newaxis], times[..., np.newaxis])
+        vols[0, 0, -1] = np.nan
+        alpha, rho, nu, error, iterations = sabr_calibration_cube(forwards, strikes, vols, times, 0.5)
+        self.assertEqual(forwards.shape, alpha.shape)
+        self.assertTrue(np.allclose(alpha, 0.01, atol=1e-10))
+        self.assertTrue(np.allclose(rho, rhos, atol=1e-6))
+        self.assertTrue(np.allclose(nu, nus, atol=1e-6))
+        parallel = sabr_calibration_cube(forwards, strikes, vols, times, 0.5, n_workers=2)
+        for s, p in zip((alpha, rho, nu), parallel):
+            self.assertTrue(np.allclose(s, p))
+
+
+class CapletVolStrippingUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.times = np.arange(1, 41) * 0.25
+        self.forwards = 0.02 + 0.001 * np.sqrt(self.times)
+        self.year_fractions = np.full(40, 0.25)
+        self.discount_factors = np.exp(-0.02 * (self.times + 0.25))
+        self.strikes = np.array([0.01, 0.02, 0.03, 0.05])
+        self.cap_lengths = np.array([4, 8, 12, 20, 28, 40])
+        segments = np.repeat(np.arange(6), np.diff(np.concatenate(([0], self.cap_lengths))))
+        self.shape = (1. + 0.1 * segments)[:, np.newaxis] * (1. + 2. * self.strikes)[np.newaxis, :]
+
+    def _caps(self, vols, model, displacement, is_call):
+        return np.array([cap_floor_value_array(self.forwards[:n], self.strikes, vols[:n], self.times[:n],
+                                               self.year_fractions[:n], self.discount_factors[:n],
+                                               model, displacement, is_call) for n in self.cap_lengths])
+
+    def test_cap_floor_value(self):
+        vols = 0.3 * self.shape
+        for j, strike in enumerate(self.strikes):
+            caplets = [self.discount_factors[i] * self.year_fractions[i] *
+                       black76.black(self.forwards[i], strike, vols[i, j], self.times[i], False) for i in range(40)]
+            self.assertAlmostEqual(sum(caplets), self._caps(vols, 'black', 0., False)[-1, j], 14)
+            self.assertAlmostEqual(caplets[3], float(caplet_value_array(
+                self.forwards[3], strike, vols[3, j], self.times[3], self.year_fractions[3],
+                self.discount_factors[3], 'black', 0., False)), 14)
+        self.assertRaises(ValueError, caplet_value_array, 0.02, 0.02, 0.2, 1., 1., 1., 'sabr')
+
+    def test_stripping(self):
+        for model, displacement, level in (('black', 0., 0.3), ('shifted_black', 0.02, 0.15),
+                                           ('bachelier', 0., 0.007)):
+            for is_call in (True, False):
+                vols = level * self.shape
+                caps = self._caps(vols, model, displacement, is_call)
+                stripped, status = caplet_vol_stripping(caps, self.strikes, self.forwards, self.times,
+                                                        self.year_fractions, self.discount_factors,
+                                                        self.cap_lengths, model, displacement, is_call)
+                self.assertTrue(np.all((status == CONVERGED) | (status == BISECTION)))
+                self.assertTrue(np.allclose(vols, stripped, rtol=0., atol=1e-10))
+
+    def test_stripping_failure(self):
+        vols = 0.3 * self.shape
+        caps = self._caps(vols, 'black', 0., True)
+        caps[2, 1] = caps[1, 1]  # no value left for third segment
+        stripped, status = caplet_vol_stripping(caps, self.strikes, self.forwards, self.times,
+                                                self.year_fractions, self.discount_factors, self.cap_lengths)
+        self.assertEqual(NO_BRACKET, status[2, 1])
+        self.assertTrue(np.all(np.isnan(stripped[8:12, 1])))
+        self.assertTrue(np.allclose(vols[:8], stripped[:8]))
+        self.assertTrue(np.allclose(vols[:, 0], stripped[:, 0]))
+
 
 class BlackScholesUnitTests(unittest.TestCase):
     def setUp(self):
@@ -209,6 +1040,207 @@ class BlackScholesUnitTests(unittest.TestCase):
         self.assertTrue(True)
 
 
+class NormalDistributionUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.tails = ((-5., 2.86651571879193912e-07), (-10.5, 4.31900631780923044e-26),
+                      (-20., 2.75362411860623374e-89), (-30., 4.90671392714818718e-198))
+
+    def test_abramowitz_stegun(self):
+        from mathtoolspy import cdf_abramowitz_stegun
+        for x in (-12., -3., -0.5, 0., 0.3, 2., 9.):
+            self.assertEqual(cdf_abramowitz_stegun(x), normal_cdf(x, ABRAMOWITZ_STEGUN))
+            self.assertAlmostEqual(cdf_abramowitz_stegun(x), normal_cdf_array(x, ABRAMOWITZ_STEGUN), 15)
+
+    def test_tails(self):
+        for x, p in self.tails:
+            self.assertAlmostEqual(1.0, normal_cdf(x, ERFC) / p, 12)
+            self.assertAlmostEqual(1.0, normal_cdf(x, ACCURATE) / p, 14)
+            self.assertAlmostEqual(1.0, normal_cdf_array(x, ACCURATE) / p, 14)
+            self.assertAlmostEqual(normal_cdf(-x, ACCURATE), 1.0 - p, 15)
+
+    def test_array_matches_scalar(self):
+        x = [-25., -10.01, -3., -0.5, 0., 0.3, 2., 9.99, 25.]
+        for method in (ABRAMOWITZ_STEGUN, ERFC, ACCURATE):
+            values = normal_cdf_array(x, method)
+            for i, y in enumerate(x):
+                self.assertAlmostEqual(1.0, values[i] / normal_cdf(y, method), 12)
+
+    def test_global_method(self):
+        previous = set_normal_cdf_method(ERFC)
+        try:
+            self.assertEqual(ERFC, get_normal_cdf_method())
+            self.assertEqual(normal_cdf(0.3, ERFC), normal_cdf(0.3))
+            self.assertNotEqual(normal_cdf(0.3, ABRAMOWITZ_STEGUN), normal_cdf(0.3))
+            self.assertRaises(ValueError, set_normal_cdf_method, 'unknown')
+        finally:
+            set_normal_cdf_method(previous)
+
+
+class Black76ArrayUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.forward = [0.01, 0.02, 0.025, 0.03, 0.05]
+        self.strike = [0.005, 0.025, 0.025, 0.02, 0.1]
+        self.vol = [0.0, 0.2, 0.35, 0.55, 1.2]
+        self.time = [0.0, 0.25, 1.0, 3.25, 10.0]
+
+    def _grid(self):
+        for f, k in zip(self.forward, self.strike):
+            for v in self.vol:
+                for t in self.time:
+                    for c in (True, False):
+                        yield f, k, v, t, c
+
+    def test_array_matches_scalar(self):
+        names = ('black', 'black_delta', 'black_gamma', 'black_vega',
+                 'black_digital', 'black_digital_delta', 'black_digital_gamma', 'black_digital_vega',
+                 'black_straddle', 'black_straddle_delta', 'black_straddle_gamma', 'black_straddle_vega')
+        args = list(zip(*self._grid()))
+        for name in names:
+            scalar_func = getattr(black76, name)
+            array_func = getattr(black76, name + '_array')
+            values = array_func(*args)
+            for i, arg in enumerate(self._grid()):
+                value = scalar_func(*arg)
+                self.assertAlmostEqual(value, values[i], delta=1e-12 * max(1.0, abs(value)), msg=name + str(arg))
+
+    def test_broadcast(self):
+        strike = [[0.01], [0.02], [0.03]]
+        values = black76.black_array(0.02, strike, self.vol, 2.0, True)
+        self.assertEqual((3, 5), values.shape)
+        for i, k in enumerate(strike):
+            for j, v in enumerate(self.vol):
+                self.assertAlmostEqual(black76.black(0.02, k[0], v, 2.0, True), values[i, j], 12)
+
+    def test_gamma(self):
+        f, k, v, t, h = 0.02, 0.025, 0.35, 3.25, 1e-6
+        delta = black76.black_delta_array
+        gamma = (delta(f + h, k, v, t, True) - delta(f - h, k, v, t, True)) / (2 * h)
+        self.assertAlmostEqual(gamma, black76.black_gamma_array(f, k, v, t, True), 3)
+        self.assertAlmostEqual(2 * gamma, black76.black_straddle_gamma_array(f, k, v, t, True), 3)
+        delta = black76.black_digital_delta_array
+        gamma = (delta(f + h, k, v, t, False) - delta(f - h, k, v, t, False)) / (2 * h)
+        self.assertAlmostEqual(gamma, black76.black_digital_gamma_array(f, k, v, t, False), 2)
+
+
+class BachelierArrayUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.forward = [-0.005, 0.0, 0.01, 0.025, 0.03]
+        self.strike = [0.005, -0.0025, 0.025, 0.025, 0.02]
+        self.vol = [0.0, 0.001, 0.0065, 0.012]
+        self.time = [0.0, 0.25, 1.0, 3.25, 10.0]
+
+    def _grid(self):
+        for f, k in zip(self.forward, self.strike):
+            for v in self.vol:
+                for t in self.time:
+                    for c in (True, False):
+                        yield f, k, v, t, c
+
+    def test_array_matches_scalar(self):
+        names = ('bachelier', 'bachelier_delta', 'bachelier_gamma', 'bachelier_vega',
+                 'bachelier_digital', 'bachelier_digital_delta', 'bachelier_digital_gamma', 'bachelier_digital_vega',
+                 'bachelier_straddle', 'bachelier_straddle_delta', 'bachelier_straddle_gamma',
+                 'bachelier_straddle_vega')
+        args = list(zip(*self._grid()))
+        for name in names:
+            scalar_func = getattr(putcall, name)
+            array_func = getattr(putcall, name + '_array')
+            values = array_func(*args)
+            for i, arg in enumerate(self._grid()):
+                value = scalar_func(*arg)
+                self.assertAlmostEqual(value, values[i], delta=1e-12 * max(1.0, abs(value)), msg=name + str(arg))
+
+    def test_straddle(self):
+        args = list(zip(*(a for a in self._grid() if a[2] * a[3] > 0.0)))
+        for name in ('bachelier', 'bachelier_delta', 'bachelier_gamma', 'bachelier_vega'):
+            straddle = getattr(putcall, name.replace('bachelier', 'bachelier_straddle') + '_array')(*args)
+            call = getattr(putcall, name + '_array')(*(args[:4] + [True]))
+            put = getattr(putcall, name + '_array')(*(args[:4] + [False]))
+            for s, c, p in zip(straddle, call, put):
+                self.assertAlmostEqual(c + p, s, delta=1e-8 * max(1.0, abs(s)), msg=name)
+
+    def test_strike_expiry_grid(self):
+        strike = [[-0.005], [0.0], [0.01], [0.02]]
+        values = putcall.bachelier_array(0.01, strike, 0.0065, self.time, False)
+        self.assertEqual((4, 5), values.shape)
+        for i, k in enumerate(strike):
+            for j, t in enumerate(self.time):
+                self.assertAlmostEqual(putcall.bachelier(0.01, k[0], 0.0065, t, False), values[i, j], 12)
+
+
+class PriceAndGreeksUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.valuators = (OptionValuatorN(), OptionValuatorLN(), OptionValuatorSLN())
+        self.vols = (0.012, 0.55, 0.55)
+        self.option_types = (OptionType.CALL, OptionType.PUT, OptionType.DIGITAL_CALL, OptionType.DIGITAL_PUT,
+                             OptionType.STRADDLE)
+
+    def test_price_and_greeks(self):
+        forward, strike, time, discount_factor = 0.02, 0.025, 3.25, 0.9
+        for opt_val, vol in zip(self.valuators, self.vols):
+            for option_type in self.option_types:
+                args = forward, strike, time, vol, option_type, discount_factor
+                value, delta, gamma, vega = opt_val.price_and_greeks(*args)
+                self.assertAlmostEqual(opt_val.option_value(*args), value, 12)
+                self.assertAlmostEqual(opt_val.delta(*args), delta, 12)
+                self.assertAlmostEqual(opt_val.vega(*args), vega, 12)
+                self.assertAlmostEqual(opt_val.gamma(*args), gamma, 12)
+
+    def test_second_order(self):
+        forward, strike, time, h = 0.02, 0.025, 3.25, 1e-7
+        for opt_val, vol in zip(self.valuators, self.vols):
+            for option_type in self.option_types:
+                greeks = opt_val.price_and_greeks(forward, strike, time, vol, option_type, second_order=True)
+                vega = (lambda f, v: opt_val.price_and_greeks(f, strike, time, v, option_type)[3])
+                vanna = (vega(forward + h, vol) - vega(forward - h, vol)) / (2 * h)
+                volga = (vega(forward, vol + h) - vega(forward, vol - h)) / (2 * h)
+                self.assertAlmostEqual(vanna, greeks[4], delta=1e-6 * max(1.0, abs(vanna)))
+                self.assertAlmostEqual(volga, greeks[5], delta=1e-6 * max(1.0, abs(volga)))
+
+    def test_bumped(self):
+        opt_val = OptionValuatorLN(delta=0.0001, vega=0.0001)
+        greeks = opt_val.price_and_greeks(0.02, 0.025, 3.25, 0.55, OptionType.CALL, second_order=True)
+        analytic = OptionValuatorLN().price_and_greeks(0.02, 0.025, 3.25, 0.55, OptionType.CALL, second_order=True)
+        for b, a in zip(greeks, analytic):
+            self.assertAlmostEqual(a, b, delta=1e-2 * max(1.0, abs(a)))
+
+    def test_vanna_volga_theta_dual(self):
+        forward, strike, time, discount_factor, h = 0.02, 0.025, 3.25, 0.9, 1e-6
+        for opt_val, vol in zip(self.valuators, self.vols):
+            for option_type in self.option_types:
+                args = forward, strike, time, vol, option_type, discount_factor
+                value = (lambda f, k, t, v: opt_val.option_value(f, k, t, v, option_type, discount_factor))
+                vega = (lambda f, v: opt_val.vega(f, strike, time, v, option_type, discount_factor))
+                greeks = opt_val.price_and_greeks(*args, second_order=True)
+                numeric = {
+                    'vanna': (vega(forward + h, vol) - vega(forward - h, vol)) / (2 * h),
+                    'volga': (vega(forward, vol + h) - vega(forward, vol - h)) / (2 * h),
+                    'theta': (value(forward, strike, time - h, vol) - value(forward, strike, time + h, vol)) / (2 * h),
+                    'dual_delta':
+                        (value(forward, strike + h, time, vol) - value(forward, strike - h, time, vol)) / (2 * h),
+                    'dual_gamma': (value(forward, strike + 1e-4, time, vol) - 2 * value(forward, strike, time, vol) +
+                                   value(forward, strike - 1e-4, time, vol)) / 1e-8,
+                }
+                for name, expected in numeric.items():
+                    risk = getattr(opt_val, name)(*args)
+                    self.assertAlmostEqual(expected, risk, delta=1e-3 * max(1.0, abs(expected)), msg=name)
+                    portfolio = getattr(opt_val, name + '_portfolio')([forward] * 3, strike, time, vol,
+                                                                       option_type, discount_factor)
+                    for p in portfolio:
+                        self.assertAlmostEqual(risk, p, delta=1e-10 * max(1.0, abs(risk)), msg=name)
+                self.assertAlmostEqual(greeks[4], opt_val.vanna(*args), delta=1e-10 * max(1.0, abs(greeks[4])))
+                self.assertAlmostEqual(greeks[5], opt_val.volga(*args), delta=1e-10 * max(1.0, abs(greeks[5])))
+
+    def test_bumped_vanna_volga_theta_dual(self):
+        args = 0.02, 0.025, 3.25, 0.012, OptionType.CALL, 0.9
+        analytic, bumped = OptionValuatorN(), OptionValuatorN(delta=1e-6, vega=1e-5)
+        for name in ('vanna', 'volga', 'theta', 'dual_delta', 'dual_gamma'):
+            a = getattr(analytic, name)(*args)
+            self.assertAlmostEqual(a, getattr(bumped, name)(*args), delta=1e-2 * max(1.0, abs(a)), msg=name)
+            self.assertAlmostEqual(getattr(bumped, name)(*args),
+                                   getattr(bumped, name + '_portfolio')(*args), delta=1e-12, msg=name)
+
+
 if __name__ == "__main__":
     import sys
 